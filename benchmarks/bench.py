@@ -0,0 +1,432 @@
+"""
+Micro-benchmarks for the hot paths of `opengraph_writer`.
+
+    python benchmarks/bench.py                          # run and print
+    python benchmarks/bench.py --save baseline.json     # store a baseline
+    python benchmarks/bench.py --compare baseline.json  # flag regressions
+
+Timings are the best per-call time, in microseconds, of several repeats.
+Memory results are the bytes held per item, size results are the bytes of a
+serialized item, and import results are the best time to import (and first
+use) the package in a new interpreter.  For all of them, larger is worse.
+`--compare` exits with status 1 if any result regressed by more than
+`--threshold` (default 10%).
+"""
+# stdlib
+import argparse
+import datetime
+import json
+import os
+import pickle
+import platform
+import sys
+import timeit
+import typing
+
+# local package
+import opengraph_writer
+from opengraph_writer import OG_PROPERTIES
+from opengraph_writer import OpenGraphItem
+from opengraph_writer import stringify
+from opengraph_writer import typed
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import imports  # noqa: E402
+import memory  # noqa: E402
+
+# typing
+_BENCHMARK = typing.Callable[[], typing.Callable[[], typing.Any]]
+
+# ==============================================================================
+
+# name: a setup function, which returns the callable to time
+BENCHMARKS: typing.Dict[str, _BENCHMARK] = {}
+
+
+def benchmark(name: str) -> typing.Callable[[_BENCHMARK], _BENCHMARK]:
+    def _register(setup: _BENCHMARK) -> _BENCHMARK:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return _register
+
+
+_CORE = (
+    ("og:title", "The Rock"),
+    ("og:image", "http://ia.media-imdb.com/images/rock.jpg"),
+    ("og:url", "http://www.imdb.com/title/tt0117500/"),
+    ("og:site_name", "IMDb"),
+    ("og:description", "A one to two sentence description of your page."),
+)
+
+# a plausible value for each property type
+_SAMPLES = {
+    "string": "sample",
+    "integer": "120",
+    "datetime": "2012-02-02T15:29:00Z",
+    "profile": "http://www.imdb.com/name/nm0000115/",
+    "url": "http://www.imdb.com/",
+    "enum": "male",
+    "boolean": "true",
+    "music.album": "http://open.spotify.com/album/1",
+    "music.song": "http://open.spotify.com/track/1",
+    "video.tv_show": "http://www.imdb.com/title/tt0000001/",
+}
+
+
+def _make_item(og_type: str = "article") -> OpenGraphItem:
+    """an item with the core properties, og_type, and half of its subtypes"""
+    a = OpenGraphItem()
+    a.set_many(_CORE)
+    a.set("og:type", og_type)
+    _subtypes = OG_PROPERTIES["og:type"]["valid_types-2"][og_type]["properties"]
+    for i, (subtype, info) in enumerate(sorted(_subtypes.items())):
+        if i % 2 == 0:
+            a.set(subtype, _SAMPLES[info["type"]])
+    return a
+
+
+@benchmark("set_many")
+def _bench_set_many() -> typing.Callable[[], typing.Any]:
+    _pairs = list(_CORE) + [
+        ("og:type", "article"),
+        ("article:published_time", "2012-01-10"),
+        ("article:author", "abc"),
+    ]
+
+    def _run() -> None:
+        OpenGraphItem().set_many(_pairs)
+
+    return _run
+
+
+def _register_validate() -> None:
+    for og_type in OG_PROPERTIES["og:type"]["valid_types-2"]:
+        for schema in (1, 2):
+
+            def _setup(
+                og_type: str = og_type, schema: int = schema
+            ) -> typing.Callable[[], typing.Any]:
+                a = _make_item(og_type)
+                kwargs = {"schema1": schema == 1, "schema2": schema == 2}
+
+                def _run() -> None:
+                    a.validate(full=True, **kwargs)
+
+                return _run
+
+            BENCHMARKS["validate:schema%s:%s" % (schema, og_type)] = _setup
+
+
+_register_validate()
+
+
+def _register_validate_modes() -> None:
+    for mode in ("quiet", "fail_fast", "strict"):
+
+        def _setup(mode: str = mode) -> typing.Callable[[], typing.Any]:
+            a = _make_item("article")
+            kwargs = {mode: True}
+
+            def _run() -> None:
+                a.validate(full=True, **kwargs)
+
+            return _run
+
+        BENCHMARKS["validate:%s" % mode] = _setup
+
+
+_register_validate_modes()
+
+
+@benchmark("validate:interpreted")
+def _bench_validate_interpreted() -> typing.Callable[[], typing.Any]:
+    """`validate:schema2:article`, without the generated validator"""
+    a = _make_item("article")
+
+    def _run() -> None:
+        opengraph_writer.GENERATED_VALIDATORS = False
+        try:
+            a.validate(full=True, schema2=True)
+        finally:
+            opengraph_writer.GENERATED_VALIDATORS = True
+
+    return _run
+
+
+@benchmark("validate:incremental")
+def _bench_validate_incremental() -> typing.Callable[[], typing.Any]:
+    a = _make_item("article")
+    a.validate()
+
+    def _run() -> None:
+        a.set("og:title", "The Rock")
+        a.validate()
+
+    return _run
+
+
+def _register_as_html() -> None:
+    for debug in (False, True):
+
+        def _setup(debug: bool = debug) -> typing.Callable[[], typing.Any]:
+            a = _make_item("article")
+            a.set("og:image:width", "wide")  # an error, for debug output
+            a.validate()
+
+            def _run() -> None:
+                a.as_html(debug=debug)
+
+            return _run
+
+        BENCHMARKS["as_html:%s" % ("debug" if debug else "default")] = _setup
+
+
+_register_as_html()
+
+
+@benchmark("typed:validate")
+def _bench_typed_validate() -> typing.Callable[[], typing.Any]:
+    """`validate:schema2:article`, on an `ArticleItem`"""
+    a = typed.from_item(_make_item("article"))
+
+    def _run() -> None:
+        a.validate()
+
+    return _run
+
+
+@benchmark("typed:as_html")
+def _bench_typed_as_html() -> typing.Callable[[], typing.Any]:
+    """`as_html:default`, on an `ArticleItem`"""
+    a = typed.from_item(_make_item("article"))
+    a.validate()
+
+    def _run() -> None:
+        a.as_html()
+
+    return _run
+
+
+def _make_arrays() -> OpenGraphItem:
+    a = _make_item("article")
+    for i in range(200):
+        a.set("og:locale:alternate", "xx_%03d" % i, append=True)
+        a.set("article:tag", "tag <%s>" % i, append=True)
+        a.set("og:image", "http://f.me/%s.png" % i, append=True)
+    return a
+
+
+@benchmark("validate:arrays")
+def _bench_validate_arrays() -> typing.Callable[[], typing.Any]:
+    a = _make_arrays()
+
+    def _run() -> None:
+        a.validate(full=True)
+
+    return _run
+
+
+@benchmark("as_html:arrays")
+def _bench_as_html_arrays() -> typing.Callable[[], typing.Any]:
+    a = _make_arrays()
+    a.validate()
+
+    def _run() -> None:
+        a.as_html()
+
+    return _run
+
+
+@benchmark("stringify")
+def _bench_stringify() -> typing.Callable[[], typing.Any]:
+    _values = (
+        "string",
+        True,
+        datetime.datetime(2012, 2, 2, 15, 29),
+        datetime.date(2012, 2, 2),
+        120,
+    )
+
+    def _run() -> None:
+        for v in _values:
+            stringify(v)
+
+    return _run
+
+
+class _PlainPickleItem(OpenGraphItem):
+    """pickled the default way, by its `__dict__`, for comparison"""
+
+    def __reduce_ex__(self, protocol: typing.Any) -> typing.Any:
+        return object.__reduce_ex__(self, protocol)
+
+
+def _make_serialized() -> typing.Tuple[OpenGraphItem, OpenGraphItem]:
+    """a validated item, and a `_PlainPickleItem` with its data and errors"""
+    a = _make_item()
+    a.set("article:published_time", datetime.datetime(2012, 2, 2, 15, 29))
+    a.validate()
+    plain = _PlainPickleItem()
+    plain._local.update(a._local)
+    plain._errors = a._errors
+    return (a, plain)
+
+
+def _register_serialize() -> None:
+    def _encode(method: str) -> _BENCHMARK:
+        def _setup() -> typing.Callable[[], typing.Any]:
+            (a, plain) = _make_serialized()
+            if method == "pickle":
+                return lambda: pickle.dumps(plain, pickle.HIGHEST_PROTOCOL)
+            return getattr(a, "to_%s" % method)
+
+        return _setup
+
+    def _decode(method: str) -> _BENCHMARK:
+        def _setup() -> typing.Callable[[], typing.Any]:
+            (a, plain) = _make_serialized()
+            if method == "pickle":
+                payload = pickle.dumps(plain, pickle.HIGHEST_PROTOCOL)
+                return lambda: pickle.loads(payload)
+            payload = getattr(a, "to_%s" % method)()
+            _from = getattr(OpenGraphItem, "from_%s" % method)
+            return lambda: _from(payload)
+
+        return _setup
+
+    for method in ("bytes", "json", "pickle"):
+        benchmark("serialize:%s:encode" % method)(_encode(method))
+        benchmark("serialize:%s:decode" % method)(_decode(method))
+
+
+_register_serialize()
+
+
+def measure_sizes() -> typing.Dict[str, float]:
+    """the bytes of a serialized item, for each method"""
+    (a, plain) = _make_serialized()
+    return {
+        "bytes": len(a.to_bytes()),
+        "json": len(a.to_json().encode("utf-8")),
+        "pickle": len(pickle.dumps(plain, pickle.HIGHEST_PROTOCOL)),
+    }
+
+
+def time_benchmark(setup: _BENCHMARK, repeat: int = 5) -> float:
+    """returns the best time per call, in microseconds"""
+    timer = timeit.Timer(setup())
+    (number, _elapsed) = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def run(
+    name_filter: typing.Optional[str] = None,
+    repeat: int = 5,
+    with_memory: bool = True,
+    memory_count: int = 5000,
+    with_imports: bool = True,
+) -> typing.Dict[str, float]:
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = time_benchmark(setup, repeat=repeat)
+    measured = {}
+    if with_memory:
+        for name, per_item in memory.measure_memory(memory_count).items():
+            measured["memory:%s" % name] = per_item
+    for name, size in measure_sizes().items():
+        measured["size:%s" % name] = size
+    if with_imports:
+        for name, usec in imports.measure_imports(repeat=repeat * 2).items():
+            measured["import:%s" % name] = usec
+    # their names are only known once measured
+    for name, value in measured.items():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = value
+    return results
+
+
+def compare(
+    results: typing.Dict[str, float],
+    baseline: typing.Dict[str, float],
+    threshold: float,
+) -> typing.List[str]:
+    """returns the names of the results which regressed beyond `threshold`"""
+    regressions = []
+    for name, value in sorted(results.items()):
+        _baseline = baseline.get(name)
+        if not _baseline:
+            continue
+        if (value - _baseline) / _baseline > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def _unit(name: str) -> str:
+    return "bytes" if name.startswith(("memory:", "size:")) else "usec"
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="micro-benchmarks for opengraph_writer"
+    )
+    parser.add_argument("--filter", help="only run benchmarks containing this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--no-imports", action="store_true")
+    parser.add_argument("--save", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="compare to a baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="the regression which fails --compare. Default: 0.10 (10%%)",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(
+        name_filter=args.filter,
+        repeat=args.repeat,
+        with_memory=not args.no_memory,
+        with_imports=not args.no_imports,
+    )
+    baseline: typing.Dict[str, float] = {}
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)["results"]
+
+    regressions = compare(results, baseline, args.threshold) if baseline else []
+    for name, value in results.items():
+        line = "%-36s %12.2f %s" % (name, value, _unit(name))
+        if name in baseline:
+            _change = (value - baseline[name]) / baseline[name] * 100
+            line += "  %+7.1f%%" % _change
+            if name in regressions:
+                line += "  REGRESSION"
+        print(line)
+
+    if args.save:
+        with open(args.save, "w") as fp:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                fp,
+                indent=2,
+                sort_keys=True,
+            )
+    if regressions:
+        print(
+            "%s regression(s) above %.0f%%" % (len(regressions), args.threshold * 100)
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Measures the time to import `opengraph_writer`, and to first use its schema.
+
+    python benchmarks/imports.py --repeat 20
+
+Each measurement runs in a new interpreter, so nothing is already imported.
+"""
+# stdlib
+import argparse
+import subprocess
+import sys
+import typing
+
+# ==============================================================================
+
+# statement: run after `import opengraph_writer`, timed along with it
+_STATEMENTS = {
+    "opengraph_writer": "",
+    "opengraph_writer+validate": (
+        "a = opengraph_writer.OpenGraphItem(); "
+        "a.set('og:url', 'http://example.com'); a.validate()"
+    ),
+    "opengraph_writer+as_html": (
+        "a = opengraph_writer.OpenGraphItem(); "
+        "a.set('og:url', 'http://example.com/?a&b'); a.validate(); a.as_html()"
+    ),
+}
+
+_TEMPLATE = """
+import time
+_start = time.perf_counter()
+import opengraph_writer
+%s
+print(time.perf_counter() - _start)
+"""
+
+
+def _measure(statement: str, repeat: int) -> float:
+    """returns the best time, in microseconds, of `repeat` new interpreters"""
+    timings = []
+    for _i in range(repeat):
+        output = subprocess.check_output([sys.executable, "-c", _TEMPLATE % statement])
+        timings.append(float(output))
+    return min(timings) * 1e6
+
+
+def measure_imports(repeat: int = 10) -> typing.Dict[str, float]:
+    """returns the best time, in microseconds, to import and first use"""
+    return {
+        name: _measure(statement, repeat) for name, statement in _STATEMENTS.items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="time to import opengraph_writer, and to first use it"
+    )
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    for name, usec in measure_imports(args.repeat).items():
+        print("%-28s %10.0f usec" % (name, usec))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Measures the memory held per item by `OpenGraphItem` and the compact variants.
+
+    python benchmarks/memory.py --count 100000
+"""
+# stdlib
+import argparse
+import gc
+import tracemalloc
+import typing
+
+# local package
+from opengraph_writer import OpenGraphItem
+from opengraph_writer.compact import CompactOpenGraphItem
+from opengraph_writer.compact import FrozenOpenGraphItem
+
+# ==============================================================================
+
+
+def _make_item(i: int) -> OpenGraphItem:
+    a = OpenGraphItem()
+    a.set_many(
+        (
+            ("og:title", "Article %s" % i),
+            ("og:type", "article"),
+            ("og:image", "http://example.com/%s.png" % i),
+            ("og:url", "http://example.com/%s" % i),
+            ("og:description", "The description of article %s" % i),
+            ("article:published_time", "2021-01-10"),
+            ("article:section", "News"),
+        )
+    )
+    return a
+
+
+def _measure(factory: typing.Callable[[int], typing.Any], count: int) -> float:
+    """returns the bytes allocated per item by `factory`"""
+    gc.collect()
+    tracemalloc.start()
+    _start = tracemalloc.get_traced_memory()[0]
+    items = [factory(i) for i in range(count)]
+    _end = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+    return (_end - _start) / count
+
+
+def _validated(i: int) -> OpenGraphItem:
+    a = _make_item(i)
+    a.validate()
+    return a
+
+
+def measure_memory(count: int = 10000) -> typing.Dict[str, float]:
+    """returns the bytes held per validated item, by representation"""
+    return {
+        "OpenGraphItem": _measure(_validated, count),
+        "CompactOpenGraphItem": _measure(
+            lambda i: CompactOpenGraphItem.from_item(_validated(i)), count
+        ),
+        "FrozenOpenGraphItem": _measure(
+            lambda i: FrozenOpenGraphItem.from_item(_validated(i)), count
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="memory held per item, by representation"
+    )
+    parser.add_argument("--count", type=int, default=10000)
+    args = parser.parse_args()
+    for name, per_item in measure_memory(args.count).items():
+        print("%-24s %8.0f bytes/item" % (name, per_item))
+
+
+if __name__ == "__main__":
+    main()
@@ -43,6 +43,12 @@ setup(
     extras_require={
         "testing": testing_extras,
     },
+    entry_points={
+        "console_scripts": [
+            "opengraph-writer = opengraph_writer.cli:main",
+            "opengraph-lint = opengraph_writer.lint:main",
+        ],
+    },
     test_suite="tests",
     packages=find_packages(
         where="src",
@@ -47,531 +47,68 @@ Arrays
 __VERSION__ = "0.4.0"
 
 # stdlib
+from collections import ChainMap
 import datetime
+import enum
+import hashlib
+import itertools
 import re
+import sys
 import typing
 
-# pypi
-from metadata_utils import html_attribute_escape
-
 # typing
 _OG_KV = typing.Tuple[str, str]
 _OG_KV_MANY = typing.List[_OG_KV]
 _OG_SET = typing.Tuple[str, typing.Any]
 _OG_DATA = typing.Dict[str, typing.Any]
 
+if typing.TYPE_CHECKING:
+    from ._schema import _regex_dates_combined
+    from ._schema import OG_PROPERTIES
+    from ._schema import regex_url
+    from .caching import RenderCache
+    from .resolver import ReferenceResolver
 
-# http://en.wikipedia.org/wiki/ISO_8601
-regex_dates = {
-    #  Date    2012-02-02
-    "date": re.compile("^([0-9]{4})-(1[0-2]|0[1-9])-(3[0-1]|0[1-9]|[1-2][0-9])$"),
-    # Ordinal date:    2012-033
-    "ordinal_date": re.compile(
-        "^([0-9]{4})-(36[0-6]|3[0-5][0-9]|[12][0-9]{2}|0[1-9][0-9]|00[1-9])$"
-    ),
-    # Date with week number:   2012-W05-4
-    "week_number": re.compile("^([0-9]{4})-?W(5[0-3]|[1-4][0-9]|0[1-9])-?([1-7])$"),
-    # Separate date and time in UTC:   2012-02-02 15:29Z
-    "datetime, UTC": re.compile(
-        "^(-?(?:[1-9][0-9]*)?[0-9]{4})-(1[0-2]|0[1-9])-(3[0-1]|0[1-9]|[1-2][0-9])T(2[0-3]|[0-1][0-9]):([0-5][0-9]):([0-5][0-9])(.[0-9]+)?(Z|[+-](?:2[0-3]|[0-1][0-9]):[0-5][0-9])?$"
-    ),
-}
 
+# `OG_PROPERTIES` and its regexes are only imported, from `._schema`, when the
+# schema is first used; as is `metadata_utils`.  This keeps `import
+# opengraph_writer` fast for processes which may never validate or render.
+_SCHEMA_NAMES = (
+    "OG_PROPERTIES",
+    "og_properties",
+    "facebook_extensions",
+    "regex_dates",
+    "regex_url",
+    "_regex_dates_combined",
+)
+_schema_loaded = False
+
+
+def _load_schema() -> None:
+    """import the schema into this module, if it was not already"""
+    global _schema_loaded
+    if _schema_loaded:
+        return
+    from . import _schema
+
+    _globals = globals()
+    for name in _SCHEMA_NAMES:
+        # a name which was assigned before the schema was loaded is kept
+        _globals.setdefault(name, getattr(_schema, name))
+    _schema_loaded = True
 
-# basically just testing that the string starts with http/https, and has some resemeblence of a domain on it.  after an optional trailing slash, i don't need to make this super accurate
-regex_url = re.compile(r"""^http[s]?:\/\/[a-z0-9.\-]+[.][a-z]{2,4}\/?""")
-
-
-OG_PROPERTIES: typing.Dict[str, dict] = {
-    "og:title": {
-        "required": True,
-        "description": 'The title of your object as it should appear within the graph, e.g., "The Rock".',
-        "type": "string",
-    },
-    "og:type": {
-        "required": True,
-        "description": 'The type of your object, e.g., "movie". See the complete list of supported types.',
-        "type": "string",
-        "valid_types-1": {
-            "activity": {"grouping": "Activities"},
-            "sport": {"grouping": "Activities"},
-            "bar": {"grouping": "Businesses"},
-            "company": {"grouping": "Businesses"},
-            "cafe": {"grouping": "Businesses"},
-            "hotel": {"grouping": "Businesses"},
-            "restaurant": {"grouping": "Businesses"},
-            "cause": {"grouping": "Groups"},
-            "sports_league": {"grouping": "Groups"},
-            "sports_team": {"grouping": "Groups"},
-            "band": {"grouping": "Organizations"},
-            "government": {"grouping": "Organizations"},
-            "non_profit": {"grouping": "Organizations"},
-            "school": {"grouping": "Organizations"},
-            "university": {"grouping": "Organizations"},
-            "actor": {"grouping": "People"},
-            "athlete": {"grouping": "People"},
-            "author": {"grouping": "People "},
-            "director": {"grouping": "People"},
-            "musician": {"grouping": "People"},
-            "politician": {"grouping": "People"},
-            "public_figure": {"grouping": "People"},
-            "city": {"grouping": "Places"},
-            "country": {"grouping": "Places"},
-            "landmark": {"grouping": "Places"},
-            "state_province": {"grouping": "Places"},
-            "album": {"grouping": "Products and Entertainment"},
-            "book": {"grouping": "Products and Entertainment"},
-            "drink": {"grouping": "Products and Entertainment"},
-            "food": {"grouping": "Products and Entertainment"},
-            "game": {"grouping": "Products and Entertainment"},
-            "product": {"grouping": "Products and Entertainment"},
-            "song": {"grouping": "Products and Entertainment"},
-            "movie": {"grouping": "Products and Entertainment"},
-            "tv_show": {"grouping": "Products and Entertainment"},
-            "blog": {"grouping": "Websites "},
-            "website": {"grouping": "Websites"},
-            "article": {"grouping": "Websites"},
-            "game.achievement": {
-                "grouping": "Game",
-                "properties": {
-                    "game:points": {"description": "POINTS_FOR_ACHIEVEMENT"}
-                },
-            },
-        },
-        "valid_types-2": {
-            "website": {"namespace": "http://ogp.me/ns/website#", "properties": {}},
-            "article": {
-                "namespace": "http://ogp.me/ns/article#",
-                "properties": {
-                    "article:published_time": {
-                        "type": "datetime",
-                        "description": "When the article was first published.",
-                    },
-                    "article:modified_time": {
-                        "type": "datetime",
-                        "description": "When the article was last changed.",
-                    },
-                    "article:expiration_time": {
-                        "type": "datetime",
-                        "description": "When the article is out of date after.",
-                    },
-                    "article:author": {
-                        "type": "profile",
-                        "description": "Writers of the article.",
-                        "array_allowed": True,
-                    },
-                    "article:section": {
-                        "type": "string",
-                        "description": "A high-level section name. E.g. Technology",
-                    },
-                    "article:tag": {
-                        "type": "string",
-                        "description": "Tag words associated with this article.",
-                        "array_allowed": True,
-                    },
-                },
-            },
-            "book": {
-                "namespace": "http://ogp.me/ns/book#",
-                "properties": {
-                    "book:author": {
-                        "type": "profile",
-                        "description": "Who wrote this book.",
-                        "array_allowed": True,
-                    },
-                    "book:isbn": {"type": "string", "description": "The ISBN"},
-                    "book:release_date": {
-                        "type": "datetime",
-                        "description": "The date the book was released.",
-                    },
-                    "book:tag": {
-                        "type": "string",
-                        "description": "Tag words associated with this book.",
-                        "array_allowed": True,
-                    },
-                },
-            },
-            "profile": {
-                "namespace": "http://ogp.me/ns/profile#",
-                "properties": {
-                    "profile:first_name": {
-                        "type": "string",
-                        "description": "first name",
-                    },
-                    "profile:last_name": {"type": "string", "description": "last name"},
-                    "profile:username": {
-                        "type": "string",
-                        "description": "A short unique string to identify them.",
-                    },
-                    "profile:gender": {
-                        "type": "enum",
-                        "enums": ["male", "female"],
-                        "description": "Their gender",
-                    },
-                },
-            },
-            "video.movie": {
-                "namespace": "http://ogp.me/ns/video#",
-                "properties": {
-                    "video:actor": {
-                        "type": "profile",
-                        "description": "actors in the movie",
-                        "array_allowed": True,
-                    },
-                    "video:actor:role": {
-                        "type": "string",
-                        "description": "the role they played",
-                    },
-                    "video:director": {
-                        "type": "profile",
-                        "description": "directors of the movie",
-                        "array_allowed": True,
-                    },
-                    "video:writer": {
-                        "type": "profile",
-                        "description": "writers of the movie",
-                        "array_allowed": True,
-                    },
-                    "video:duration": {
-                        "type": "integer",
-                        "description": "The movie's length in seconds",
-                    },
-                    "video:release_date": {
-                        "type": "datetime",
-                        "description": "The date the movie was released",
-                    },
-                    "video:tag": {
-                        "type": "string",
-                        "description": "Tag words associated with this video.",
-                        "array_allowed": True,
-                    },
-                },
-            },
-            "video.episode": {
-                "namespace": "http://ogp.me/ns/video#",
-                "properties": {
-                    "video:actor": {
-                        "type": "profile",
-                        "description": "actors in the movie",
-                        "array_allowed": True,
-                    },
-                    "video:actor:role": {
-                        "type": "string",
-                        "description": "the role they played",
-                    },
-                    "video:director": {
-                        "type": "profile",
-                        "description": "directors of the movie",
-                        "array_allowed": True,
-                    },
-                    "video:writer": {
-                        "type": "profile",
-                        "description": "writers of the movie",
-                        "array_allowed": True,
-                    },
-                    "video:duration": {
-                        "type": "integer",
-                        "description": "The movie's length in seconds",
-                    },
-                    "video:release_date": {
-                        "type": "datetime",
-                        "description": "The date the movie was released",
-                    },
-                    "video:tag": {
-                        "type": "string",
-                        "description": "Tag words associated with this video.",
-                        "array_allowed": True,
-                    },
-                    "video:series": {
-                        "type": "video.tv_show",
-                        "description": "Which series this episode belongs to.",
-                    },
-                },
-            },
-            "video.tv_show": {
-                "namespace": "http://ogp.me/ns/video#",
-                "properties": {
-                    "video:actor": {
-                        "type": "profile",
-                        "description": "actors in the movie",
-                        "array_allowed": True,
-                    },
-                    "video:actor:role": {
-                        "type": "string",
-                        "description": "the role they played",
-                    },
-                    "video:director": {
-                        "type": "profile",
-                        "description": "directors of the movie",
-                        "array_allowed": True,
-                    },
-                    "video:writer": {
-                        "type": "profile",
-                        "description": "writers of the movie",
-                        "array_allowed": True,
-                    },
-                    "video:duration": {
-                        "type": "integer",
-                        "description": "The movie's length in seconds",
-                    },
-                    "video:release_date": {
-                        "type": "datetime",
-                        "description": "The date the movie was released",
-                    },
-                    "video:tag": {
-                        "type": "string",
-                        "description": "Tag words associated with this video.",
-                        "array_allowed": True,
-                    },
-                },
-            },
-            "video.other": {
-                "namespace": "http://ogp.me/ns/video#",
-                "properties": {
-                    "video:actor": {
-                        "type": "profile",
-                        "description": "actors in the movie",
-                        "array_allowed": True,
-                    },
-                    "video:actor:role": {
-                        "type": "string",
-                        "description": "the role they played",
-                    },
-                    "video:director": {
-                        "type": "profile",
-                        "description": "directors of the movie",
-                        "array_allowed": True,
-                    },
-                    "video:writer": {
-                        "type": "profile",
-                        "description": "writers of the movie",
-                        "array_allowed": True,
-                    },
-                    "video:duration": {
-                        "type": "integer",
-                        "description": "The movie's length in seconds",
-                    },
-                    "video:release_date": {
-                        "type": "datetime",
-                        "description": "The date the movie was released",
-                    },
-                    "video:tag": {
-                        "type": "string",
-                        "description": "Tag words associated with this video.",
-                        "array_allowed": True,
-                    },
-                },
-            },
-            "music.song": {
-                "namespace": "http://ogp.me/ns/music#",
-                "properties": {
-                    "music:duration": {
-                        "type": "integer",
-                        "description": "The song's length in seconds",
-                    },
-                    "music:album": {
-                        "type": "music.album",
-                        "description": "The album this song is from.",
-                        "array_allowed": True,
-                    },
-                    "music:album:disc": {
-                        "type": "integer",
-                        "description": "Which disc of the album this song is on",
-                    },
-                    "music:album:track": {
-                        "type": "integer",
-                        "description": "Which track this song is",
-                    },
-                    "music:musician": {
-                        "type": "profile",
-                        "description": "The musician that made this song",
-                        "array_allowed": True,
-                    },
-                },
-            },
-            "music.album": {
-                "namespace": "http://ogp.me/ns/music#",
-                "properties": {
-                    "music:song": {
-                        "type": "music.song",
-                        "description": "The song on this album.",
-                    },
-                    "music:song:disc": {
-                        "type": "integer",
-                        "description": "the disc the song is on for the album",
-                    },
-                    "music:song:track": {
-                        "type": "integer",
-                        "description": "the track number the song is on for the album",
-                    },
-                    "music:musician": {
-                        "type": "profile",
-                        "description": "The musician that made this song",
-                    },
-                    "music:release_date": {
-                        "type": "datetime",
-                        "description": "The date the album was released.",
-                    },
-                },
-            },
-            "music.playlist": {
-                "namespace": "http://ogp.me/ns/music#",
-                "properties": {
-                    "music:song": {"type": "music.song", "description": "The song"},
-                    "music:song:disc": {
-                        "type": "integer",
-                        "description": "the disc the song is on for the album",
-                    },
-                    "music:song:track": {
-                        "type": "integer",
-                        "description": "the track number the song is on for the album",
-                    },
-                    "music:creator": {
-                        "type": "profile",
-                        "description": "The creator of this playlist.",
-                    },
-                },
-            },
-            "music.radio_station": {
-                "namespace": "http://ogp.me/ns/music#",
-                "properties": {
-                    "music:creator": {
-                        "type": "profile",
-                        "description": "The creator of this station.",
-                    }
-                },
-            },
-        },
-    },
-    "og:image": {
-        "required": True,
-        "type": "url",
-        "description": "An image URL which should represent your object within the graph. The image must be at least 50px by 50px and have a maximum aspect ratio of 3:1. We support PNG, JPEG and GIF formats. You may include multiple og:image tags to associate multiple images with your page.",
-        "properties": {
-            "og:image:url": {"description": "Identical to og:image.", "type": "url"},
-            "og:image:secure_url": {
-                "description": " An alternate url to use if the webpage requires HTTPS.",
-                "type": "url",
-            },
-            "og:image:type": {
-                "description": "A MIME type for this image.",
-                "type": "string",
-            },
-            "og:image:width": {
-                "description": "The number of pixels wide.",
-                "type": "integer",
-            },
-            "og:image:height": {
-                "description": "The number of pixels high.",
-                "type": "integer",
-            },
-        },
-    },
-    "og:url": {
-        "required": True,
-        "description": "The canonical URL of your object that will be used as its permanent ID in the graph, e.g., http://www.imdb.com/title/tt0117500/",
-        "type": "url",
-    },
-    "og:site_name": {
-        "required": False,
-        "description": 'A human-readable name for your site, e.g., "IMDb".',
-        "type": "string",
-    },
-    "og:description": {
-        "required": False,
-        "description": "A one to two sentence description of your page.",
-        "type": "string",
-    },
-    "og:isbn": {
-        "required": False,
-        "description": "For products which have a UPC code or ISBN number, you can specify them using the og:upc and og:isbn properties. These properties help uniquely identify products.",
-        "type": "string",
-    },
-    "og:upc": {
-        "required": False,
-        "description": "For products which have a UPC code or ISBN number, you can specify them using the og:upc and og:isbn properties. These properties help uniquely identify products.",
-        "type": "string",
-    },
-    "og:audio": {
-        "required": False,
-        "description": "A URL to an audio file to accompany this object.",
-        "type": "url",
-        "properties": {
-            "og:audio:secure_url": {
-                "description": " An alternate url to use if the webpage requires HTTPS.",
-                "type": "url",
-            },
-            "og:audio:type": {
-                "description": "A MIME type for this audio.",
-                "type": "string",
-            },
-            "og:audio:title": {
-                "description": "NOT IN 2.0 SPEC -- song title",
-                "type": "string",
-            },
-            "og:audio:artist": {
-                "description": "NOT IN 2.0 SPEC -- song artist",
-                "type": "string",
-            },
-            "og:audio:album": {
-                "description": "NOT IN 2.0 SPEC -- song album",
-                "type": "string",
-            },
-        },
-    },
-    "og:determiner": {
-        "required": False,
-        "description": """The word that appears before this object's title in a sentence. An enum of (a, an, the, "", auto). If auto is chosen, the consumer of your data should chose between "a" or "an". Default is "" (blank).""",
-        "type": "enum",
-        "enums": ("a", "an", "the", "", "auto"),
-    },
-    "og:locale": {
-        "required": False,
-        "description": """The locale these tags are marked up in. Of the format language_TERRITORY. Default is en_US.""",
-        "type": "string",
-    },
-    "og:locale:alternate": {
-        "required": False,
-        "description": """An array of other locales this page is available in..""",
-        "type": "string",
-        "array_allowed": True,
-    },
-    "og:video": {
-        "required": False,
-        "description": "A URL to a video file that complements this object. set content to url of video file. You may specify more than one og:video. If you specify more than one og:video, then og:video:type is required for each video. You must include a valid og:image for your video to be displayed in the news feed.",
-        "properties": {
-            "og:video:secure_url": {
-                "description": " An alternate url to use if the webpage requires HTTPS.",
-                "type": "url",
-            },
-            "og:video:type": {
-                "description": "A MIME type for this video.",
-                "type": "string",
-            },
-            "og:video:width": {
-                "description": "The number of pixels wide.",
-                "type": "integer",
-            },
-            "og:video:height": {
-                "description": "The number of pixels high.",
-                "type": "integer",
-            },
-        },
-    },
-}
-facebook_extensions = {
-    "fb:admins": {
-        "required": False,
-        "description": 'To associate the page with your Facebook account, add the additional property fb:admins to your page with a comma-separated list of the user IDs or usernames of the Facebook accounts who own the page, e.g.: <meta property="fb:admins" content="USER_ID1,USER_ID2"/>',
-    },
-    "fb:app_id": {
-        "required": False,
-        "description": "A Facebook Platform application ID that administers this page.",
-    },
-}
 
-# deprecated
-og_properties = OG_PROPERTIES
+def __getattr__(name: str) -> typing.Any:
+    """loads the lazy module attributes on first access; see PEP 562"""
+    if name in _SCHEMA_NAMES:
+        _load_schema()
+        return globals()[name]
+    if name == "html_attribute_escape":
+        from metadata_utils import html_attribute_escape
+
+        globals()[name] = html_attribute_escape
+        return html_attribute_escape
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
 
 class OGErrors(dict):
@@ -581,66 +118,288 @@ class OGErrors(dict):
         self["not_validated"] = []
 
 
-def validate_item(
-    info_dict: typing.Dict[str, typing.Any],
-    value: typing.Any,
-) -> bool:
-    if info_dict["type"] == "string":
-        if isinstance(value, str):
-            return True
-        return False
+class ErrorCode(enum.IntEnum):
+    """
+    A kind of validation error.  The level and message of each code are in
+    `ERROR_INFO`; every critical code is lower than every other code.
+    """
 
-    elif info_dict["type"] == "boolean":
-        try:
-            _success = (0, 1, "true", "false").index(value)  # noqa: F841
-            return True
-        except ValueError:
-            return False
+    MISSING_REQUIRED = 1
+    REQUIRED_INVALID = 2
+    MISSING_REQUIRED_SUBTYPE = 3
+    REQUIRED_SUBTYPE_INVALID = 4
+    MISSING_OG_TYPE = 5
+    INVALID_OG_TYPE = 6
+    UNSUPPORTED = 7
+    RECOMMENDED_INVALID = 8
+    MISSING_RECOMMENDED_SUBTYPE = 9
+    RECOMMENDED_SUBTYPE_INVALID = 10
+    NOT_VALIDATED = 11
+    # reported by `opengraph_writer.images`
+    IMAGE_UNREADABLE = 12
+    IMAGE_UNSUPPORTED_FORMAT = 13
+    IMAGE_TOO_SMALL = 14
+    IMAGE_ASPECT_RATIO = 15
+    # reported by `opengraph_writer.resolver`
+    REFERENCE_UNREACHABLE = 16
+    REFERENCE_TYPE_MISMATCH = 17
 
-    elif info_dict["type"] == "enum":
-        try:
-            _success = info_dict["enums"].index(value)  # noqa: F841
-            return True
-        except ValueError:
-            return False
 
-    elif info_dict["type"] == "integer":
-        try:
-            if isinstance(value, int):
+# code: (level, message)
+ERROR_INFO: typing.Dict[ErrorCode, typing.Tuple[str, str]] = {
+    ErrorCode.MISSING_REQUIRED: ("critical", "Missing Required Element"),
+    ErrorCode.REQUIRED_INVALID: ("critical", "Required Element does not validate"),
+    ErrorCode.MISSING_REQUIRED_SUBTYPE: ("critical", "Missing required subtype"),
+    ErrorCode.REQUIRED_SUBTYPE_INVALID: (
+        "critical",
+        "Required subtype does not validate correctly",
+    ),
+    ErrorCode.MISSING_OG_TYPE: ("critical", "Missing og:type"),
+    ErrorCode.INVALID_OG_TYPE: ("critical", "Invalid og:type"),
+    ErrorCode.UNSUPPORTED: ("critical", "Unsupported Element"),
+    ErrorCode.RECOMMENDED_INVALID: (
+        "recommended",
+        "non-required Element does not validate",
+    ),
+    ErrorCode.MISSING_RECOMMENDED_SUBTYPE: (
+        "recommended",
+        "non-required subtype not included",
+    ),
+    ErrorCode.RECOMMENDED_SUBTYPE_INVALID: (
+        "recommended",
+        "non-required subtype does not validate correctly",
+    ),
+    ErrorCode.NOT_VALIDATED: ("not_validated", ""),
+    ErrorCode.IMAGE_UNREADABLE: ("recommended", "Image could not be read"),
+    ErrorCode.IMAGE_UNSUPPORTED_FORMAT: (
+        "recommended",
+        "Image format is not supported",
+    ),
+    ErrorCode.IMAGE_TOO_SMALL: (
+        "recommended",
+        "Image is smaller than the minimum size",
+    ),
+    ErrorCode.IMAGE_ASPECT_RATIO: (
+        "recommended",
+        "Image aspect ratio is greater than the maximum",
+    ),
+    ErrorCode.REFERENCE_UNREACHABLE: (
+        "recommended",
+        "Referenced url could not be resolved",
+    ),
+    ErrorCode.REFERENCE_TYPE_MISMATCH: (
+        "recommended",
+        "Referenced url does not have the expected og:type",
+    ),
+}
+
+# every code below this is critical
+_CRITICAL_BELOW = ErrorCode.RECOMMENDED_INVALID
+
+
+class ErrorCodes(dict):
+    """
+    The errors of a validation, compactly: a mapping of each field which has
+    an error to its `ErrorCode`.  Items store these; the messages of `OGErrors`
+    are only looked up when `errors()` is called.
+    """
+
+    __slots__ = ()
+
+    def has_critical(self) -> bool:
+        for code in self.values():
+            if code < _CRITICAL_BELOW:
                 return True
+        return False
+
+    def level_counts(self) -> typing.Dict[str, int]:
+        """the number of errors at each level"""
+        counts = {"critical": 0, "recommended": 0, "not_validated": 0}
+        for code in self.values():
+            counts[ERROR_INFO[code][0]] += 1
+        return counts
+
+    def fill(self, errors: OGErrors) -> OGErrors:
+        """(re)fills `errors`, in place, with the messages for these codes"""
+        not_validated = errors["not_validated"]
+        errors["critical"].clear()
+        errors["recommended"].clear()
+        del not_validated[:]
+        for field, code in self.items():
+            (level, message) = ERROR_INFO[code]
+            if level == "not_validated":
+                not_validated.append(field)
             else:
-                # coercing an int(value) into a string should catch utf8&string types, and fail on floats
-                # this can raise a valueerror though
-                if value == "%s" % int(value):
-                    return True
-        except ValueError:
-            return False
+                errors[level][field] = message
+        return errors
 
-    elif info_dict["type"] == "datetime":
-        if isinstance(value, (datetime.date, datetime.datetime)):
-            return True
-        if isinstance(value, str):
-            for test in regex_dates:
-                if re.match(regex_dates[test], value):
-                    return True
-            return False
+    def as_errors(self) -> OGErrors:
+        """a new `OGErrors` for these codes"""
+        return self.fill(OGErrors())
 
-    elif info_dict["type"] == "url":
-        if re.match(regex_url, value):
-            return True
+    def __reduce__(self) -> typing.Any:
+        # a `dict` subclass with `__slots__` has no state of its own to pickle
+        return (self.__class__, (dict(self),))
+
+
+# canonical base-10 integers; the same strings `"%s" % int(value)` round-trips
+_regex_integer = re.compile("0|-?[1-9][0-9]*")
+
+_VALUES_BOOLEAN = frozenset((0, 1, "true", "false"))
+
+# typing
+_VALIDATOR = typing.Callable[[typing.Any], bool]
+_VALIDATOR_FACTORY = typing.Callable[[typing.Dict[str, typing.Any]], _VALIDATOR]
+
+
+def _validate_string(value: typing.Any) -> bool:
+    return isinstance(value, str)
+
+
+def _validate_boolean(value: typing.Any) -> bool:
+    try:
+        return value in _VALUES_BOOLEAN
+    except TypeError:
+        # unhashable
         return False
 
-    elif info_dict["type"] == "profile":
-        # TODO
-        # this involves looking for other fields.
+
+def _validate_integer(value: typing.Any) -> bool:
+    if isinstance(value, int):
         return True
+    if isinstance(value, str):
+        return _regex_integer.fullmatch(value) is not None
+    return False
 
+
+def _validate_datetime(value: typing.Any) -> bool:
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return True
+    if isinstance(value, str):
+        return _regex_dates_combined.match(value) is not None
     return False
 
 
+def _validate_url(value: typing.Any) -> bool:
+    if isinstance(value, str):
+        return regex_url.match(value) is not None
+    return False
+
+
+def _validate_profile(value: typing.Any) -> bool:
+    # a profile is the url of a page whose og:type is "profile", which can only
+    # be checked by fetching it; `opengraph_writer.resolver` does that, as an
+    # opt-in async step (`OpenGraphItem.validate_async()`)
+    return True
+
+
+def _validate_invalid(value: typing.Any) -> bool:
+    return False
+
+
+def _factory_enum(info_dict: typing.Dict[str, typing.Any]) -> _VALIDATOR:
+    enums = frozenset(info_dict["enums"])
+
+    def _validate_enum(value: typing.Any) -> bool:
+        try:
+            return value in enums
+        except TypeError:
+            # unhashable
+            return False
+
+    return _validate_enum
+
+
+def _simple_factory(validator: _VALIDATOR) -> _VALIDATOR_FACTORY:
+    def _factory(info_dict: typing.Dict[str, typing.Any]) -> _VALIDATOR:
+        return validator
+
+    return _factory
+
+
+def _schema_factory(validator: _VALIDATOR) -> _VALIDATOR_FACTORY:
+    """`_simple_factory`, for validators which use the schema's regexes"""
+
+    def _factory(info_dict: typing.Dict[str, typing.Any]) -> _VALIDATOR:
+        _load_schema()
+        return validator
+
+    return _factory
+
+
+# maps a property "type" to a factory, which is called once per property with
+# the property's info dict when the schema is compiled and returns the
+# validator for that property
+VALIDATORS: typing.Dict[str, _VALIDATOR_FACTORY] = {
+    "string": _simple_factory(_validate_string),
+    "boolean": _simple_factory(_validate_boolean),
+    "enum": _factory_enum,
+    "integer": _simple_factory(_validate_integer),
+    "datetime": _schema_factory(_validate_datetime),
+    "url": _schema_factory(_validate_url),
+    "profile": _simple_factory(_validate_profile),
+    # references to another object, by url; see `opengraph_writer.resolver`
+    "music.album": _schema_factory(_validate_url),
+    "music.song": _schema_factory(_validate_url),
+    "video.tv_show": _schema_factory(_validate_url),
+}
+
+
+def register_validator(
+    type_name: str,
+    validator: _VALIDATOR,
+) -> None:
+    """
+    Register `validator` for properties of `type_name`.
+
+    :param type_name: the "type" of a property in `OG_PROPERTIES`
+    :type type_name: str
+    :param validator: a callable which accepts a value and returns a bool
+    :type validator: callable
+    """
+    register_validator_factory(type_name, _simple_factory(validator))
+
+
+def register_validator_factory(
+    type_name: str,
+    factory: _VALIDATOR_FACTORY,
+) -> None:
+    """
+    Register a validator `factory` for properties of `type_name`.
+
+    The factory is called with each property's info dict when the schema is
+    compiled, and must return a callable which accepts a value and returns a
+    bool.  Use this if the validator depends on the property, like "enum".
+
+    :param type_name: the "type" of a property in `OG_PROPERTIES`
+    :type type_name: str
+    :param factory: a callable which accepts an info dict and returns a validator
+    :type factory: callable
+    """
+    VALIDATORS[type_name] = factory
+    invalidate_property_index()
+
+
+def get_validator(info_dict: typing.Dict[str, typing.Any]) -> _VALIDATOR:
+    """returns the validator for a property's info dict"""
+    factory = VALIDATORS.get(info_dict.get("type", ""))
+    if factory is None:
+        return _validate_invalid
+    return factory(info_dict)
+
+
+def validate_item(
+    info_dict: typing.Dict[str, typing.Any],
+    value: typing.Any,
+) -> bool:
+    return get_validator(info_dict)(value)
+
+
 def stringify(value: typing.Any) -> str:
     """turns a value into a string if needed"""
-    if isinstance(value, bool):
+    if isinstance(value, str):
+        return value
+    elif isinstance(value, bool):
         if value:
             return "true"
         return "false"
@@ -648,21 +407,392 @@ def stringify(value: typing.Any) -> str:
         return value.isoformat()
     elif isinstance(value, datetime.date):
         return value.isoformat()
-    return value
+    return str(value)
+
+
+class PropertySpec(object):
+    """
+    A compiled entry of the property index.
+
+    `og_type` is `None` for properties which are valid on every object, or the
+    `valid_types-2` og:type which the property is a subproperty of.
+    """
+
+    __slots__ = (
+        "name",
+        "info",
+        "required",
+        "og_type",
+        "array_allowed",
+        "validator",
+        "invalid",
+        "missing",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        info: typing.Dict[str, typing.Any],
+        required: bool = False,
+        og_type: typing.Optional[str] = None,
+    ) -> None:
+        self.name = name
+        self.info = info
+        self.required = required
+        self.og_type = og_type
+        self.array_allowed = bool(info.get("array_allowed"))
+        self.validator = get_validator(info)
+        # the `ErrorCode` reported when a value does not validate, and when
+        # the property is missing
+        self.missing: typing.Optional[ErrorCode]
+        if og_type is None:
+            if required:
+                self.invalid = ErrorCode.REQUIRED_INVALID
+                self.missing = ErrorCode.MISSING_REQUIRED
+            else:
+                self.invalid = ErrorCode.RECOMMENDED_INVALID
+                self.missing = None
+        else:
+            if required:
+                self.invalid = ErrorCode.REQUIRED_SUBTYPE_INVALID
+                self.missing = ErrorCode.MISSING_REQUIRED_SUBTYPE
+            else:
+                self.invalid = ErrorCode.RECOMMENDED_SUBTYPE_INVALID
+                self.missing = ErrorCode.MISSING_RECOMMENDED_SUBTYPE
+
+    def __repr__(self) -> str:
+        return "<PropertySpec %s type=%s>" % (self.name, self.info.get("type"))
+
+    def validate(self, value: typing.Any) -> bool:
+        if self.array_allowed and isinstance(value, list):
+            validator = self.validator
+            for i in value:
+                if not validator(i):
+                    return False
+            return True
+        return self.validator(value)
+
+
+class PropertyIndex(object):
+    """
+    A flattened view of `OG_PROPERTIES`, compiled once on first use.
+
+    `properties` maps every top-level property and every nested `properties`
+    entry (e.g. `og:image:width`) to a `PropertySpec`.
+    `types` maps every `valid_types-2` og:type to its own subproperties.
+    `required` lists the required top-level properties in schema order.
+    `validators` caches the generated validator of each og:type, and
+    `item_classes` the typed item classes of `opengraph_writer.typed`.
+    """
+
+    __slots__ = (
+        "properties",
+        "required",
+        "types",
+        "types_1",
+        "validators",
+        "item_classes",
+    )
+
+    def __init__(
+        self,
+        og_properties: typing.Dict[str, dict],
+    ) -> None:
+        properties: typing.Dict[str, PropertySpec] = {}
+        required: typing.List[str] = []
+        for name, info in og_properties.items():
+            _required = bool(info.get("required"))
+            properties[name] = PropertySpec(name, info, required=_required)
+            if _required:
+                required.append(name)
+            for subname, subinfo in info.get("properties", {}).items():
+                if subname not in properties:
+                    properties[subname] = PropertySpec(subname, subinfo)
+        types: typing.Dict[str, typing.Dict[str, PropertySpec]] = {}
+        _og_type = og_properties.get("og:type", {})
+        for og_type, type_info in _og_type.get("valid_types-2", {}).items():
+            _required = bool(type_info.get("required"))
+            types[og_type] = {
+                subname: PropertySpec(
+                    subname, subinfo, required=_required, og_type=og_type
+                )
+                for (subname, subinfo) in type_info["properties"].items()
+            }
+        self.properties = properties
+        self.required = tuple(required)
+        self.types = types
+        # pre-escape every property name for rendering
+        for name in itertools.chain(properties, *types.values()):
+            _meta_prefix(name)
+        self.types_1 = frozenset(_og_type.get("valid_types-1", ()))
+        self.validators: typing.Dict[str, typing.Callable[..., None]] = {}
+        self.item_classes: typing.Dict[str, type] = {}
+
+
+_property_index: typing.Optional[PropertyIndex] = None
+
+
+def get_property_index() -> PropertyIndex:
+    """returns the `PropertyIndex` for `OG_PROPERTIES`, compiling it if needed"""
+    global _property_index
+    if _property_index is None:
+        _load_schema()
+        _property_index = PropertyIndex(OG_PROPERTIES)
+    return _property_index
+
+
+def invalidate_property_index() -> None:
+    """discard the compiled index; call this after editing `OG_PROPERTIES`"""
+    global _property_index
+    _property_index = None
+
+
+# use the validators `opengraph_writer.codegen` generates for each og:type?
+GENERATED_VALIDATORS = True
+
+
+def _type_validator(
+    index: PropertyIndex,
+    og_type: str,
+    force: bool = False,
+) -> typing.Optional[typing.Callable[..., None]]:
+    """
+    the generated validator for a valid schema2 `og_type`, or `None` to use the
+    interpreted checks
+    """
+    if not (GENERATED_VALIDATORS or force):
+        return None
+    validator = index.validators.get(og_type)
+    if validator is None:
+        from .codegen import compile_type_validator
+
+        validator = index.validators[og_type] = compile_type_validator(index, og_type)
+    return validator
+
+
+# any of the characters `html_attribute_escape` replaces
+_regex_escapable = re.compile("[&<>\"']")
+
+
+def _escape(text: str) -> str:
+    """`html_attribute_escape`, which skips text that has nothing to escape"""
+    if _regex_escapable.search(text) is None:
+        return text
+    return _html_attribute_escape(text)
+
+
+def _load_html_attribute_escape(text: str) -> str:
+    """imports `html_attribute_escape` on the first call, then uses it"""
+    global _html_attribute_escape
+    from metadata_utils import html_attribute_escape
+
+    _html_attribute_escape = html_attribute_escape
+    return html_attribute_escape(text)
+
+
+# `metadata_utils.html_attribute_escape`, once it has been imported
+_html_attribute_escape: typing.Callable[[str], str] = _load_html_attribute_escape
+
+
+# the escaped `<meta property="..." content="` for each property
+# every property in the schema is added when the index is compiled, and up to
+# `MAX_META_PREFIXES` unknown properties are added as they are rendered
+MAX_META_PREFIXES = 4096
+_meta_prefixes: typing.Dict[str, str] = {}
+
+
+def _meta_prefix(field: str) -> str:
+    prefix = _meta_prefixes.get(field)
+    if prefix is None:
+        prefix = '<meta property="%s" content="' % _escape(field)
+        if len(_meta_prefixes) < MAX_META_PREFIXES:
+            _meta_prefixes[field] = prefix
+    return prefix
+
+
+def _render_tags(
+    field: str,
+    value: typing.Any,
+    error: str = "",
+) -> typing.List[str]:
+    """renders the `<meta>` tag(s) for a single field"""
+    prefix = _meta_prefix(field)
+    suffix = '"%s/>' % error
+    if isinstance(value, list):
+        return [prefix + _escape(stringify(i)) + suffix for i in value]
+    return [prefix + _escape(stringify(value)) + suffix]
+
+
+# the phases of a full validation
+# these are module-level so `opengraph_writer.instrumentation` can time them
+# `quiet` skips everything which can only produce "recommended" or
+# "not_validated" entries; `fail_fast` stops at the first critical error
+
+
+def _check_fields(
+    errors: ErrorCodes,
+    index: PropertyIndex,
+    fields: typing.Iterable[typing.Tuple[str, typing.Any]],
+    subtypes: typing.Optional[typing.Dict[str, PropertySpec]],
+    quiet: bool = False,
+    fail_fast: bool = False,
+    strict: bool = False,
+) -> None:
+    """a single pass over the fields an object actually has"""
+    properties = index.properties
+    for field, value in fields:
+        spec = properties.get(field)
+        if spec is None and subtypes is not None:
+            spec = subtypes.get(field)
+        if spec is None:
+            if strict:
+                errors[field] = ErrorCode.UNSUPPORTED
+                if fail_fast:
+                    return
+            elif not quiet:
+                errors[field] = ErrorCode.NOT_VALIDATED
+            continue
+        code = spec.invalid
+        if quiet and code >= _CRITICAL_BELOW:
+            continue
+        if not spec.validate(value):
+            errors[field] = code
+            if fail_fast and code < _CRITICAL_BELOW:
+                return
+
+
+def _check_required(
+    errors: ErrorCodes,
+    index: PropertyIndex,
+    data: typing.Mapping[str, typing.Any],
+    fail_fast: bool = False,
+) -> None:
+    for field in index.required:
+        if field not in data:
+            errors[field] = ErrorCode.MISSING_REQUIRED
+            if fail_fast:
+                return
+
+
+def _check_og_type(
+    errors: ErrorCodes,
+    index: PropertyIndex,
+    og_type: typing.Any,
+    subtypes: typing.Optional[typing.Dict[str, PropertySpec]],
+    schema1: bool,
+    schema2: bool,
+) -> None:
+    if schema1:
+        # schema1 only checks for validity of the valid type
+        if not og_type:
+            errors["og:type"] = ErrorCode.MISSING_OG_TYPE
+        elif not isinstance(og_type, str) or (og_type not in index.types_1):
+            errors["og:type"] = ErrorCode.INVALID_OG_TYPE
+
+    if schema2:
+        if not og_type:
+            errors["og:type"] = ErrorCode.MISSING_OG_TYPE
+        elif subtypes is None:
+            errors["og:type"] = ErrorCode.INVALID_OG_TYPE
+
+
+def _check_subtypes(
+    errors: ErrorCodes,
+    data: typing.Mapping[str, typing.Any],
+    subtypes: typing.Dict[str, PropertySpec],
+    quiet: bool = False,
+    fail_fast: bool = False,
+) -> None:
+    """note any subtypes of the og:type an object does not have"""
+    for subtype, spec in subtypes.items():
+        code = spec.missing
+        if subtype not in data and code is not None:
+            if code < _CRITICAL_BELOW:
+                errors[subtype] = code
+                if fail_fast:
+                    return
+            elif not quiet:
+                errors[subtype] = code
 
 
 class OpenGraphItem(object):
-    _data: _OG_DATA = {}
-    _errors: typing.Optional[OGErrors] = None
+    _data: typing.MutableMapping[str, typing.Any] = {}
+    _local: _OG_DATA = {}
+    _layer: typing.Optional["OpenGraphLayer"] = None
+    # the `ErrorCodes` of the last validation
+    _errors: typing.Optional[ErrorCodes] = None
+    # the `OGErrors` returned by `errors()`, built on first use after each
+    # validation
+    _errors_view: typing.Optional[OGErrors] = None
+    _content_hash: typing.Optional[str] = None
+    # the fields set since the last `validate()`; `None` if there is no
+    # validation to build on
+    _dirty: typing.Optional[typing.Set[str]] = None
+    # (index, schema1, schema2, strict) of the last complete validation
+    _validated_with: typing.Optional[
+        typing.Tuple[PropertyIndex, bool, bool, bool]
+    ] = None
+    # a cleared `ErrorCodes` kept by `reset()`, for the next validation to fill
+    _errors_spare: typing.Optional[ErrorCodes] = None
 
     def __init__(
         self,
         sets: typing.Optional[_OG_KV_MANY] = None,
+        layer: typing.Optional["OpenGraphLayer"] = None,
     ) -> None:
-        self._data = {}
+        """
+        :param sets: (field, value) pairs to `set()`
+        :type sets: list
+        :param layer: an `OpenGraphLayer` of defaults this object is built on
+            top of. Fields set on this object shadow the layer's fields.
+        :type layer: OpenGraphLayer
+        """
+        self._local = {}
+        if layer is None:
+            self._data = self._local
+        else:
+            self._data = ChainMap(self._local, *layer._maps)
+            self._layer = layer
         if sets:
             self.set_many(sets)
 
+    def __getstate__(self) -> typing.Dict[str, typing.Any]:
+        # the property index holds the validators, which can not be pickled;
+        # without it the next `validate()` checks every field again
+        state = self.__dict__.copy()
+        state.pop("_validated_with", None)
+        state.pop("_dirty", None)
+        return state
+
+    def reset(
+        self,
+        layer: typing.Optional["OpenGraphLayer"] = None,
+    ) -> None:
+        """
+        Empty the object in place, as if it were newly created on `layer`, so
+        that it can be reused.
+
+        :param layer: an `OpenGraphLayer` of defaults this object is built on
+            top of.
+        :type layer: OpenGraphLayer
+        """
+        self._local.clear()
+        if layer is not self._layer:
+            if layer is None:
+                self._data = self._local
+            else:
+                self._data = ChainMap(self._local, *layer._maps)
+            self._layer = layer
+        errors = self._errors
+        if errors is not None:
+            errors.clear()
+            self._errors_spare = errors
+            self._errors = None
+        self._errors_view = None
+        self._content_hash = None
+        self._dirty = None
+        self._validated_with = None
+
     def set_many(
         self,
         pairs: _OG_KV_MANY,
@@ -677,6 +807,9 @@ class OpenGraphItem(object):
         value: str,
         append: bool = False,
     ) -> None:
+        self._content_hash = None
+        if self._dirty is not None:
+            self._dirty.add(field)
         if not append:
             self._data[field] = value
         else:
@@ -685,6 +818,9 @@ class OpenGraphItem(object):
             else:
                 if not isinstance(self._data[field], list):
                     self._data[field] = [self._data[field]]
+                elif field not in self._local:
+                    # never append to a list owned by a layer
+                    self._data[field] = list(self._data[field])
             self._data[field].append(value)
 
     def validate(
@@ -692,10 +828,22 @@ class OpenGraphItem(object):
         facebook: bool = False,
         schema1: bool = False,
         schema2: bool = True,
+        full: bool = False,
+        strict: bool = False,
+        quiet: bool = False,
+        fail_fast: bool = False,
     ) -> bool:
         """
         Validate the object
 
+        After the first call, only the fields which were `set()` since the
+        previous call are validated again, unless the og:type or the schema
+        changed.  The errors are updated in place.
+
+        `quiet` and `fail_fast` are for when only the returned status is
+        needed; `errors()` is then incomplete, and the next call validates
+        everything again.
+
         :param facebook: validate against the facebook extensions?
         :type resp: bool
         :param schema1: validate against schema1? Default: `False`.
@@ -706,6 +854,18 @@ class OpenGraphItem(object):
             This appears to be the current opengraph protocol.
             This will process both the og:type and the subtypes.
         :type resp: bool
+        :param full: validate every field, even if it was validated before?
+            Use this after changing a value in place.  Default: `False`
+        :type resp: bool
+        :param strict: report fields which are not in the schema, and so can
+            not be validated, as critical errors instead of "not_validated"?
+            Default: `False`
+        :type resp: bool
+        :param quiet: only look for critical errors; nothing "recommended" or
+            "not_validated" is collected. Default: `False`
+        :type resp: bool
+        :param fail_fast: stop at the first critical error. Default: `False`
+        :type resp: bool
 
         :rtype: bool
         """
@@ -714,142 +874,438 @@ class OpenGraphItem(object):
         if schema1 and schema2:
             raise ValueError("Validate against either schema1 or schema2")
 
-        errors = OGErrors()
-
-        def _set_error(
-            level: str,
-            item: str,
-            message: str,
-        ) -> None:
-            # if level not in errors:
-            #    errors[level]= {}
-            errors[level][item] = message
-
-        validate_fields = set(self._data.keys())
-
-        # make sure that everything in OG_PROPERTIES:
-        # 1) is present if required
-        # 2) is valid if not required
-        # 3) is valid if not required
-        for i in OG_PROPERTIES:
-            if OG_PROPERTIES[i]["required"]:
-                if i not in self._data:
-                    _set_error("critical", i, "Missing Required Element")
-                else:
-                    # required; check validity
-                    validate_fields.remove(i)
-                    if not validate_item(OG_PROPERTIES[i], self._data[i]):
-                        _set_error("critical", i, "Required Element does not validate")
-            else:
-                # not required; check validity
-                if i in self._data:
-                    validate_fields.remove(i)
-                    if not validate_item(OG_PROPERTIES[i], self._data[i]):
-                        _set_error(
-                            "recommended", i, "non-required Element does not validate"
-                        )
-
-        og_type = self._data.get("og:type")
-
-        if schema1:
-            # schema1 only checks for validity of the valid type
-            if not og_type:
-                _set_error("critical", "og:type", "Missing og:type")
-            else:
-                if og_type not in OG_PROPERTIES["og:type"]["valid_types-1"]:
-                    _set_error("critical", "og:type", "Invalid og:type")
-
-        if schema2:
-            if not og_type:
-                _set_error("critical", "og:type", "Missing og:type")
-            else:
-                if og_type not in OG_PROPERTIES["og:type"]["valid_types-2"]:
-                    _set_error("critical", "og:type", "Invalid og:type")
-                else:
-                    # validate all the likely subtypes
-                    og_type_dict = OG_PROPERTIES["og:type"]["valid_types-2"][og_type]
-                    for subtype in OG_PROPERTIES["og:type"]["valid_types-2"][og_type][
-                        "properties"
-                    ]:
-                        subtype_dict = og_type_dict["properties"][subtype]
-                        value = None
-                        if subtype in self._data:
-                            value = self._data[subtype]
-                        if "required" in og_type_dict and og_type_dict["required"]:
-                            if subtype not in OG_PROPERTIES:
-                                _set_error(
-                                    "critical",
-                                    "%s" % subtype,
-                                    "Missing required subtype",
-                                )
-                            else:
-                                validate_fields.remove(subtype)
-                                if not validate_item(subtype_dict, value):
-                                    _set_error(
-                                        "critical",
-                                        "%s" % subtype,
-                                        "Required subtype does not validate correctly",
-                                    )
-                        else:
-                            if subtype not in self._data:
-                                _set_error(
-                                    "recommended",
-                                    "%s" % subtype,
-                                    "non-required subtype not included",
-                                )
-                            else:
-                                validate_fields.remove(subtype)
-                                if not validate_item(subtype_dict, value):
-                                    _set_error(
-                                        "recommended",
-                                        "%s" % subtype,
-                                        "non-required subtype does not validate correctly",
-                                    )
-
-        if validate_fields:
-            errors["not_validated"] = list(validate_fields)
+        index = get_property_index()
+        _validate_with = (index, schema1, schema2, strict)
+        dirty = self._dirty
+        if quiet or fail_fast:
+            errors = self._validate_full(
+                index, schema1, schema2, strict, quiet=quiet, fail_fast=fail_fast
+            )
+            # partial errors can not be built on
+            self._errors = errors
+            self._errors_view = None
+            self._dirty = None
+            self._validated_with = None
+            return not errors.has_critical()
+        if (
+            full
+            or (dirty is None)
+            or (self._errors is None)
+            or (self._validated_with != _validate_with)
+            or ("og:type" in dirty)
+        ):
+            errors = self._validate_full(index, schema1, schema2, strict)
+        else:
+            errors = self._errors
+            if dirty:
+                self._validate_fields(errors, index, schema2, strict, dirty)
         self._errors = errors
-        if errors["critical"]:
+        self._errors_view = None
+        self._dirty = set()
+        self._validated_with = _validate_with
+        if errors.has_critical():
             return False
         return True
 
+    async def validate_async(
+        self,
+        resolver: typing.Optional["ReferenceResolver"] = None,
+        **validate_kwargs: bool,
+    ) -> bool:
+        """
+        `validate()`, then check the urls the object references with
+        `resolver`, an `opengraph_writer.resolver.ReferenceResolver`.
+
+        Reference errors are "recommended", so do not change the returned
+        status.  References are not checked with `quiet` or `fail_fast`.
+
+        :param resolver: Default: None
+        :type resolver: ReferenceResolver
+        :param validate_kwargs: passed to `validate()`
+
+        :rtype: bool
+        """
+        status = self.validate(**validate_kwargs)
+        if resolver is not None and not (
+            validate_kwargs.get("quiet") or validate_kwargs.get("fail_fast")
+        ):
+            await resolver.check_item(self)
+        return status
+
+    def _validate_fields(
+        self,
+        errors: ErrorCodes,
+        index: PropertyIndex,
+        schema2: bool,
+        strict: bool,
+        fields: typing.Iterable[str],
+    ) -> None:
+        """revalidates `fields` in place, for the current og:type"""
+        data = self._data
+        og_type = data.get("og:type")
+        subtypes = (
+            index.types.get(og_type) if (schema2 and isinstance(og_type, str)) else None
+        )
+        for field in fields:
+            errors.pop(field, None)
+            spec = index.properties.get(field)
+            if spec is None and subtypes is not None:
+                spec = subtypes.get(field)
+            if field not in data:
+                if spec is not None and spec.missing is not None:
+                    errors[field] = spec.missing
+            elif spec is None:
+                if strict:
+                    errors[field] = ErrorCode.UNSUPPORTED
+                else:
+                    errors[field] = ErrorCode.NOT_VALIDATED
+            elif not spec.validate(data[field]):
+                errors[field] = spec.invalid
+
+    def _validate_full(
+        self,
+        index: PropertyIndex,
+        schema1: bool,
+        schema2: bool,
+        strict: bool = False,
+        quiet: bool = False,
+        fail_fast: bool = False,
+    ) -> ErrorCodes:
+        errors = self._errors_spare
+        if errors is None:
+            errors = ErrorCodes()
+        else:
+            self._errors_spare = None
+        data = self._data
+        og_type = data.get("og:type")
+        subtypes = (
+            index.types.get(og_type) if (schema2 and isinstance(og_type, str)) else None
+        )
+
+        fields: typing.Iterable[typing.Tuple[str, typing.Any]]
+        layer = self._layer
+        if layer is None:
+            fields = data.items()
+        else:
+            # the layer has already validated every field it can on its own;
+            # only the fields which depend on the og:type are checked again
+            local = self._local
+            (layer_errors, layer_deferred) = layer._compiled(index)
+            for field, code in layer_errors.items():
+                if field not in local and not (quiet and code >= _CRITICAL_BELOW):
+                    errors[field] = code
+            fields = itertools.chain(
+                local.items(),
+                ((f, data[f]) for f in layer_deferred if f not in local),
+            )
+
+        if subtypes is not None and not (schema1 or fail_fast):
+            # the og:type is valid under schema2; see `opengraph_writer.codegen`
+            validator = _type_validator(index, typing.cast(str, og_type))
+            if validator is not None:
+                validator(errors, data, fields, quiet, strict)
+                return errors
+
+        if fail_fast:
+            # the cheapest checks first
+            if errors.has_critical():
+                return errors
+            _check_og_type(errors, index, og_type, subtypes, schema1, schema2)
+            if errors.has_critical():
+                return errors
+            _check_required(errors, index, data, True)
+            if errors.has_critical():
+                return errors
+            _check_fields(errors, index, fields, subtypes, quiet, True, strict)
+            if errors.has_critical():
+                return errors
+            if subtypes is not None:
+                _check_subtypes(errors, data, subtypes, quiet, True)
+            return errors
+
+        _check_fields(errors, index, fields, subtypes, quiet, False, strict)
+        _check_required(errors, index, data)
+        _check_og_type(errors, index, og_type, subtypes, schema1, schema2)
+        if subtypes is not None:
+            _check_subtypes(errors, data, subtypes, quiet)
+        return errors
+
     def errors(self) -> OGErrors:
+        """
+        The errors of the last validation, with their messages.  A new object
+        is built after each validation; one returned earlier is not changed.
+        """
+        view = self._errors_view
+        if view is None:
+            view = self._errors_view = self.error_codes().as_errors()
+        return view
+
+    def error_codes(self) -> ErrorCodes:
+        """the errors of the last validation, as `ErrorCode`s"""
         if self._errors is None:
             raise ValueError("You must call `.validate()` first")
         return self._errors
 
+    def content_hash(self) -> str:
+        """
+        A stable hash of the object's data, which is identical for identical
+        objects across processes.  It is cached until the next `set()`.
+        """
+        if self._content_hash is None:
+            _serialized = repr(sorted(self._data.items())).encode("utf-8")
+            self._content_hash = hashlib.blake2b(
+                _serialized, digest_size=16
+            ).hexdigest()
+        return self._content_hash
+
+    def render_key(
+        self,
+        debug: bool = False,
+    ) -> str:
+        """the key `as_html(debug=debug)` is cached under by a `RenderCache`"""
+        if not debug or self._errors is None:
+            return "%s:0" % self.content_hash()
+        _errors = repr(
+            sorted(
+                (field, int(code))
+                for (field, code) in self._errors.items()
+                if code != ErrorCode.NOT_VALIDATED
+            )
+        ).encode("utf-8")
+        return "%s:1:%s" % (
+            self.content_hash(),
+            hashlib.blake2b(_errors, digest_size=8).hexdigest(),
+        )
+
     def as_html(
         self,
         debug: bool = False,
+        cache: typing.Optional["RenderCache"] = None,
     ) -> str:
-        _output = []
-        _keys = sorted(self._data.keys())
+        """
+        Render the object as html `<meta>` tags.
+
+        :param debug: include the validation errors on each tag?
+        :type debug: bool
+        :param cache: a `opengraph_writer.caching.RenderCache` to render through
+        :type cache: RenderCache
+
+        :rtype: str
+        """
         if self._errors is None:
             return ""
-        for k in _keys:
-            v = self._data[k]
+        if cache is not None:
+            return cache.render(self, debug=debug)
+        return self._render_html(debug)
+
+    def as_html_iter(
+        self,
+        debug: bool = False,
+    ) -> typing.Iterator[str]:
+        """
+        Yield the object's html one `<meta>` tag at a time.
+
+        `"\n".join(item.as_html_iter())` is identical to `item.as_html()`.
+
+        :param debug: include the validation errors on each tag?
+        :type debug: bool
+        """
+        _errors = self._errors
+        if _errors is None:
+            return
+        _fragments = self._layer._fragments if self._layer is not None else None
+        for k in sorted(self._data.keys()):
             _error = ""
             if debug:
-                if k in self._errors["critical"]:
-                    _error = ' critical-error="%s"' % html_attribute_escape(
-                        self._errors["critical"][k]
-                    )
-                elif k in self._errors["recommended"]:
-                    _error = ' recommended-error="%s"' % html_attribute_escape(
-                        self._errors["recommended"][k]
-                    )
-            if isinstance(v, list):
-                for i in v:
-                    i = stringify(i)
-                    _output.append(
-                        """<meta property="%s" content="%s"%s/>"""
-                        % (html_attribute_escape(k), html_attribute_escape(i), _error)
-                    )
+                code = _errors.get(k)
+                if code is not None and code != ErrorCode.NOT_VALIDATED:
+                    (level, message) = ERROR_INFO[code]
+                    _error = ' %s-error="%s"' % (level, _escape(message))
+            if _fragments is not None and not _error and k not in self._local:
+                # pre-rendered by the layer
+                yield from _fragments[k]
             else:
-                v = stringify(v)
-                _output.append(
-                    """<meta property="%s" content="%s"%s/>"""
-                    % (html_attribute_escape(k), html_attribute_escape(v), _error)
-                )
-        output = "\n".join(_output)
-        return output
+                yield from _render_tags(k, self._data[k], _error)
+
+    def write_html(
+        self,
+        fp: typing.Any,
+        debug: bool = False,
+        encoding: typing.Optional[str] = None,
+    ) -> None:
+        """
+        Write the object's html to `fp` one `<meta>` tag at a time.
+
+        The output is identical to `as_html()`.
+
+        :param fp: a file-like object, or a callable such as a WSGI `write`
+        :type fp: file or callable
+        :param debug: include the validation errors on each tag?
+        :type debug: bool
+        :param encoding: if provided, write `bytes` in this encoding
+        :type encoding: str
+        """
+        write = getattr(fp, "write", fp)
+        _separator = ""
+        for tag in self.as_html_iter(debug=debug):
+            if encoding:
+                write((_separator + tag).encode(encoding))
+            else:
+                write(_separator + tag)
+            _separator = "\n"
+
+    def _render_html(
+        self,
+        debug: bool = False,
+    ) -> str:
+        return "\n".join(self.as_html_iter(debug=debug))
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the object's data, and errors, in a compact binary format.
+        See `opengraph_writer.serialization`.
+
+        :rtype: bytes
+        """
+        from .serialization import to_bytes
+
+        return to_bytes(self)
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "OpenGraphItem":
+        """the inverse of `to_bytes()`"""
+        from .serialization import from_bytes
+
+        return from_bytes(payload, cls)
+
+    def to_json(self) -> str:
+        """
+        Serialize the object's data, and errors, as JSON.
+        See `opengraph_writer.serialization`.
+
+        :rtype: str
+        """
+        from .serialization import to_json
+
+        return to_json(self)
+
+    @classmethod
+    def from_json(cls, text: typing.Union[str, bytes]) -> "OpenGraphItem":
+        """the inverse of `to_json()`"""
+        from .serialization import from_json
+
+        return from_json(text, cls)
+
+    def __reduce_ex__(self, protocol: typing.Any) -> typing.Any:
+        # through the binary format, if it reads back exactly what is written:
+        # not for subclasses, layers, or values it would change
+        if type(self) is OpenGraphItem and self._layer is None:
+            from .serialization import _lossless
+            from .serialization import from_bytes
+            from .serialization import to_bytes
+
+            if _lossless(self):
+                return (from_bytes, (to_bytes(self),))
+        return super().__reduce_ex__(protocol)
+
+
+class OpenGraphLayer(object):
+    """
+    An immutable set of defaults which `OpenGraphItem`s are built on top of.
+
+    Nothing is copied into the items; they look fields up through the layer.
+    The layer validates and renders its own fields once, and every item built
+    on top of it reuses those results for the fields it does not override.
+
+        site = OpenGraphLayer((("og:site_name", "IMDb"), ("fb:app_id", "1")))
+        section = OpenGraphLayer((("og:type", "video.movie"),), parent=site)
+        item = section.new_item((("og:title", "The Rock"),))
+
+    Multiple values are provided as a list, e.g. `("og:image", [url1, url2])`.
+    A layer's fields should not be changed after it is created.
+
+    :param sets: (field, value) pairs
+    :type sets: list
+    :param parent: another `OpenGraphLayer` this layer is on top of
+    :type parent: OpenGraphLayer
+    """
+
+    _maps: typing.Tuple[_OG_DATA, ...]
+    _fragments: typing.Dict[str, typing.Tuple[str, ...]]
+    _compiled_cache: typing.Optional[
+        typing.Tuple[
+            PropertyIndex,
+            typing.Dict[str, ErrorCode],
+            typing.Tuple[str, ...],
+        ]
+    ] = None
+
+    def __init__(
+        self,
+        sets: typing.Optional[_OG_KV_MANY] = None,
+        parent: typing.Optional["OpenGraphLayer"] = None,
+    ) -> None:
+        own: _OG_DATA = {}
+        for field, value in sets or ():
+            if isinstance(value, list):
+                value = list(value)
+            own[field] = value
+        self._maps = (own,) + (parent._maps if parent is not None else ())
+        self._data = ChainMap(*self._maps)
+        self._fragments = {
+            field: tuple(_render_tags(field, value))
+            for (field, value) in self._data.items()
+        }
+
+    def __getstate__(self) -> typing.Dict[str, typing.Any]:
+        # compiled against a property index, which can not be pickled
+        state = self.__dict__.copy()
+        state.pop("_compiled_cache", None)
+        return state
+
+    def __contains__(self, field: str) -> bool:
+        return field in self._data
+
+    def __getitem__(self, field: str) -> typing.Any:
+        return self._data[field]
+
+    def get(self, field: str, default: typing.Any = None) -> typing.Any:
+        return self._data.get(field, default)
+
+    def keys(self) -> typing.KeysView[str]:
+        return self._data.keys()
+
+    def new_item(
+        self,
+        sets: typing.Optional[_OG_KV_MANY] = None,
+    ) -> OpenGraphItem:
+        """returns a new `OpenGraphItem` on top of this layer"""
+        return OpenGraphItem(sets, layer=self)
+
+    def _compiled(
+        self,
+        index: PropertyIndex,
+    ) -> typing.Tuple[typing.Dict[str, ErrorCode], typing.Tuple[str, ...]]:
+        """
+        Returns the `ErrorCode` for every field which validates regardless of
+        og:type, and the fields which can only be validated once the og:type
+        is known.
+        """
+        _cached = self._compiled_cache
+        if _cached is None or _cached[0] is not index:
+            errors: typing.Dict[str, ErrorCode] = {}
+            deferred = []
+            for field, value in self._data.items():
+                spec = index.properties.get(field)
+                if spec is None:
+                    deferred.append(field)
+                elif not spec.validate(value):
+                    errors[field] = spec.invalid
+            _cached = self._compiled_cache = (index, errors, tuple(deferred))
+        return (_cached[1], _cached[2])
+
+
+if sys.version_info < (3, 7):
+    # module `__getattr__` needs python 3.7; load everything up front instead
+    for _name in _SCHEMA_NAMES + ("html_attribute_escape",):
+        __getattr__(_name)
@@ -0,0 +1,127 @@
+"""
+The batching, process pool and summary shared by the `cli` and `lint` commands.
+
+Each command has a function which handles a batch of inputs, returning its
+output lines and the stats of the batch.  The stats of a command are keyed by
+its `STATS_KEYS`: "valid", "invalid", "critical" and "recommended", and keys
+of its own for the inputs handled and the inputs which could not be handled.
+"""
+# stdlib
+from collections import deque
+from concurrent.futures import Executor
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+import sys
+import typing
+
+# typing
+_STATS = typing.Dict[str, int]
+_RESULT = typing.Tuple[typing.List[str], _STATS]
+_BATCH_FUNCTION = typing.Callable[[typing.Any, typing.Any], _RESULT]
+
+# ==============================================================================
+
+
+def new_stats(stats_keys: typing.Tuple[str, ...]) -> _STATS:
+    return dict.fromkeys(stats_keys, 0)
+
+
+def iter_batches(
+    inputs: typing.Iterable[typing.Any],
+    batch_size: int,
+) -> typing.Iterator[typing.Tuple[typing.Any, ...]]:
+    batch: typing.List[typing.Any] = []
+    for i in inputs:
+        batch.append(i)
+        if len(batch) >= batch_size:
+            yield tuple(batch)
+            batch = []
+    if batch:
+        yield tuple(batch)
+
+
+def map_bounded(
+    executor: Executor,
+    function: _BATCH_FUNCTION,
+    batches: typing.Iterator[typing.Any],
+    options: typing.Any,
+    max_pending: int,
+) -> typing.Iterator[_RESULT]:
+    """
+    like `executor.map(function, batches)`, in order, but only reads
+    `max_pending` batches ahead; `Executor.map` consumes its whole input up
+    front
+    """
+    pending: "deque[Future]" = deque()
+    for batch in batches:
+        pending.append(executor.submit(function, batch, options))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def run_batches(
+    function: _BATCH_FUNCTION,
+    batches: typing.Iterator[typing.Any],
+    options: typing.Any,
+    workers: int,
+    stats_keys: typing.Tuple[str, ...],
+) -> _STATS:
+    """
+    Calls `function(batch, options)` for each batch, across a process pool of
+    `workers` if more than 1, and writes the output lines to stdout in order.
+
+    :returns: the stats of every batch, added up
+    :rtype: dict
+    """
+    stats = new_stats(stats_keys)
+    results: typing.Iterator[_RESULT]
+    executor: typing.Optional[Executor] = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = map_bounded(executor, function, batches, options, workers * 2)
+    else:
+        results = (function(batch, options) for batch in batches)
+    try:
+        for outputs, _stats in results:
+            for output in outputs:
+                sys.stdout.write(output)
+                sys.stdout.write("\n")
+            for k, v in _stats.items():
+                stats[k] += v
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    sys.stdout.flush()
+    return stats
+
+
+def summarize(stats: _STATS, elapsed: float, handled: str, failed: str) -> int:
+    """
+    Writes a summary of `stats` to stderr.
+
+    :param handled: the key of the inputs handled, e.g. "items"
+    :param failed: the key of the inputs which could not be handled
+
+    :returns: the exit status; 1 if any input was invalid or not handled
+    :rtype: int
+    """
+    sys.stderr.write(
+        "%(handled)s %(handled_key)s in %(elapsed).2fs "
+        "(%(rate).0f %(handled_key)s/sec); "
+        "valid: %(valid)s, invalid: %(invalid)s, %(failed_key)s: %(failed)s; "
+        "critical errors: %(critical)s, recommended errors: %(recommended)s\n"
+        % dict(
+            stats,
+            handled=stats[handled],
+            handled_key=handled,
+            failed=stats[failed],
+            failed_key=failed,
+            elapsed=elapsed,
+            rate=(stats[handled] / elapsed) if elapsed else 0,
+        )
+    )
+    if stats["invalid"] or stats[failed]:
+        return 1
+    return 0
@@ -0,0 +1,531 @@
+"""
+The OpenGraph schema: `OG_PROPERTIES`, and the regexes its validators use.
+
+This is imported on first use, through `opengraph_writer`, rather than when
+`opengraph_writer` itself is imported.
+"""
+# stdlib
+import re
+import typing
+
+# ==============================================================================
+
+
+# http://en.wikipedia.org/wiki/ISO_8601
+regex_dates = {
+    #  Date    2012-02-02
+    "date": re.compile("^([0-9]{4})-(1[0-2]|0[1-9])-(3[0-1]|0[1-9]|[1-2][0-9])$"),
+    # Ordinal date:    2012-033
+    "ordinal_date": re.compile(
+        "^([0-9]{4})-(36[0-6]|3[0-5][0-9]|[12][0-9]{2}|0[1-9][0-9]|00[1-9])$"
+    ),
+    # Date with week number:   2012-W05-4
+    "week_number": re.compile("^([0-9]{4})-?W(5[0-3]|[1-4][0-9]|0[1-9])-?([1-7])$"),
+    # Separate date and time in UTC:   2012-02-02 15:29Z
+    "datetime, UTC": re.compile(
+        "^(-?(?:[1-9][0-9]*)?[0-9]{4})-(1[0-2]|0[1-9])-(3[0-1]|0[1-9]|[1-2][0-9])T(2[0-3]|[0-1][0-9]):([0-5][0-9]):([0-5][0-9])(.[0-9]+)?(Z|[+-](?:2[0-3]|[0-1][0-9]):[0-5][0-9])?$"
+    ),
+}
+
+
+# basically just testing that the string starts with http/https, and has some resemeblence of a domain on it.  after an optional trailing slash, i don't need to make this super accurate
+regex_url = re.compile(r"""^http[s]?:\/\/[a-z0-9.\-]+[.][a-z]{2,4}\/?""")
+
+
+OG_PROPERTIES: typing.Dict[str, dict] = {
+    "og:title": {
+        "required": True,
+        "description": 'The title of your object as it should appear within the graph, e.g., "The Rock".',
+        "type": "string",
+    },
+    "og:type": {
+        "required": True,
+        "description": 'The type of your object, e.g., "movie". See the complete list of supported types.',
+        "type": "string",
+        "valid_types-1": {
+            "activity": {"grouping": "Activities"},
+            "sport": {"grouping": "Activities"},
+            "bar": {"grouping": "Businesses"},
+            "company": {"grouping": "Businesses"},
+            "cafe": {"grouping": "Businesses"},
+            "hotel": {"grouping": "Businesses"},
+            "restaurant": {"grouping": "Businesses"},
+            "cause": {"grouping": "Groups"},
+            "sports_league": {"grouping": "Groups"},
+            "sports_team": {"grouping": "Groups"},
+            "band": {"grouping": "Organizations"},
+            "government": {"grouping": "Organizations"},
+            "non_profit": {"grouping": "Organizations"},
+            "school": {"grouping": "Organizations"},
+            "university": {"grouping": "Organizations"},
+            "actor": {"grouping": "People"},
+            "athlete": {"grouping": "People"},
+            "author": {"grouping": "People "},
+            "director": {"grouping": "People"},
+            "musician": {"grouping": "People"},
+            "politician": {"grouping": "People"},
+            "public_figure": {"grouping": "People"},
+            "city": {"grouping": "Places"},
+            "country": {"grouping": "Places"},
+            "landmark": {"grouping": "Places"},
+            "state_province": {"grouping": "Places"},
+            "album": {"grouping": "Products and Entertainment"},
+            "book": {"grouping": "Products and Entertainment"},
+            "drink": {"grouping": "Products and Entertainment"},
+            "food": {"grouping": "Products and Entertainment"},
+            "game": {"grouping": "Products and Entertainment"},
+            "product": {"grouping": "Products and Entertainment"},
+            "song": {"grouping": "Products and Entertainment"},
+            "movie": {"grouping": "Products and Entertainment"},
+            "tv_show": {"grouping": "Products and Entertainment"},
+            "blog": {"grouping": "Websites "},
+            "website": {"grouping": "Websites"},
+            "article": {"grouping": "Websites"},
+            "game.achievement": {
+                "grouping": "Game",
+                "properties": {
+                    "game:points": {"description": "POINTS_FOR_ACHIEVEMENT"}
+                },
+            },
+        },
+        "valid_types-2": {
+            "website": {"namespace": "http://ogp.me/ns/website#", "properties": {}},
+            "article": {
+                "namespace": "http://ogp.me/ns/article#",
+                "properties": {
+                    "article:published_time": {
+                        "type": "datetime",
+                        "description": "When the article was first published.",
+                    },
+                    "article:modified_time": {
+                        "type": "datetime",
+                        "description": "When the article was last changed.",
+                    },
+                    "article:expiration_time": {
+                        "type": "datetime",
+                        "description": "When the article is out of date after.",
+                    },
+                    "article:author": {
+                        "type": "profile",
+                        "description": "Writers of the article.",
+                        "array_allowed": True,
+                    },
+                    "article:section": {
+                        "type": "string",
+                        "description": "A high-level section name. E.g. Technology",
+                    },
+                    "article:tag": {
+                        "type": "string",
+                        "description": "Tag words associated with this article.",
+                        "array_allowed": True,
+                    },
+                },
+            },
+            "book": {
+                "namespace": "http://ogp.me/ns/book#",
+                "properties": {
+                    "book:author": {
+                        "type": "profile",
+                        "description": "Who wrote this book.",
+                        "array_allowed": True,
+                    },
+                    "book:isbn": {"type": "string", "description": "The ISBN"},
+                    "book:release_date": {
+                        "type": "datetime",
+                        "description": "The date the book was released.",
+                    },
+                    "book:tag": {
+                        "type": "string",
+                        "description": "Tag words associated with this book.",
+                        "array_allowed": True,
+                    },
+                },
+            },
+            "profile": {
+                "namespace": "http://ogp.me/ns/profile#",
+                "properties": {
+                    "profile:first_name": {
+                        "type": "string",
+                        "description": "first name",
+                    },
+                    "profile:last_name": {"type": "string", "description": "last name"},
+                    "profile:username": {
+                        "type": "string",
+                        "description": "A short unique string to identify them.",
+                    },
+                    "profile:gender": {
+                        "type": "enum",
+                        "enums": ["male", "female"],
+                        "description": "Their gender",
+                    },
+                },
+            },
+            "video.movie": {
+                "namespace": "http://ogp.me/ns/video#",
+                "properties": {
+                    "video:actor": {
+                        "type": "profile",
+                        "description": "actors in the movie",
+                        "array_allowed": True,
+                    },
+                    "video:actor:role": {
+                        "type": "string",
+                        "description": "the role they played",
+                    },
+                    "video:director": {
+                        "type": "profile",
+                        "description": "directors of the movie",
+                        "array_allowed": True,
+                    },
+                    "video:writer": {
+                        "type": "profile",
+                        "description": "writers of the movie",
+                        "array_allowed": True,
+                    },
+                    "video:duration": {
+                        "type": "integer",
+                        "description": "The movie's length in seconds",
+                    },
+                    "video:release_date": {
+                        "type": "datetime",
+                        "description": "The date the movie was released",
+                    },
+                    "video:tag": {
+                        "type": "string",
+                        "description": "Tag words associated with this video.",
+                        "array_allowed": True,
+                    },
+                },
+            },
+            "video.episode": {
+                "namespace": "http://ogp.me/ns/video#",
+                "properties": {
+                    "video:actor": {
+                        "type": "profile",
+                        "description": "actors in the movie",
+                        "array_allowed": True,
+                    },
+                    "video:actor:role": {
+                        "type": "string",
+                        "description": "the role they played",
+                    },
+                    "video:director": {
+                        "type": "profile",
+                        "description": "directors of the movie",
+                        "array_allowed": True,
+                    },
+                    "video:writer": {
+                        "type": "profile",
+                        "description": "writers of the movie",
+                        "array_allowed": True,
+                    },
+                    "video:duration": {
+                        "type": "integer",
+                        "description": "The movie's length in seconds",
+                    },
+                    "video:release_date": {
+                        "type": "datetime",
+                        "description": "The date the movie was released",
+                    },
+                    "video:tag": {
+                        "type": "string",
+                        "description": "Tag words associated with this video.",
+                        "array_allowed": True,
+                    },
+                    "video:series": {
+                        "type": "video.tv_show",
+                        "description": "Which series this episode belongs to.",
+                    },
+                },
+            },
+            "video.tv_show": {
+                "namespace": "http://ogp.me/ns/video#",
+                "properties": {
+                    "video:actor": {
+                        "type": "profile",
+                        "description": "actors in the movie",
+                        "array_allowed": True,
+                    },
+                    "video:actor:role": {
+                        "type": "string",
+                        "description": "the role they played",
+                    },
+                    "video:director": {
+                        "type": "profile",
+                        "description": "directors of the movie",
+                        "array_allowed": True,
+                    },
+                    "video:writer": {
+                        "type": "profile",
+                        "description": "writers of the movie",
+                        "array_allowed": True,
+                    },
+                    "video:duration": {
+                        "type": "integer",
+                        "description": "The movie's length in seconds",
+                    },
+                    "video:release_date": {
+                        "type": "datetime",
+                        "description": "The date the movie was released",
+                    },
+                    "video:tag": {
+                        "type": "string",
+                        "description": "Tag words associated with this video.",
+                        "array_allowed": True,
+                    },
+                },
+            },
+            "video.other": {
+                "namespace": "http://ogp.me/ns/video#",
+                "properties": {
+                    "video:actor": {
+                        "type": "profile",
+                        "description": "actors in the movie",
+                        "array_allowed": True,
+                    },
+                    "video:actor:role": {
+                        "type": "string",
+                        "description": "the role they played",
+                    },
+                    "video:director": {
+                        "type": "profile",
+                        "description": "directors of the movie",
+                        "array_allowed": True,
+                    },
+                    "video:writer": {
+                        "type": "profile",
+                        "description": "writers of the movie",
+                        "array_allowed": True,
+                    },
+                    "video:duration": {
+                        "type": "integer",
+                        "description": "The movie's length in seconds",
+                    },
+                    "video:release_date": {
+                        "type": "datetime",
+                        "description": "The date the movie was released",
+                    },
+                    "video:tag": {
+                        "type": "string",
+                        "description": "Tag words associated with this video.",
+                        "array_allowed": True,
+                    },
+                },
+            },
+            "music.song": {
+                "namespace": "http://ogp.me/ns/music#",
+                "properties": {
+                    "music:duration": {
+                        "type": "integer",
+                        "description": "The song's length in seconds",
+                    },
+                    "music:album": {
+                        "type": "music.album",
+                        "description": "The album this song is from.",
+                        "array_allowed": True,
+                    },
+                    "music:album:disc": {
+                        "type": "integer",
+                        "description": "Which disc of the album this song is on",
+                    },
+                    "music:album:track": {
+                        "type": "integer",
+                        "description": "Which track this song is",
+                    },
+                    "music:musician": {
+                        "type": "profile",
+                        "description": "The musician that made this song",
+                        "array_allowed": True,
+                    },
+                },
+            },
+            "music.album": {
+                "namespace": "http://ogp.me/ns/music#",
+                "properties": {
+                    "music:song": {
+                        "type": "music.song",
+                        "description": "The song on this album.",
+                    },
+                    "music:song:disc": {
+                        "type": "integer",
+                        "description": "the disc the song is on for the album",
+                    },
+                    "music:song:track": {
+                        "type": "integer",
+                        "description": "the track number the song is on for the album",
+                    },
+                    "music:musician": {
+                        "type": "profile",
+                        "description": "The musician that made this song",
+                    },
+                    "music:release_date": {
+                        "type": "datetime",
+                        "description": "The date the album was released.",
+                    },
+                },
+            },
+            "music.playlist": {
+                "namespace": "http://ogp.me/ns/music#",
+                "properties": {
+                    "music:song": {"type": "music.song", "description": "The song"},
+                    "music:song:disc": {
+                        "type": "integer",
+                        "description": "the disc the song is on for the album",
+                    },
+                    "music:song:track": {
+                        "type": "integer",
+                        "description": "the track number the song is on for the album",
+                    },
+                    "music:creator": {
+                        "type": "profile",
+                        "description": "The creator of this playlist.",
+                    },
+                },
+            },
+            "music.radio_station": {
+                "namespace": "http://ogp.me/ns/music#",
+                "properties": {
+                    "music:creator": {
+                        "type": "profile",
+                        "description": "The creator of this station.",
+                    }
+                },
+            },
+        },
+    },
+    "og:image": {
+        "required": True,
+        "type": "url",
+        "array_allowed": True,
+        "description": "An image URL which should represent your object within the graph. The image must be at least 50px by 50px and have a maximum aspect ratio of 3:1. We support PNG, JPEG and GIF formats. You may include multiple og:image tags to associate multiple images with your page.",
+        "properties": {
+            "og:image:url": {"description": "Identical to og:image.", "type": "url"},
+            "og:image:secure_url": {
+                "description": " An alternate url to use if the webpage requires HTTPS.",
+                "type": "url",
+            },
+            "og:image:type": {
+                "description": "A MIME type for this image.",
+                "type": "string",
+            },
+            "og:image:width": {
+                "description": "The number of pixels wide.",
+                "type": "integer",
+            },
+            "og:image:height": {
+                "description": "The number of pixels high.",
+                "type": "integer",
+            },
+        },
+    },
+    "og:url": {
+        "required": True,
+        "description": "The canonical URL of your object that will be used as its permanent ID in the graph, e.g., http://www.imdb.com/title/tt0117500/",
+        "type": "url",
+    },
+    "og:site_name": {
+        "required": False,
+        "description": 'A human-readable name for your site, e.g., "IMDb".',
+        "type": "string",
+    },
+    "og:description": {
+        "required": False,
+        "description": "A one to two sentence description of your page.",
+        "type": "string",
+    },
+    "og:isbn": {
+        "required": False,
+        "description": "For products which have a UPC code or ISBN number, you can specify them using the og:upc and og:isbn properties. These properties help uniquely identify products.",
+        "type": "string",
+    },
+    "og:upc": {
+        "required": False,
+        "description": "For products which have a UPC code or ISBN number, you can specify them using the og:upc and og:isbn properties. These properties help uniquely identify products.",
+        "type": "string",
+    },
+    "og:audio": {
+        "required": False,
+        "description": "A URL to an audio file to accompany this object.",
+        "type": "url",
+        "properties": {
+            "og:audio:secure_url": {
+                "description": " An alternate url to use if the webpage requires HTTPS.",
+                "type": "url",
+            },
+            "og:audio:type": {
+                "description": "A MIME type for this audio.",
+                "type": "string",
+            },
+            "og:audio:title": {
+                "description": "NOT IN 2.0 SPEC -- song title",
+                "type": "string",
+            },
+            "og:audio:artist": {
+                "description": "NOT IN 2.0 SPEC -- song artist",
+                "type": "string",
+            },
+            "og:audio:album": {
+                "description": "NOT IN 2.0 SPEC -- song album",
+                "type": "string",
+            },
+        },
+    },
+    "og:determiner": {
+        "required": False,
+        "description": """The word that appears before this object's title in a sentence. An enum of (a, an, the, "", auto). If auto is chosen, the consumer of your data should chose between "a" or "an". Default is "" (blank).""",
+        "type": "enum",
+        "enums": ("a", "an", "the", "", "auto"),
+    },
+    "og:locale": {
+        "required": False,
+        "description": """The locale these tags are marked up in. Of the format language_TERRITORY. Default is en_US.""",
+        "type": "string",
+    },
+    "og:locale:alternate": {
+        "required": False,
+        "description": """An array of other locales this page is available in..""",
+        "type": "string",
+        "array_allowed": True,
+    },
+    "og:video": {
+        "required": False,
+        "description": "A URL to a video file that complements this object. set content to url of video file. You may specify more than one og:video. If you specify more than one og:video, then og:video:type is required for each video. You must include a valid og:image for your video to be displayed in the news feed.",
+        "type": "url",
+        "properties": {
+            "og:video:secure_url": {
+                "description": " An alternate url to use if the webpage requires HTTPS.",
+                "type": "url",
+            },
+            "og:video:type": {
+                "description": "A MIME type for this video.",
+                "type": "string",
+            },
+            "og:video:width": {
+                "description": "The number of pixels wide.",
+                "type": "integer",
+            },
+            "og:video:height": {
+                "description": "The number of pixels high.",
+                "type": "integer",
+            },
+        },
+    },
+}
+facebook_extensions = {
+    "fb:admins": {
+        "required": False,
+        "description": 'To associate the page with your Facebook account, add the additional property fb:admins to your page with a comma-separated list of the user IDs or usernames of the Facebook accounts who own the page, e.g.: <meta property="fb:admins" content="USER_ID1,USER_ID2"/>',
+    },
+    "fb:app_id": {
+        "required": False,
+        "description": "A Facebook Platform application ID that administers this page.",
+    },
+}
+
+# deprecated
+og_properties = OG_PROPERTIES
+
+# all the `regex_dates` patterns are anchored, so they can be tried in one pass
+_regex_dates_combined = re.compile(
+    "|".join("(?:%s)" % _regex.pattern for _regex in regex_dates.values())
+)
@@ -0,0 +1,139 @@
+# stdlib
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+import os
+import typing
+
+# local
+from . import _OG_DATA
+from . import ErrorCodes
+from . import OGErrors
+from . import OpenGraphItem
+
+# typing
+_RESULT = typing.Tuple[bool, ErrorCodes]
+_RESULT_ERRORS = typing.Tuple[bool, OGErrors]
+_CHUNK = typing.Tuple[typing.Tuple[_OG_DATA, ...], typing.Dict[str, bool]]
+
+# ==============================================================================
+
+# batches smaller than this are validated in-process; a process pool costs
+# more to start and feed than it saves
+MIN_ITEMS_PARALLEL = 2000
+
+
+def _validate_data(
+    data: _OG_DATA,
+    validate_kwargs: typing.Dict[str, bool],
+) -> _RESULT:
+    item = OpenGraphItem()
+    item._data = item._local = data
+    status = item.validate(**validate_kwargs)
+    return (status, item.error_codes())
+
+
+def _validate_chunk(chunk: _CHUNK) -> typing.List[_RESULT]:
+    (datas, validate_kwargs) = chunk
+    return [_validate_data(data, validate_kwargs) for data in datas]
+
+
+def _chunked(
+    datas: typing.List[_OG_DATA],
+    chunksize: int,
+    validate_kwargs: typing.Dict[str, bool],
+) -> typing.Iterator[_CHUNK]:
+    for start in range(0, len(datas), chunksize):
+        end = start + chunksize
+        yield (tuple(datas[start:end]), validate_kwargs)
+
+
+def validate_many_codes(
+    items: typing.Iterable[OpenGraphItem],
+    workers: typing.Optional[int] = None,
+    chunksize: typing.Optional[int] = None,
+    min_items_parallel: int = MIN_ITEMS_PARALLEL,
+    executor: typing.Optional[Executor] = None,
+    **validate_kwargs: bool,
+) -> typing.List[_RESULT]:
+    """
+    Like `validate_many()`, but returns each item's `ErrorCodes`, which is
+    cheaper than building its `OGErrors`.
+
+    :returns: a list of `(status, ErrorCodes)`, in the same order as `items`
+    :rtype: list
+    """
+    items = list(items)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if (executor is None) and ((workers <= 1) or (len(items) < min_items_parallel)):
+        # copies, as the item's own codes change when it is validated again
+        return [
+            (item.validate(**validate_kwargs), ErrorCodes(item.error_codes()))
+            for item in items
+        ]
+
+    if not chunksize:
+        chunksize = max(1, len(items) // (workers * 4))
+    # layered items are flattened, so workers receive plain dicts
+    datas = [item._local if item._layer is None else dict(item._data) for item in items]
+    chunks = _chunked(datas, chunksize, validate_kwargs)
+
+    results: typing.List[_RESULT] = []
+    if executor is not None:
+        for _results in executor.map(_validate_chunk, chunks):
+            results.extend(_results)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as _executor:
+            for _results in _executor.map(_validate_chunk, chunks):
+                results.extend(_results)
+    for item, (status, errors) in zip(items, results):
+        item._errors = errors
+        item._errors_view = None
+        # the errors were not built by the item's own `validate()`, so the
+        # next call can not build on them
+        item._dirty = None
+        item._validated_with = None
+    return results
+
+
+def validate_many(
+    items: typing.Iterable[OpenGraphItem],
+    workers: typing.Optional[int] = None,
+    chunksize: typing.Optional[int] = None,
+    min_items_parallel: int = MIN_ITEMS_PARALLEL,
+    executor: typing.Optional[Executor] = None,
+    **validate_kwargs: bool,
+) -> typing.List[_RESULT_ERRORS]:
+    """
+    Validate many `OpenGraphItem`s, optionally across a process pool.
+
+    Only each item's data is sent to the workers, `chunksize` items at a time.
+    Every item's errors are set on it as if `.validate()` had been called.
+
+    :param items: the `OpenGraphItem`s to validate
+    :type items: iterable
+    :param workers: the number of worker processes. Default: `os.cpu_count()`
+    :type workers: int
+    :param chunksize: the number of items sent to a worker at once.
+        Default: enough for each worker to receive about 4 chunks.
+    :type chunksize: int
+    :param min_items_parallel: batches smaller than this, or with 1 worker,
+        are validated in-process. Default: `MIN_ITEMS_PARALLEL`
+    :type min_items_parallel: int
+    :param executor: an existing `concurrent.futures.Executor` to use instead
+        of starting a new `ProcessPoolExecutor`
+    :type executor: Executor
+    :param validate_kwargs: passed to `OpenGraphItem.validate()`
+
+    :returns: a list of `(status, OGErrors)`, in the same order as `items`
+    :rtype: list
+    """
+    results = validate_many_codes(
+        items,
+        workers=workers,
+        chunksize=chunksize,
+        min_items_parallel=min_items_parallel,
+        executor=executor,
+        **validate_kwargs,
+    )
+    return [(status, errors.as_errors()) for (status, errors) in results]
@@ -0,0 +1,127 @@
+# stdlib
+from collections import OrderedDict
+import threading
+import typing
+
+if typing.TYPE_CHECKING:
+    from . import OpenGraphItem
+
+# ==============================================================================
+
+
+class CacheBackend(object):
+    """
+    The interface a `RenderCache` stores rendered html in.
+
+    Subclass this to put a shared store (memcached, redis, etc) behind a
+    `RenderCache`.  Keys and values are both `str`.
+    """
+
+    def get(self, key: str) -> typing.Optional[str]:
+        """return the value for `key`, or `None` if it is not stored"""
+        raise NotImplementedError()
+
+    def set(self, key: str, value: str) -> None:
+        raise NotImplementedError()
+
+    def clear(self) -> None:
+        raise NotImplementedError()
+
+
+class LRUCacheBackend(CacheBackend):
+    """
+    A threadsafe, process-local `CacheBackend` which evicts the least recently
+    used entry once it holds `maxsize` entries.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        if maxsize < 1:
+            raise ValueError("`maxsize` must be at least 1")
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> typing.Optional[str]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RenderCache(object):
+    """
+    Caches `OpenGraphItem.as_html()` by the item's content.
+
+    Identical items render once per backend, not once per item:
+
+        cache = RenderCache(maxsize=2048)
+        html = item.as_html(cache=cache)
+
+    :param backend: a `CacheBackend`. Default: a new `LRUCacheBackend`
+    :type backend: CacheBackend
+    :param maxsize: the size of the default `LRUCacheBackend`
+    :type maxsize: int
+    """
+
+    def __init__(
+        self,
+        backend: typing.Optional[CacheBackend] = None,
+        maxsize: int = 1024,
+    ) -> None:
+        if backend is None:
+            backend = LRUCacheBackend(maxsize=maxsize)
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def render(
+        self,
+        item: "OpenGraphItem",
+        debug: bool = False,
+        namespace: str = "",
+    ) -> str:
+        """
+        return the html for `item`, rendering and storing it on a miss
+
+        :param namespace: prefixed to the key, e.g. to partition a shared backend
+        :type namespace: str
+        """
+        key = item.render_key(debug=debug)
+        if namespace:
+            key = "%s:%s" % (namespace, key)
+        html = self.backend.get(key)
+        if html is not None:
+            with self._lock:
+                self.hits += 1
+            return html
+        with self._lock:
+            self.misses += 1
+        html = item._render_html(debug)
+        self.backend.set(key, html)
+        return html
+
+    def clear(self) -> None:
+        """clear the backend and reset the counters"""
+        self.backend.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> typing.Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,142 @@
+"""
+opengraph-writer: validate or render a stream of OpenGraph items.
+
+Each input line is a JSON object of `{"og:title": "...", ...}`; a property
+with multiple values is given a list.  Each output line is a JSON object:
+
+    {"line": 1, "valid": true, "errors": {"critical": {}, ...}}  # --format errors
+    {"line": 1, "valid": true, "html": "<meta ..."}               # --format html
+
+Lines which are not a JSON object are reported as `{"line": 1, "malformed": "..."}`.
+A summary is written to stderr.  The exit status is 1 if any item was invalid
+or malformed.
+"""
+# stdlib
+import argparse
+import fileinput
+import json
+import sys
+import time
+import typing
+
+# local
+from . import OpenGraphItem
+from ._batching import iter_batches
+from ._batching import new_stats
+from ._batching import run_batches
+from ._batching import summarize
+
+# typing
+_LINE = typing.Tuple[int, str]
+_BATCH = typing.Tuple[_LINE, ...]
+_OPTIONS = typing.Tuple[bool, bool, str, bool]  # schema1, schema2, format, debug
+_STATS = typing.Dict[str, int]
+_RESULT = typing.Tuple[typing.List[str], _STATS]
+
+# ==============================================================================
+
+STATS_KEYS = ("items", "valid", "invalid", "malformed", "critical", "recommended")
+
+
+def _process_batch(batch: _BATCH, options: _OPTIONS) -> _RESULT:
+    """validates (and renders) a batch of lines, returning the output lines"""
+    (schema1, schema2, output_format, debug) = options
+    outputs = []
+    stats = new_stats(STATS_KEYS)
+    for lineno, line in batch:
+        try:
+            data = json.loads(line)
+            if not isinstance(data, dict):
+                raise ValueError("not a JSON object")
+        except ValueError as exc:
+            stats["malformed"] += 1
+            outputs.append(json.dumps({"line": lineno, "malformed": str(exc)}))
+            continue
+        item = OpenGraphItem()
+        for field, value in data.items():
+            item.set(field, value)
+        status = item.validate(schema1=schema1, schema2=schema2)
+        counts = item.error_codes().level_counts()
+        stats["items"] += 1
+        stats["valid" if status else "invalid"] += 1
+        stats["critical"] += counts["critical"]
+        stats["recommended"] += counts["recommended"]
+        result: typing.Dict[str, typing.Any] = {"line": lineno, "valid": status}
+        if output_format == "html":
+            result["html"] = item.as_html(debug=debug)
+        else:
+            result["errors"] = item.errors()
+        outputs.append(json.dumps(result))
+    return (outputs, stats)
+
+
+def _iter_lines(lines: typing.Iterable[str]) -> typing.Iterator[_LINE]:
+    """the numbered lines which are not blank"""
+    for lineno, line in enumerate(lines, 1):
+        if line.strip():
+            yield (lineno, line)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="opengraph-writer",
+        description="Validate or render a JSONL stream of OpenGraph items.",
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        metavar="FILE",
+        help="JSONL files to read; `-` or none reads stdin",
+    )
+    parser.add_argument(
+        "--schema",
+        choices=("1", "2"),
+        default="2",
+        help="the schema to validate against. Default: 2",
+    )
+    parser.add_argument(
+        "--format",
+        dest="output_format",
+        choices=("errors", "html"),
+        default="errors",
+        help="write the errors or the rendered html of each item. Default: errors",
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="include the errors in the rendered html",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="the number of worker processes. Default: 1",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="the number of lines sent to a worker at once. Default: 500",
+    )
+    return parser
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    args = _parser().parse_args(argv)
+    if args.batch_size < 1:
+        raise SystemExit("`--batch-size` must be at least 1")
+    options: _OPTIONS = (
+        args.schema == "1",
+        args.schema == "2",
+        args.output_format,
+        args.debug,
+    )
+    _start = time.perf_counter()
+    with fileinput.input(files=args.files or ("-",)) as lines:
+        batches = iter_batches(_iter_lines(lines), args.batch_size)
+        stats = run_batches(_process_batch, batches, options, args.workers, STATS_KEYS)
+    return summarize(stats, time.perf_counter() - _start, "items", "malformed")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
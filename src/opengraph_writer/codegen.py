@@ -0,0 +1,390 @@
+"""
+Generates a specialized validator for each og:type, which `validate()` uses
+for a full validation against schema2.
+
+The generated function does what `_check_fields`, `_check_required`,
+`_check_og_type` and `_check_subtypes` do for that og:type, with the property
+lookups merged into one dict, the built-in type checks inlined, and the
+required and subtype checks unrolled.  Validators are generated on first use
+and cached on the `PropertyIndex`, so `invalidate_property_index()` discards
+them as well.
+
+The generated source can be inspected:
+
+    print(get_source("article"))
+
+Set `opengraph_writer.GENERATED_VALIDATORS = False` to always use the
+interpreted checks.
+
+The typed item classes of `opengraph_writer.typed` are generated here as well.
+"""
+# stdlib
+import datetime
+import itertools
+import linecache
+import operator
+import typing
+
+# local
+from . import _meta_prefix
+from . import _regex_integer
+from . import _validate_datetime
+from . import _validate_integer
+from . import _validate_profile
+from . import _validate_string
+from . import _validate_url
+from . import ErrorCode
+from . import get_property_index
+from . import PropertyIndex
+from . import PropertySpec
+
+# typing
+_TYPE_VALIDATOR = typing.Callable[..., None]
+
+# ==============================================================================
+
+# validator: an inline expression, formatted with the name of the value
+_INLINE: typing.Dict[typing.Callable[[typing.Any], bool], str] = {
+    _validate_profile: "True",
+    _validate_string: "isinstance({0}, str)",
+    _validate_url: "(isinstance({0}, str) and _regex_url_match({0}) is not None)",
+    _validate_integer: (
+        "(isinstance({0}, int) or "
+        "(isinstance({0}, str) and _regex_integer_fullmatch({0}) is not None))"
+    ),
+    _validate_datetime: (
+        "(isinstance({0}, _date_types) or "
+        "(isinstance({0}, str) and _regex_dates_match({0}) is not None))"
+    ),
+}
+
+
+def _function_name(og_type: str) -> str:
+    return "validate_%s" % "".join(c if c.isalnum() else "_" for c in og_type)
+
+
+def _expression(
+    spec: PropertySpec,
+    name: str,
+    namespace: typing.Dict[str, typing.Any],
+) -> str:
+    """an expression which is true if `name` is valid for `spec.validator`"""
+    template = _INLINE.get(spec.validator)
+    if template is not None:
+        return template.format(name)
+    # any other validator is called
+    validators = namespace["_validators"]
+    key = validators.get(spec.validator)
+    if key is None:
+        _name = getattr(spec.validator, "__name__", "")
+        if not _name.isidentifier():
+            _name = "_validator"
+        key = validators[spec.validator] = "%s_%s" % (_name, len(validators))
+        namespace[key] = spec.validator
+    return "%s(%s)" % (key, name)
+
+
+def _namespace() -> typing.Dict[str, typing.Any]:
+    """the names generated code can use"""
+    from . import _regex_dates_combined
+    from . import regex_url
+
+    namespace: typing.Dict[str, typing.Any] = {
+        "_regex_url_match": regex_url.match,
+        "_regex_integer_fullmatch": _regex_integer.fullmatch,
+        "_regex_dates_match": _regex_dates_combined.match,
+        "_date_types": (datetime.date, datetime.datetime),
+        # validator: its name in the namespace
+        "_validators": {},
+    }
+    for code in ErrorCode:
+        namespace[code.name] = code
+    return namespace
+
+
+def _specs(index: PropertyIndex, og_type: str) -> typing.Dict[str, PropertySpec]:
+    """every property of `og_type`, in schema order"""
+    specs = dict(index.properties)
+    # the properties take precedence over the subtypes, as in `_check_fields`
+    for subtype, spec in index.types[og_type].items():
+        specs.setdefault(subtype, spec)
+    return specs
+
+
+def generate_source(
+    index: PropertyIndex,
+    og_type: str,
+) -> typing.Tuple[str, typing.Dict[str, typing.Any]]:
+    """
+    the source of the validator for `og_type`, and the namespace it is
+    executed in
+    """
+    subtypes = index.types[og_type]
+    namespace = _namespace()
+    specs = _specs(index, og_type)
+
+    # group the properties by how they are checked
+    kinds: typing.Dict[typing.Tuple[typing.Any, ErrorCode, bool], int] = {}
+    kind_fields: typing.List[typing.List[str]] = []
+    field_kinds: typing.Dict[str, int] = {}
+    for field, spec in specs.items():
+        key = (spec.validator, spec.invalid, spec.array_allowed)
+        kind = kinds.get(key)
+        if kind is None:
+            kind = kinds[key] = len(kinds)
+            kind_fields.append([])
+        kind_fields[kind].append(field)
+        field_kinds[field] = kind
+    namespace["_kinds_get"] = field_kinds.get
+
+    lines = [
+        "def %s(errors, data, fields, quiet, strict):" % _function_name(og_type),
+        "    for field, value in fields:",
+        "        kind = _kinds_get(field)",
+        "        if kind is None:",
+        "            if strict:",
+        "                errors[field] = UNSUPPORTED",
+        "            elif not quiet:",
+        "                errors[field] = NOT_VALIDATED",
+    ]
+    # the most common kinds are tested first
+    by_size = sorted(kinds.items(), key=lambda kv: -len(kind_fields[kv[1]]))
+    for (validator, code, array_allowed), kind in by_size:
+        _fields = kind_fields[kind]
+        spec = specs[_fields[0]]
+        lines.append("        elif kind == %s:" % kind)
+        lines.append(
+            "            # %s: %s"
+            % (
+                spec.info.get("type"),
+                ", ".join(_fields[:4]) + (", ..." if len(_fields) > 4 else ""),
+            )
+        )
+        indent = "            "
+        if _expression(spec, "value", namespace) == "True":
+            lines.append(indent + "pass")
+            continue
+        if code >= ErrorCode.RECOMMENDED_INVALID:
+            lines.append(indent + "if not quiet:")
+            indent += "    "
+        if array_allowed:
+            lines.extend(
+                (
+                    indent + "if isinstance(value, list):",
+                    indent + "    for _value in value:",
+                    indent
+                    + "        if not %s:" % _expression(spec, "_value", namespace),
+                    indent + "            errors[field] = %s" % code.name,
+                    indent + "            break",
+                    indent + "elif not %s:" % _expression(spec, "value", namespace),
+                    indent + "    errors[field] = %s" % code.name,
+                )
+            )
+        else:
+            lines.extend(
+                (
+                    indent + "if not %s:" % _expression(spec, "value", namespace),
+                    indent + "    errors[field] = %s" % code.name,
+                )
+            )
+
+    lines.append("    # required")
+    for field in index.required:
+        lines.append("    if %r not in data:" % field)
+        lines.append("        errors[%r] = MISSING_REQUIRED" % field)
+
+    # the og:type is valid under schema2, so it has no errors
+    lines.append("    # subtypes of %s" % og_type)
+    for subtype, spec in subtypes.items():
+        missing = spec.missing
+        if missing is None:
+            continue
+        if missing < ErrorCode.RECOMMENDED_INVALID:
+            lines.append("    if %r not in data:" % subtype)
+        else:
+            lines.append("    if not quiet and %r not in data:" % subtype)
+        lines.append("        errors[%r] = %s" % (subtype, missing.name))
+    return ("\n".join(lines) + "\n", namespace)
+
+
+def _execute(
+    source: str,
+    namespace: typing.Dict[str, typing.Any],
+    filename: str,
+) -> None:
+    # so tracebacks and `inspect` can show the source
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    exec(compile(source, filename, "exec"), namespace)
+
+
+def compile_type_validator(index: PropertyIndex, og_type: str) -> _TYPE_VALIDATOR:
+    """
+    Generate and compile the validator for `og_type`, which is called as
+    `validator(errors, data, fields, quiet, strict)`.  Its source is
+    `validator.__source__`.
+    """
+    (source, namespace) = generate_source(index, og_type)
+    _execute(source, namespace, "<opengraph_writer validator %s>" % og_type)
+    validator = namespace[_function_name(og_type)]
+    validator.__source__ = source
+    return validator
+
+
+def class_name(og_type: str) -> str:
+    """the name of the typed item class of `og_type`, e.g. `MusicSongItem`"""
+    words = og_type.replace(".", "_").split("_")
+    return "".join(w.capitalize() for w in words) + "Item"
+
+
+def attribute_name(field: str) -> str:
+    """the attribute of a typed item which holds `field`, e.g. `og_image_width`"""
+    return field.replace(":", "_").replace(".", "_")
+
+
+def generate_class_source(
+    index: PropertyIndex,
+    og_type: str,
+) -> typing.Tuple[str, typing.Dict[str, typing.Any]]:
+    """
+    the source of the typed item class for `og_type`, and the namespace it is
+    executed in; the namespace needs a `TypedOpenGraphItem` base class
+    """
+    subtypes = index.types[og_type]
+    namespace = _namespace()
+    namespace["_attrgetter"] = operator.attrgetter
+    specs = _specs(index, og_type)
+    specs.pop("og:type", None)
+    attributes = {field: attribute_name(field) for field in specs}
+
+    render_order = sorted(itertools.chain(specs, ("og:type",)))
+    lines = [
+        "class %s(TypedOpenGraphItem):" % class_name(og_type),
+        '    """an og:type "%s" item"""' % og_type,
+        "",
+        "    __slots__ = (",
+    ]
+    lines.extend("        %r," % ("_" + a) for a in attributes.values())
+    lines.extend(
+        (
+            "    )",
+            "",
+            "    og_type = %r" % og_type,
+            "    _attributes = {",
+        )
+    )
+    lines.extend("        %r: %r," % kv for kv in attributes.items())
+    lines.extend(("    }", "    _render_fields = ("))
+    lines.extend("        %r," % field for field in render_order)
+    lines.extend(("    )", "    _render_prefixes = ("))
+    lines.extend("        %r," % _meta_prefix(field) for field in render_order)
+    lines.extend(("    )", "    _values = _attrgetter("))
+    lines.extend(
+        "        %r," % attributes.get(field, "og_type") for field in render_order
+    )
+    lines.extend(
+        (
+            "    )",
+            "",
+            "    def __init__(self, **fields):",
+        )
+    )
+    lines.extend("        self._%s = None" % a for a in attributes.values())
+    lines.extend(
+        (
+            "        self._extra = {}",
+            "        self._errors = None",
+            "        for attribute, value in fields.items():",
+            "            setattr(self, attribute, value)",
+        )
+    )
+
+    for field, spec in specs.items():
+        attribute = attributes[field]
+        lines.extend(
+            (
+                "",
+                "    @property",
+                "    def %s(self):" % attribute,
+                '        """%s (%s)"""' % (field, spec.info.get("type")),
+                "        return self._%s" % attribute,
+                "",
+                "    @%s.setter" % attribute,
+                "    def %s(self, value):" % attribute,
+            )
+        )
+        _raise = "raise ValueError('%%r is not a valid %s' %% (value,))" % field
+        expression = _expression(spec, "value", namespace)
+        if expression != "True":
+            indent = "        "
+            if spec.array_allowed:
+                lines.extend(
+                    (
+                        indent + "if isinstance(value, list):",
+                        indent + "    for _value in value:",
+                        indent
+                        + "        if not %s:" % _expression(spec, "_value", namespace),
+                        indent + "            " + _raise,
+                        indent + "elif value is not None and not %s:" % expression,
+                        indent + "    " + _raise,
+                    )
+                )
+            else:
+                lines.extend(
+                    (
+                        indent + "if value is not None and not %s:" % expression,
+                        indent + "    " + _raise,
+                    )
+                )
+        lines.append("        self._%s = value" % attribute)
+
+    # every value was checked when it was set
+    lines.extend(("", "    def _check(self, errors, quiet):"))
+    for field in index.required:
+        # the og:type is the class's
+        if field in attributes:
+            lines.append("        if self._%s is None:" % attributes[field])
+            lines.append("            errors[%r] = MISSING_REQUIRED" % field)
+    for subtype, spec in subtypes.items():
+        missing = spec.missing
+        if missing is None:
+            continue
+        if missing < ErrorCode.RECOMMENDED_INVALID:
+            lines.append("        if self._%s is None:" % attributes[subtype])
+        else:
+            lines.append(
+                "        if not quiet and self._%s is None:" % attributes[subtype]
+            )
+        lines.append("            errors[%r] = %s" % (subtype, missing.name))
+    if lines[-1].endswith("quiet):"):
+        lines.append("        pass")
+    return ("\n".join(lines) + "\n", namespace)
+
+
+def compile_item_class(
+    index: PropertyIndex,
+    og_type: str,
+    base: type,
+) -> type:
+    """
+    Generate and compile the typed item class for `og_type`, a subclass of
+    `base`.  Its source is `cls.__source__`.
+    """
+    (source, namespace) = generate_class_source(index, og_type)
+    namespace["TypedOpenGraphItem"] = base
+    # the class is created in the module of `base`, so it can be pickled
+    namespace["__name__"] = base.__module__
+    _execute(source, namespace, "<opengraph_writer class %s>" % og_type)
+    cls = namespace[class_name(og_type)]
+    cls.__source__ = source
+    return cls
+
+
+def get_source(og_type: str) -> str:
+    """the source of the generated validator for `og_type`"""
+    from . import _type_validator
+
+    index = get_property_index()
+    if og_type not in index.types:
+        raise ValueError("%r is not a valid og:type" % og_type)
+    validator = _type_validator(index, og_type, force=True)
+    return validator.__source__  # type: ignore[union-attr]
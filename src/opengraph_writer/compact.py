@@ -0,0 +1,240 @@
+# stdlib
+import sys
+import threading
+import typing
+
+# local
+from . import _OG_DATA
+from . import ErrorCode
+from . import ErrorCodes
+from . import OGErrors
+from . import OpenGraphItem
+
+# typing
+_FIELDS = typing.Tuple[str, ...]
+_VALUES = typing.Tuple[typing.Any, ...]
+_ERROR = typing.Tuple[str, ErrorCode]  # (field, code)
+
+# ==============================================================================
+
+# the number of distinct field and error tuples which are shared between items
+MAX_FIELDS_SHARED = 4096
+MAX_ERRORS_SHARED = 4096
+
+# items with the same set of fields share a single `_fields` tuple
+_fields_shared: typing.Dict[_FIELDS, _FIELDS] = {}
+_fields_shared_lock = threading.Lock()
+
+
+def _share_fields(fields: typing.Iterable[str]) -> _FIELDS:
+    _fields = tuple(sorted(fields))
+    shared = _fields_shared.get(_fields)
+    if shared is None:
+        if len(_fields_shared) >= MAX_FIELDS_SHARED:
+            return _fields
+        with _fields_shared_lock:
+            shared = _fields_shared.setdefault(
+                _fields, tuple(sys.intern(f) for f in _fields)
+            )
+    return shared
+
+
+# items with the same errors share a single `_errors` tuple
+_errors_shared: typing.Dict[typing.Tuple[_ERROR, ...], typing.Tuple[_ERROR, ...]] = {}
+
+
+def _compact_errors(errors: ErrorCodes) -> typing.Tuple[_ERROR, ...]:
+    compact = tuple(errors.items())
+    if len(_errors_shared) >= MAX_ERRORS_SHARED:
+        return _errors_shared.get(compact, compact)
+    return _errors_shared.setdefault(compact, compact)
+
+
+class _FrozenList(tuple):
+    """a list stored by a `FrozenOpenGraphItem`, which `to_item()` thaws"""
+
+    __slots__ = ()
+
+
+class CompactOpenGraphItem(object):
+    """
+    A memory-efficient `OpenGraphItem`, for holding many items at once.
+
+    Fields are stored as two tuples, sorted by field name; items with the same
+    fields share one tuple of field names.  Errors are stored as a tuple of
+    `(field, ErrorCode)` and only expanded to `OGErrors` by `errors()`.
+
+    Use `OpenGraphItem` to build items, and `from_item()`/`to_item()` to
+    convert between the two.
+    """
+
+    __slots__ = ("_fields", "_values", "_errors")
+
+    _fields: _FIELDS
+    _values: _VALUES
+    _errors: typing.Optional[typing.Tuple[_ERROR, ...]]
+
+    def __init__(
+        self,
+        data: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+    ) -> None:
+        """
+        :param data: a mapping of fields to values
+        :type data: dict
+        """
+        if data:
+            self._fields = _share_fields(data.keys())
+            self._values = tuple(self._convert(data[f]) for f in self._fields)
+        else:
+            self._fields = ()
+            self._values = ()
+        self._errors = None
+
+    def __repr__(self) -> str:
+        return "<%s %r>" % (self.__class__.__name__, self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __contains__(self, field: str) -> bool:
+        return field in self._fields
+
+    def __getitem__(self, field: str) -> typing.Any:
+        try:
+            return self._values[self._fields.index(field)]
+        except ValueError:
+            raise KeyError(field)
+
+    def get(self, field: str, default: typing.Any = None) -> typing.Any:
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+    def items(self) -> typing.Iterator[typing.Tuple[str, typing.Any]]:
+        return zip(self._fields, self._values)
+
+    @staticmethod
+    def _convert(value: typing.Any) -> typing.Any:
+        if isinstance(value, list):
+            return list(value)
+        return value
+
+    @classmethod
+    def from_item(cls, item: OpenGraphItem) -> "CompactOpenGraphItem":
+        """create a compact copy of `item`, including its errors"""
+        compact = cls(item._data)
+        if item._errors is not None:
+            compact._errors = _compact_errors(item._errors)
+        return compact
+
+    def to_item(self) -> OpenGraphItem:
+        """create an `OpenGraphItem` copy of this item, including its errors"""
+        item = OpenGraphItem()
+        data: _OG_DATA = {
+            f: (list(v) if isinstance(v, (list, _FrozenList)) else v)
+            for (f, v) in zip(self._fields, self._values)
+        }
+        item._data = item._local = data
+        if self._errors is not None:
+            item._errors = ErrorCodes(self._errors)
+        return item
+
+    def set(
+        self,
+        field: str,
+        value: typing.Any,
+        append: bool = False,
+    ) -> None:
+        """
+        Like `OpenGraphItem.set()`.  This rebuilds the tuples; build items
+        with an `OpenGraphItem` when setting many fields.
+        """
+        data = dict(zip(self._fields, self._values))
+        if append:
+            current = data.get(field)
+            if current is None:
+                value = [value]
+            elif isinstance(current, list):
+                value = current + [value]
+            else:
+                value = [current, value]
+        data[field] = value
+        self._fields = _share_fields(data.keys())
+        self._values = tuple(self._convert(data[f]) for f in self._fields)
+        self._errors = None
+
+    def validate(self, **validate_kwargs: bool) -> bool:
+        """like `OpenGraphItem.validate()`"""
+        item = self.to_item()
+        status = item.validate(**validate_kwargs)
+        self._errors = _compact_errors(item.error_codes())
+        return status
+
+    def errors(self) -> OGErrors:
+        return self.error_codes().as_errors()
+
+    def error_codes(self) -> ErrorCodes:
+        if self._errors is None:
+            raise ValueError("You must call `.validate()` first")
+        return ErrorCodes(self._errors)
+
+    def as_html(self, debug: bool = False) -> str:
+        return self.to_item().as_html(debug=debug)
+
+
+class FrozenOpenGraphItem(CompactOpenGraphItem):
+    """
+    An immutable, hashable `CompactOpenGraphItem`.
+
+    Lists are stored as tuples, and are lists again after `to_item()`.  Items
+    are equal, and hash the same, if their fields and values are equal; errors
+    are not compared.  A frozen item can be shared between threads and used
+    as a cache key.
+
+    A frozen item can not be validated; its errors are those of the item it
+    was created `from_item()`.  Use `to_item().validate()` to validate it.
+    """
+
+    __slots__ = ("_hash",)
+
+    _hash: typing.Optional[int]
+
+    def __init__(
+        self,
+        data: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+    ) -> None:
+        CompactOpenGraphItem.__init__(self, data)
+        self._hash = None
+
+    @staticmethod
+    def _convert(value: typing.Any) -> typing.Any:
+        if isinstance(value, list):
+            return _FrozenList(value)
+        return value
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash((self._fields, self._values))
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FrozenOpenGraphItem):
+            return NotImplemented
+        return self._fields == other._fields and self._values == other._values
+
+    def __ne__(self, other: object) -> bool:
+        if not isinstance(other, FrozenOpenGraphItem):
+            return NotImplemented
+        return not self.__eq__(other)
+
+    def set(
+        self,
+        field: str,
+        value: typing.Any,
+        append: bool = False,
+    ) -> None:
+        raise TypeError("`FrozenOpenGraphItem` is immutable")
+
+    def validate(self, **validate_kwargs: bool) -> bool:
+        raise TypeError("`FrozenOpenGraphItem` is immutable")
@@ -0,0 +1,481 @@
+"""
+Optional checks of the images an item links to, which read only the first
+bytes of each image for its format and dimensions.
+
+The schema requires an `og:image` to be at least 50x50, with an aspect ratio
+of at most 3:1, in PNG, JPEG or GIF format; `validate()` only checks that it
+is a url.
+
+    checker = ImageChecker()
+    item.validate()
+    checker.check_item(item)  # adds any image errors to `item.errors()`
+
+    # many items; every image is fetched once, `max_workers` at a time
+    checker.check_many(items)
+
+Images may be local paths, `file://` urls, or `http(s)://` urls.  Urls are
+read through a `Fetcher`; the default `HTTPFetcher` sends a `Range` request
+for the first bytes only, and keeps connections alive for reuse.  Results are
+cached by url in a bounded LRU.
+
+Problems are reported, at the "recommended" level, as the `ErrorCode`s
+`IMAGE_UNREADABLE`, `IMAGE_UNSUPPORTED_FORMAT`, `IMAGE_TOO_SMALL` and
+`IMAGE_ASPECT_RATIO`.  A field which already has an error is not checked.
+"""
+# stdlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import http.client
+import struct
+import threading
+import typing
+from urllib.parse import unquote
+from urllib.parse import urljoin
+from urllib.parse import urlsplit
+
+# local
+from . import ErrorCode
+from . import OpenGraphItem
+
+# typing
+_CONNECTION = typing.Union[http.client.HTTPConnection, http.client.HTTPSConnection]
+_HOST = typing.Tuple[str, str, typing.Optional[int]]
+
+# ==============================================================================
+
+# the formats `OG_PROPERTIES` allows for og:image
+SUPPORTED_FORMATS = ("png", "jpeg", "gif")
+MIN_WIDTH = 50
+MIN_HEIGHT = 50
+MAX_ASPECT_RATIO = 3.0
+
+# the fields which are checked
+IMAGE_FIELDS = ("og:image", "og:image:url", "og:image:secure_url")
+
+# bytes read first; enough for every format but a JPEG with large metadata
+HEADER_BYTES = 1024
+# a JPEG's dimensions come after its metadata; this is the most read for them
+MAX_HEADER_BYTES = 64 * 1024
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_SIGNATURES = (_PNG_SIGNATURE, b"GIF8", b"\xff\xd8\xff", b"RIFF")
+# the SOF markers, which carry a JPEG's dimensions
+_JPEG_SOF = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# markers which have no length
+_JPEG_STANDALONE = frozenset(range(0xD0, 0xDA)) | {0x01}
+
+
+class ImageInfo(typing.NamedTuple):
+    format: str
+    width: int
+    height: int
+
+
+class _Incomplete(Exception):
+    """the header continues past the bytes which were read"""
+
+
+def _parse_jpeg(data: bytes) -> typing.Optional[ImageInfo]:
+    pos = 2
+    size = len(data)
+    while True:
+        # markers may be padded with any number of 0xFF
+        while pos < size and data[pos] == 0xFF:
+            pos += 1
+        if pos >= size:
+            raise _Incomplete()
+        if data[pos - 1] != 0xFF:
+            return None
+        marker = data[pos]
+        pos += 1
+        if marker in _JPEG_STANDALONE:
+            continue
+        if marker == 0xDA:
+            # the image data starts, without a frame header
+            return None
+        if pos + 2 > size:
+            raise _Incomplete()
+        if marker in _JPEG_SOF:
+            if pos + 7 > size:
+                raise _Incomplete()
+            (height, width) = struct.unpack_from(">HH", data, pos + 3)
+            return ImageInfo("jpeg", width, height)
+        (length,) = struct.unpack_from(">H", data, pos)
+        pos += length
+
+
+def _parse_webp(data: bytes) -> typing.Optional[ImageInfo]:
+    if len(data) < 30:
+        raise _Incomplete()
+    chunk = data[12:16]
+    if chunk == b"VP8 ":
+        if data[23:26] != b"\x9d\x01\x2a":
+            return None
+        (width, height) = struct.unpack_from("<HH", data, 26)
+        return ImageInfo("webp", width & 0x3FFF, height & 0x3FFF)
+    if chunk == b"VP8L":
+        if data[20] != 0x2F:
+            return None
+        (bits,) = struct.unpack_from("<I", data, 21)
+        return ImageInfo("webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+    if chunk == b"VP8X":
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return ImageInfo("webp", width, height)
+    return None
+
+
+def _parse(data: bytes) -> typing.Optional[ImageInfo]:
+    """raises `_Incomplete` if more bytes are needed"""
+    if data[:8] == _PNG_SIGNATURE:
+        if len(data) < 24:
+            raise _Incomplete()
+        if data[12:16] != b"IHDR":
+            return None
+        (width, height) = struct.unpack_from(">II", data, 16)
+        return ImageInfo("png", width, height)
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        if len(data) < 10:
+            raise _Incomplete()
+        (width, height) = struct.unpack_from("<HH", data, 6)
+        return ImageInfo("gif", width, height)
+    if data[:3] == b"\xff\xd8\xff":
+        return _parse_jpeg(data)
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return _parse_webp(data)
+    if len(data) < 12:
+        for signature in _SIGNATURES:
+            if signature.startswith(data[: len(signature)]):
+                raise _Incomplete()
+    return None
+
+
+def parse_image_header(data: bytes) -> typing.Optional[ImageInfo]:
+    """
+    The format and dimensions of a PNG, JPEG, GIF or WebP image, from the
+    first bytes of it.
+
+    :param data: the start of the image
+    :type data: bytes
+
+    :returns: an `ImageInfo`, or `None` if `data` is not the start of an image
+        of a known format, or stops before its dimensions
+    """
+    try:
+        return _parse(data)
+    except _Incomplete:
+        return None
+
+
+class Fetcher(object):
+    """
+    The interface an `ImageChecker` reads remote images through.  Subclass
+    this to use another http client, or to add authentication.
+    """
+
+    def fetch(self, url: str, length: int) -> bytes:
+        """
+        return the first `length` bytes of `url`, or all of it if it is
+        shorter; raise an `OSError` if it can not be read
+        """
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        pass
+
+
+class HTTPFetcher(Fetcher):
+    """
+    A threadsafe `Fetcher` for `http(s)://` urls which sends `Range` requests,
+    and keeps idle connections alive for reuse.
+
+    :param timeout: the socket timeout, in seconds. Default: 5.0
+    :type timeout: float
+    :param max_idle_per_host: the most idle connections kept for each host.
+        Default: 4
+    :type max_idle_per_host: int
+    :param max_redirects: Default: 3
+    :type max_redirects: int
+    :param headers: sent with every request
+    :type headers: dict
+    """
+
+    def __init__(
+        self,
+        timeout: float = 5.0,
+        max_idle_per_host: int = 4,
+        max_redirects: int = 3,
+        headers: typing.Optional[typing.Dict[str, str]] = None,
+    ) -> None:
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self.max_redirects = max_redirects
+        self.headers = {"User-Agent": "opengraph_writer", "Accept": "image/*"}
+        if headers:
+            self.headers.update(headers)
+        self._idle: typing.Dict[_HOST, typing.List[_CONNECTION]] = {}
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _acquire(self, host: _HOST) -> typing.Tuple[_CONNECTION, bool]:
+        """(connection, reused)"""
+        with self._lock:
+            idle = self._idle.get(host)
+            if idle:
+                return (idle.pop(), True)
+            self.connections_opened += 1
+        (scheme, hostname, port) = host
+        if scheme == "https":
+            return (
+                http.client.HTTPSConnection(hostname, port, timeout=self.timeout),
+                False,
+            )
+        return (http.client.HTTPConnection(hostname, port, timeout=self.timeout), False)
+
+    def _release(self, host: _HOST, connection: _CONNECTION) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(host, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def _get(
+        self,
+        url: str,
+        length: int,
+    ) -> typing.Tuple[int, typing.Optional[str], bytes]:
+        """(status, location, data) of one request, which may be retried once"""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise OSError("unsupported url: %r" % url)
+        host = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        headers = dict(self.headers, Range="bytes=0-%d" % (length - 1))
+        while True:
+            (connection, reused) = self._acquire(host)
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+                data = response.read(length)
+            except (OSError, http.client.HTTPException) as exc:
+                connection.close()
+                if reused:
+                    # the server may have closed an idle connection
+                    continue
+                if isinstance(exc, OSError):
+                    raise
+                raise OSError(str(exc))
+            # the connection can only be reused if the response was read
+            if response.isclosed() and not response.will_close:
+                self._release(host, connection)
+            else:
+                connection.close()
+            return (response.status, response.getheader("Location"), data)
+
+    def fetch(self, url: str, length: int) -> bytes:
+        for _i in range(self.max_redirects + 1):
+            (status, location, data) = self._get(url, length)
+            if status in (200, 206):
+                return data
+            if status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                continue
+            raise OSError("HTTP %s for %r" % (status, url))
+        raise OSError("too many redirects for %r" % url)
+
+    def close(self) -> None:
+        """close the idle connections"""
+        with self._lock:
+            idle = self._idle
+            self._idle = {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+
+def _local_path(url: str) -> typing.Optional[str]:
+    """the path of a local image, or `None` for a remote url"""
+    if url.startswith("file://"):
+        return unquote(urlsplit(url).path)
+    if "://" in url:
+        return None
+    return url
+
+
+class ImageChecker(object):
+    """
+    Reads, checks and caches the format and dimensions of images; see the
+    module docstring.
+
+    :param fetcher: reads remote images. Default: a new `HTTPFetcher`
+    :type fetcher: Fetcher
+    :param max_workers: the most images read at once by `probe_many()`,
+        `check_many()`. Default: 8
+    :type max_workers: int
+    :param cache_size: the most results cached. Default: 1024
+    :type cache_size: int
+    :param formats: the formats which are allowed.
+        Default: `SUPPORTED_FORMATS`
+    :type formats: tuple
+    :param min_width: Default: `MIN_WIDTH`
+    :param min_height: Default: `MIN_HEIGHT`
+    :param max_aspect_ratio: the longest side divided by the shortest.
+        Default: `MAX_ASPECT_RATIO`
+    :param resolve: called with each image url of an item, returns the path or
+        url to read it from; e.g. to read a site's own images from disk.
+        Default: None
+    :type resolve: callable
+    """
+
+    def __init__(
+        self,
+        fetcher: typing.Optional[Fetcher] = None,
+        max_workers: int = 8,
+        cache_size: int = 1024,
+        formats: typing.Iterable[str] = SUPPORTED_FORMATS,
+        min_width: int = MIN_WIDTH,
+        min_height: int = MIN_HEIGHT,
+        max_aspect_ratio: float = MAX_ASPECT_RATIO,
+        resolve: typing.Optional[typing.Callable[[str], str]] = None,
+    ) -> None:
+        if cache_size < 1:
+            raise ValueError("`cache_size` must be at least 1")
+        self.fetcher = fetcher if fetcher is not None else HTTPFetcher()
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self.formats = frozenset(formats)
+        self.min_width = min_width
+        self.min_height = min_height
+        self.max_aspect_ratio = max_aspect_ratio
+        self.resolve = resolve
+        self._cache: "OrderedDict[str, typing.Optional[ImageInfo]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _read(self, url: str, length: int) -> bytes:
+        path = _local_path(url)
+        if path is None:
+            return self.fetcher.fetch(url, length)
+        with open(path, "rb") as fp:
+            return fp.read(length)
+
+    def probe(self, url: str) -> typing.Optional[ImageInfo]:
+        """
+        The `ImageInfo` of the image at `url`, or `None` if it is not an image
+        of a known format.  Raises an `OSError` if it can not be read; only
+        images which were read are cached.
+        """
+        with self._lock:
+            if url in self._cache:
+                self._cache.move_to_end(url)
+                return self._cache[url]
+        length = HEADER_BYTES
+        while True:
+            data = self._read(url, length)
+            try:
+                info = _parse(data)
+            except _Incomplete:
+                if len(data) < length or length >= MAX_HEADER_BYTES:
+                    # the image, or its header, is truncated
+                    info = None
+                else:
+                    length = min(length * 8, MAX_HEADER_BYTES)
+                    continue
+            break
+        with self._lock:
+            self._cache[url] = info
+            self._cache.move_to_end(url)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return info
+
+    def probe_many(
+        self,
+        urls: typing.Iterable[str],
+    ) -> typing.Dict[str, typing.Union[ImageInfo, OSError, None]]:
+        """
+        `probe()` each url once, `max_workers` at a time.
+
+        :returns: a dict of each url to its `ImageInfo`, `None`, or the
+            `OSError` it could not be read for
+        """
+        _urls = list(dict.fromkeys(urls))
+
+        def _probe(url: str) -> typing.Union[ImageInfo, OSError, None]:
+            try:
+                return self.probe(url)
+            except OSError as exc:
+                return exc
+
+        if len(_urls) <= 1 or self.max_workers <= 1:
+            return {url: _probe(url) for url in _urls}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return dict(zip(_urls, executor.map(_probe, _urls)))
+
+    def check_info(
+        self,
+        info: typing.Union[ImageInfo, OSError, None],
+    ) -> typing.Optional[ErrorCode]:
+        """the `ErrorCode` for the result of a `probe()`, or `None` if valid"""
+        if info is None or isinstance(info, OSError):
+            return ErrorCode.IMAGE_UNREADABLE
+        if info.format not in self.formats:
+            return ErrorCode.IMAGE_UNSUPPORTED_FORMAT
+        if info.width < self.min_width or info.height < self.min_height:
+            return ErrorCode.IMAGE_TOO_SMALL
+        if max(info.width, info.height) > self.max_aspect_ratio * min(
+            info.width, info.height
+        ):
+            return ErrorCode.IMAGE_ASPECT_RATIO
+        return None
+
+    def check_item(self, item: OpenGraphItem) -> bool:
+        """
+        Check the images of a validated item, adding any errors to it.
+
+        :returns: `True` if no image errors were found
+        """
+        return self.check_many([item])[0]
+
+    def check_many(self, items: typing.Iterable[OpenGraphItem]) -> typing.List[bool]:
+        """
+        Check the images of many validated items, adding any errors to them.
+        Every image is read at most once.
+
+        :returns: for each item, `True` if no image errors were found
+        """
+        items = list(items)
+        todo: typing.List[typing.Tuple[OpenGraphItem, str, typing.List[str]]] = []
+        for item in items:
+            errors = item.error_codes()  # raises if not validated
+            for field in IMAGE_FIELDS:
+                if field in errors:
+                    continue
+                value = item._data.get(field)
+                if isinstance(value, str):
+                    value = [value]
+                elif not isinstance(value, (list, tuple)):
+                    continue
+                urls = [v for v in value if isinstance(v, str)]
+                if self.resolve is not None:
+                    urls = [self.resolve(url) for url in urls]
+                if urls:
+                    todo.append((item, field, urls))
+        results = self.probe_many(url for (_i, _f, urls) in todo for url in urls)
+        failed: typing.Set[int] = set()
+        for item, field, urls in todo:
+            for url in urls:
+                code = self.check_info(results[url])
+                if code is not None:
+                    item.error_codes()[field] = code
+                    item._errors_view = None
+                    failed.add(id(item))
+                    break
+        return [id(item) not in failed for item in items]
+
+    def clear(self) -> None:
+        """clear the cache"""
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,257 @@
+"""
+Opt-in instrumentation of validation and rendering.
+
+    from opengraph_writer import instrumentation
+
+    collector = instrumentation.enable()
+    ...
+    collector.as_dict()
+    collector.as_prometheus()
+    instrumentation.disable()
+
+`enable()` swaps timed wrappers in for the validation phases and the renderer;
+`disable()` restores the originals.  While disabled nothing is wrapped, so
+there is no overhead at all.
+
+The phases are:
+
+    validate  - all of `OpenGraphItem.validate()`
+    generated - a full validation by the validator generated for the item's
+                og:type; see `opengraph_writer.codegen`
+    fields    - validating the values an item has
+    required  - checking the required properties are present
+    og_type   - checking the og:type
+    subtypes  - checking the og:type's subproperties are present
+    incremental - revalidating the fields set since the previous validation
+    render    - rendering tags; this includes `escape`
+    escape    - escaping property names and values
+
+A generated validator does all of its checks inline, so it is timed as one
+phase; `fields`, `required`, `og_type` and `subtypes` are only timed when the
+interpreted checks run instead, e.g. for schema1, an invalid og:type, or with
+`GENERATED_VALIDATORS` off.
+
+Subclass `StatsCollector` to send the measurements elsewhere.
+"""
+# stdlib
+from collections import Counter
+import threading
+import time
+import typing
+
+# local
+import opengraph_writer
+from . import OpenGraphItem
+
+# ==============================================================================
+
+_perf_counter = time.perf_counter
+
+
+class StatsCollector(object):
+    """collects call counts, cumulative time per phase, and error counts"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls: typing.Counter[str] = Counter()
+            self.seconds: typing.Dict[str, float] = {}
+            self.errors: typing.Counter[typing.Tuple[str, str]] = Counter()
+
+    def record_time(self, phase: str, elapsed: float) -> None:
+        with self._lock:
+            self.calls[phase] += 1
+            self.seconds[phase] = self.seconds.get(phase, 0.0) + elapsed
+
+    def record_errors(self, errors: opengraph_writer.ErrorCodes) -> None:
+        error_info = opengraph_writer.ERROR_INFO
+        with self._lock:
+            for field, code in errors.items():
+                self.errors[(error_info[code][0], field)] += 1
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+        """
+        {"calls": {phase: count},
+         "seconds": {phase: seconds},
+         "errors": {level: {property: count}}}
+        """
+        with self._lock:
+            errors: typing.Dict[str, typing.Dict[str, int]] = {}
+            for (level, field), count in self.errors.items():
+                errors.setdefault(level, {})[field] = count
+            return {
+                "calls": dict(self.calls),
+                "seconds": dict(self.seconds),
+                "errors": errors,
+            }
+
+    def as_prometheus(self, prefix: str = "opengraph_writer") -> str:
+        """the counters in the Prometheus text exposition format"""
+        stats = self.as_dict()
+        lines = [
+            "# HELP %s_calls_total Calls, by phase." % prefix,
+            "# TYPE %s_calls_total counter" % prefix,
+        ]
+        for phase, count in sorted(stats["calls"].items()):
+            lines.append('%s_calls_total{phase="%s"} %s' % (prefix, phase, count))
+        lines.extend(
+            (
+                "# HELP %s_seconds_total Cumulative time, by phase." % prefix,
+                "# TYPE %s_seconds_total counter" % prefix,
+            )
+        )
+        for phase, seconds in sorted(stats["seconds"].items()):
+            lines.append('%s_seconds_total{phase="%s"} %r' % (prefix, phase, seconds))
+        lines.extend(
+            (
+                "# HELP %s_errors_total Validation errors, by level and property."
+                % prefix,
+                "# TYPE %s_errors_total counter" % prefix,
+            )
+        )
+        for level, fields in sorted(stats["errors"].items()):
+            for field, count in sorted(fields.items()):
+                lines.append(
+                    '%s_errors_total{level="%s",property="%s"} %s'
+                    % (prefix, level, _escape_label(field), count)
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_collector: typing.Optional[StatsCollector] = None
+_originals: typing.Dict[typing.Tuple[typing.Any, str], typing.Any] = {}
+_lock = threading.Lock()
+
+
+def get_collector() -> typing.Optional[StatsCollector]:
+    """the active collector, or `None` if instrumentation is disabled"""
+    return _collector
+
+
+def _timed(phase: str, func: typing.Callable) -> typing.Callable:
+    def _wrapped(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        _start = _perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if _collector is not None:
+                _collector.record_time(phase, _perf_counter() - _start)
+
+    _wrapped.__wrapped__ = func  # type: ignore[attr-defined]
+    return _wrapped
+
+
+def _timed_validate(func: typing.Callable) -> typing.Callable:
+    def validate(self: OpenGraphItem, *args: typing.Any, **kwargs: typing.Any) -> bool:
+        _start = _perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            if _collector is not None:
+                _collector.record_time("validate", _perf_counter() - _start)
+                if self._errors is not None:
+                    _collector.record_errors(self._errors)
+
+    validate.__wrapped__ = func  # type: ignore[attr-defined]
+    return validate
+
+
+def _timed_iter(func: typing.Callable) -> typing.Callable:
+    def as_html_iter(
+        self: OpenGraphItem, *args: typing.Any, **kwargs: typing.Any
+    ) -> typing.Iterator[str]:
+        # only the time spent producing tags is counted, not the consumer's
+        _iter = func(self, *args, **kwargs)
+        _elapsed = 0.0
+        try:
+            while True:
+                _start = _perf_counter()
+                try:
+                    tag = next(_iter)
+                except StopIteration:
+                    break
+                finally:
+                    _elapsed += _perf_counter() - _start
+                yield tag
+        finally:
+            if _collector is not None:
+                _collector.record_time("render", _elapsed)
+
+    as_html_iter.__wrapped__ = func  # type: ignore[attr-defined]
+    return as_html_iter
+
+
+def _timed_type_validator(func: typing.Callable) -> typing.Callable:
+    """times the generated validators, which are what run uninstrumented"""
+
+    def _type_validator(
+        index: typing.Any,
+        og_type: str,
+        force: bool = False,
+    ) -> typing.Any:
+        validator = func(index, og_type, force)
+        if validator is None:
+            return None
+        return _timed("generated", validator)
+
+    _type_validator.__wrapped__ = func  # type: ignore[attr-defined]
+    return _type_validator
+
+
+def _wrappers() -> typing.List[typing.Tuple[typing.Any, str, typing.Callable]]:
+    """(owner, attribute, wrapper-factory) for everything that is timed"""
+    return [
+        (opengraph_writer, "_check_fields", lambda f: _timed("fields", f)),
+        (opengraph_writer, "_check_required", lambda f: _timed("required", f)),
+        (opengraph_writer, "_check_og_type", lambda f: _timed("og_type", f)),
+        (opengraph_writer, "_check_subtypes", lambda f: _timed("subtypes", f)),
+        (opengraph_writer, "_escape", lambda f: _timed("escape", f)),
+        (opengraph_writer, "_type_validator", _timed_type_validator),
+        (OpenGraphItem, "_validate_fields", lambda f: _timed("incremental", f)),
+        (OpenGraphItem, "validate", _timed_validate),
+        (OpenGraphItem, "as_html_iter", _timed_iter),
+    ]
+
+
+def enable(collector: typing.Optional[StatsCollector] = None) -> StatsCollector:
+    """
+    Start instrumenting, into `collector` or a new `StatsCollector`.  The
+    validation and rendering code is unchanged, only timed; see the phases
+    above.
+
+    :rtype: StatsCollector
+    """
+    global _collector
+    if collector is None:
+        collector = StatsCollector()
+    with _lock:
+        if not _originals:
+            for owner, name, factory in _wrappers():
+                original = getattr(owner, name)
+                _originals[(owner, name)] = original
+                setattr(owner, name, factory(original))
+        _collector = collector
+    return collector
+
+
+def disable() -> typing.Optional[StatsCollector]:
+    """
+    Stop instrumenting, and restore the uninstrumented functions.
+
+    :returns: the collector which was active, if any
+    """
+    global _collector
+    with _lock:
+        for (owner, name), original in _originals.items():
+            setattr(owner, name, original)
+        _originals.clear()
+        collector = _collector
+        _collector = None
+    return collector
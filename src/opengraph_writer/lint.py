@@ -0,0 +1,188 @@
+"""
+opengraph-lint: check the OpenGraph tags of a tree of rendered html files.
+
+Every `.html` and `.htm` file under each directory given, and every file
+given, is scanned up to `</head>` by `opengraph_writer.parser`.  Only the first
+`HEAD_BYTES` of a file are read; if `</head>` is not within them, the file is
+memory-mapped and scanned in place, so the rest of a large file is not read
+either.  Files are sent to a process pool by path, in batches.  Each output
+line is a JSON object:
+
+    {"path": "site/index.html", "valid": true, "errors": {"critical": {}, ...}}
+
+Files which can not be read are reported as `{"path": "...", "unreadable":
+"..."}`.  A summary is written to stderr.  The exit status is 1 if any file
+has a critical error or could not be read.
+"""
+# stdlib
+import argparse
+import json
+import mmap
+import os
+import sys
+import time
+import typing
+
+# local
+from . import OpenGraphItem
+from ._batching import iter_batches
+from ._batching import new_stats
+from ._batching import run_batches
+from ._batching import summarize
+from .parser import find_head_end
+from .parser import parse_html
+
+# typing
+_BATCH = typing.Tuple[str, ...]
+_OPTIONS = typing.Tuple[bool, bool, bool, bool]  # schema1, schema2, strict, skip_valid
+_STATS = typing.Dict[str, int]
+_RESULT = typing.Tuple[typing.List[str], _STATS]
+
+# ==============================================================================
+
+STATS_KEYS = ("files", "valid", "invalid", "unreadable", "critical", "recommended")
+
+SUFFIXES = (".html", ".htm")
+
+# the bytes read from the start of each file; a file whose `<head>` is longer
+# is memory-mapped instead.  Reading a small file is cheaper than mapping it.
+HEAD_BYTES = 16384
+
+
+def iter_files(
+    paths: typing.Iterable[str],
+    suffixes: typing.Tuple[str, ...] = SUFFIXES,
+) -> typing.Iterator[str]:
+    """
+    Yield every file under `paths` whose name ends with one of `suffixes`,
+    sorted by name, directory by directory.  A path which is not a directory
+    is yielded as is, as is a directory which can not be listed, so that it
+    is reported.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        # iteratively, as trees can be deeper than the recursion limit
+        stack = [path]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError:
+                yield directory
+                continue
+            subdirectories = []
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                elif entry.name.lower().endswith(suffixes):
+                    yield entry.path
+            stack.extend(reversed(subdirectories))
+
+
+def read_item(path: str) -> OpenGraphItem:
+    """an `OpenGraphItem` of the tags in the `<head>` of the html file `path`"""
+    with open(path, "rb") as fp:
+        head = fp.read(HEAD_BYTES)
+        if len(head) < HEAD_BYTES or find_head_end(head) is not None:
+            return parse_html(head)
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as document:
+            return parse_html(document)
+
+
+def _lint_batch(batch: _BATCH, options: _OPTIONS) -> _RESULT:
+    """lints a batch of files, returning the output lines"""
+    (schema1, schema2, strict, skip_valid) = options
+    outputs = []
+    stats = new_stats(STATS_KEYS)
+    for path in batch:
+        try:
+            item = read_item(path)
+        except (OSError, ValueError) as exc:
+            stats["unreadable"] += 1
+            outputs.append(json.dumps({"path": path, "unreadable": str(exc)}))
+            continue
+        status = item.validate(schema1=schema1, schema2=schema2, strict=strict)
+        counts = item.error_codes().level_counts()
+        stats["files"] += 1
+        stats["valid" if status else "invalid"] += 1
+        stats["critical"] += counts["critical"]
+        stats["recommended"] += counts["recommended"]
+        if status and skip_valid:
+            continue
+        outputs.append(
+            json.dumps({"path": path, "valid": status, "errors": item.errors()})
+        )
+    return (outputs, stats)
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="opengraph-lint",
+        description="Check the OpenGraph tags of a tree of html files.",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        metavar="PATH",
+        help="directories to search, or html files",
+    )
+    parser.add_argument(
+        "--suffix",
+        dest="suffixes",
+        action="append",
+        help="the suffix of the files to check in directories; may be repeated. "
+        "Default: %s" % " ".join(SUFFIXES),
+    )
+    parser.add_argument(
+        "--schema",
+        choices=("1", "2"),
+        default="2",
+        help="the schema to validate against. Default: 2",
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="report properties which are not in the schema as critical errors",
+    )
+    parser.add_argument(
+        "--skip-valid",
+        action="store_true",
+        help="only write the files which have a critical error",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="the number of worker processes. Default: the number of cpus",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=200,
+        help="the number of files sent to a worker at once. Default: 200",
+    )
+    return parser
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    args = _parser().parse_args(argv)
+    if args.batch_size < 1:
+        raise SystemExit("`--batch-size` must be at least 1")
+    suffixes = tuple(s.lower() for s in args.suffixes or SUFFIXES)
+    options: _OPTIONS = (
+        args.schema == "1",
+        args.schema == "2",
+        args.strict,
+        args.skip_valid,
+    )
+    _start = time.perf_counter()
+    batches = iter_batches(iter_files(args.paths, suffixes), args.batch_size)
+    stats = run_batches(_lint_batch, batches, options, args.workers, STATS_KEYS)
+    return summarize(stats, time.perf_counter() - _start, "files", "unreadable")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""
+Framework-neutral WSGI and ASGI middleware which inject the rendered tags of a
+per-request `OpenGraphItem` before the `</head>` of `text/html` responses.
+
+    app = OpenGraphWSGIMiddleware(app)  # Flask: app.wsgi_app = ...
+    app = OpenGraphASGIMiddleware(app)  # Starlette
+
+Each request is given a new item, under `ENVIRON_KEY` in the WSGI environ or
+the ASGI scope, unless the application put one there already:
+
+    item = environ[ENVIRON_KEY]  # Flask: request.environ[...]
+    item = scope[ENVIRON_KEY]  # Starlette: request.scope[...]
+
+The item must be populated before the response is started.  The body is
+streamed through chunk by chunk; only the few bytes which could be the start
+of a `</head>` split across two chunks are held back.  Responses are passed
+through untouched if the item is empty, or they are not `text/html`, or they
+are compressed, or their charset is unknown.  The item is validated if it was
+not, or was changed since.  `Content-Length` is dropped from responses which
+are injected into.
+"""
+# stdlib
+import codecs
+import re
+import typing
+
+# local
+from . import OpenGraphItem
+from .caching import RenderCache
+
+# typing
+_HEADERS = typing.List[typing.Tuple[str, str]]
+_ITEM_FACTORY = typing.Callable[[], OpenGraphItem]
+
+# ==============================================================================
+
+ENVIRON_KEY = "opengraph_writer.item"
+
+_regex_head_end = re.compile(rb"</head\s*>", re.I)
+# a `</head>` which may be completed by the next chunk
+_regex_head_partial = re.compile(rb"<(?:/(?:h(?:e(?:a(?:d\s*)?)?)?)?)?\Z", re.I)
+# the most bytes held back for `_regex_head_partial`
+MAX_HELD = 64
+
+
+class HeadInjector(object):
+    """
+    Inserts `html` before the first `</head>` of a body fed in chunks.
+
+        injector = HeadInjector(b"<meta ...>\\n")
+        for chunk in body:
+            yield injector.feed(chunk)
+        yield injector.flush()
+    """
+
+    def __init__(self, html: bytes) -> None:
+        self.html = html
+        self.injected = False
+        self._held = b""
+
+    def feed(self, chunk: bytes) -> bytes:
+        """return the bytes of `chunk` (and any held before) which are final"""
+        if self.injected:
+            return chunk
+        if self._held:
+            chunk = self._held + chunk
+            self._held = b""
+        _head_end = _regex_head_end.search(chunk)
+        if _head_end is not None:
+            self.injected = True
+            _position = _head_end.start()
+            return b"".join((chunk[:_position], self.html, chunk[_position:]))
+        _partial = _regex_head_partial.search(chunk, max(0, len(chunk) - MAX_HELD))
+        if _partial is None:
+            return chunk
+        _position = _partial.start()
+        self._held = chunk[_position:]
+        return chunk[:_position]
+
+    def flush(self) -> bytes:
+        """return anything still held, at the end of the body"""
+        held = self._held
+        self._held = b""
+        return held
+
+
+def _parse_content_type(value: str) -> typing.Tuple[str, str]:
+    """(mimetype, charset) of a Content-Type header"""
+    (mimetype, _sep, params) = value.partition(";")
+    charset = "utf-8"
+    for param in params.split(";"):
+        (k, _sep, v) = param.partition("=")
+        if k.strip().lower() == "charset" and v.strip():
+            charset = v.strip().strip('"')
+    return (mimetype.strip().lower(), charset)
+
+
+class _OpenGraphMiddleware(object):
+    def __init__(
+        self,
+        app: typing.Any,
+        debug: bool = False,
+        cache: typing.Optional[RenderCache] = None,
+        item_factory: typing.Optional[_ITEM_FACTORY] = None,
+    ) -> None:
+        self.app = app
+        self.debug = debug
+        self.cache = cache
+        self.item_factory = item_factory or OpenGraphItem
+
+    def _injector(
+        self,
+        item: typing.Optional[OpenGraphItem],
+        headers: typing.Iterable[typing.Tuple[str, str]],
+    ) -> typing.Optional[HeadInjector]:
+        """a `HeadInjector` for the response, or `None` to leave it untouched"""
+        if item is None or not item._data:
+            return None
+        charset = None
+        for k, v in headers:
+            k = k.lower()
+            if k == "content-type":
+                (mimetype, charset) = _parse_content_type(v)
+                if mimetype != "text/html":
+                    return None
+            elif k == "content-encoding" and v.strip().lower() != "identity":
+                return None
+        if charset is None:
+            return None
+        try:
+            codecs.lookup(charset)
+        except LookupError:
+            # a charset python does not know, so the html can not be encoded
+            return None
+        if item._dirty is None or item._dirty:
+            # not validated, or changed since
+            item.validate()
+        html = item.as_html(debug=self.debug, cache=self.cache)
+        if not html:
+            return None
+        return HeadInjector((html + "\n").encode(charset, "xmlcharrefreplace"))
+
+
+class OpenGraphWSGIMiddleware(_OpenGraphMiddleware):
+    """
+    WSGI middleware; see the module docstring.
+
+    :param app: the WSGI application
+    :param debug: render with `debug=True`. Default: False
+    :type debug: bool
+    :param cache: a `RenderCache` for the rendered html. Default: None
+    :type cache: RenderCache
+    :param item_factory: called to create each request's item, e.g.
+        `layer.new_item`. Default: `OpenGraphItem`
+    """
+
+    def __call__(
+        self,
+        environ: typing.Dict[str, typing.Any],
+        start_response: typing.Callable,
+    ) -> typing.Iterable[bytes]:
+        item = environ.get(ENVIRON_KEY)
+        if item is None:
+            item = environ[ENVIRON_KEY] = self.item_factory()
+        response = _WSGIResponse()
+
+        def _start_response(
+            status: str,
+            headers: _HEADERS,
+            exc_info: typing.Any = None,
+        ) -> typing.Callable[[bytes], typing.Any]:
+            response.injector = self._injector(item, headers)
+            if response.injector is not None:
+                headers = [(k, v) for k, v in headers if k.lower() != "content-length"]
+            response.write = start_response(status, headers, exc_info)
+            return response.write_chunk
+
+        response.result = self.app(environ, _start_response)
+        return response
+
+
+class _WSGIResponse(object):
+    """the application's iterable, with the tags injected"""
+
+    injector: typing.Optional[HeadInjector] = None
+    result: typing.Iterable[bytes] = ()
+    write: typing.Optional[typing.Callable[[bytes], typing.Any]] = None
+
+    def write_chunk(self, data: bytes) -> typing.Any:
+        # the legacy `write()` callable
+        if self.injector is not None:
+            data = self.injector.feed(data)
+        assert self.write is not None
+        return self.write(data)
+
+    def __iter__(self) -> typing.Iterator[bytes]:
+        for chunk in self.result:
+            if self.injector is not None:
+                chunk = self.injector.feed(chunk)
+                if not chunk:
+                    continue
+            yield chunk
+        if self.injector is not None:
+            held = self.injector.flush()
+            if held:
+                yield held
+
+    def close(self) -> None:
+        close = getattr(self.result, "close", None)
+        if close is not None:
+            close()
+
+
+class OpenGraphASGIMiddleware(_OpenGraphMiddleware):
+    """
+    ASGI middleware; see the module docstring.  Only `http` requests are
+    affected.
+
+    :param app: the ASGI application
+    :param debug: render with `debug=True`. Default: False
+    :type debug: bool
+    :param cache: a `RenderCache` for the rendered html. Default: None
+    :type cache: RenderCache
+    :param item_factory: called to create each request's item, e.g.
+        `layer.new_item`. Default: `OpenGraphItem`
+    """
+
+    async def __call__(
+        self,
+        scope: typing.Dict[str, typing.Any],
+        receive: typing.Callable,
+        send: typing.Callable,
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        item = scope.get(ENVIRON_KEY)
+        if item is None:
+            item = scope[ENVIRON_KEY] = self.item_factory()
+        injector: typing.Optional[HeadInjector] = None
+
+        async def _send(message: typing.Dict[str, typing.Any]) -> None:
+            nonlocal injector
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                injector = self._injector(
+                    item,
+                    ((k.decode("latin-1"), v.decode("latin-1")) for k, v in headers),
+                )
+                if injector is not None:
+                    message = dict(
+                        message,
+                        headers=[
+                            (k, v) for k, v in headers if k.lower() != b"content-length"
+                        ],
+                    )
+            elif message["type"] == "http.response.body" and injector is not None:
+                body = injector.feed(message.get("body", b""))
+                if not message.get("more_body", False):
+                    body += injector.flush()
+                message = dict(message, body=body)
+            await send(message)
+
+        await self.app(scope, receive, _send)
@@ -0,0 +1,143 @@
+"""
+Reads OpenGraph `<meta>` tags back out of html; the reverse of `as_html()`.
+
+The document is scanned with regular expressions instead of being parsed into
+a DOM.  Only `<meta property="..." content="...">` tags before the closing
+`</head>` (or the opening `<body>`, if `</head>` is omitted) are read; tags
+inside of `<!-- -->` comments are skipped.
+
+`str`, `bytes` and buffers such as `mmap.mmap` are all accepted; buffers are
+scanned in place and only the matched attributes are decoded.
+"""
+# stdlib
+import html
+import re
+import typing
+
+# local
+from . import OpenGraphItem
+
+# typing
+_DOCUMENT = typing.Union[str, bytes, bytearray, memoryview, typing.Any]
+_PAIR = typing.Tuple[str, str]
+
+# ==============================================================================
+
+# one pass over the document finds, in order: comments, which are skipped,
+# and an unclosed comment runs to the end of the document; the end of the
+# `<head>` (group 1); and `<meta>` tags (group 2), which may have a `>` inside
+# of a quoted attribute.  Every branch starts with the `<`, so the regex engine
+# can skip ahead to each `<`; the quoted attributes are matched as an unrolled
+# loop, which can not backtrack catastrophically.
+_PATTERN_SCAN = (
+    r"<(?:!--.*?(?:-->|\Z)"
+    r"|(/head\s*>|body[\s>])"
+    r"""|(meta\s[^>"']*(?:(?:"[^"]*"|'[^']*')[^>"']*)*>))"""
+)
+_PATTERN_ATTRIBUTE = (
+    r"""([a-zA-Z][a-zA-Z0-9_:.-]*)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))"""
+)
+
+_regexes_str = (
+    re.compile(_PATTERN_SCAN, re.I | re.S),
+    re.compile(_PATTERN_ATTRIBUTE),
+)
+_regexes_bytes = (
+    re.compile(_PATTERN_SCAN.encode("ascii"), re.I | re.S),
+    re.compile(_PATTERN_ATTRIBUTE.encode("ascii")),
+)
+
+
+def _unescape(value: str) -> str:
+    if "&" in value:
+        return html.unescape(value)
+    return value
+
+
+def iter_meta_properties(
+    document: _DOCUMENT,
+    encoding: str = "utf-8",
+) -> typing.Iterator[_PAIR]:
+    """
+    Yield the `(property, content)` of every `<meta>` tag in the `<head>` of
+    `document`, in document order.  Values are unescaped.
+
+    :param document: the html
+    :type document: str, bytes or buffer
+    :param encoding: the encoding of a `bytes` document. Default: utf-8
+    :type encoding: str
+    """
+    regex_scan: typing.Any
+    regex_attribute: typing.Any
+    if isinstance(document, str):
+        (regex_scan, regex_attribute) = _regexes_str
+        _decode = False
+    else:
+        (regex_scan, regex_attribute) = _regexes_bytes
+        _decode = True
+    for _match in regex_scan.finditer(document):
+        if _match.lastindex == 1:
+            # the end of the `<head>`
+            return
+        _tag = _match.group(2)
+        if _tag is None:
+            # a comment
+            continue
+        _property = _content = None
+        for _name, _double, _single, _bare in regex_attribute.findall(_tag):
+            _name = _name.lower()
+            if _name == (b"property" if _decode else "property"):
+                _property = _double or _single or _bare
+            elif _name == (b"content" if _decode else "content"):
+                _content = _double or _single or _bare
+        if _property is None or _content is None:
+            continue
+        if _decode:
+            yield (
+                _unescape(_property.decode(encoding, "replace")),
+                _unescape(_content.decode(encoding, "replace")),
+            )
+        else:
+            yield (_unescape(_property), _unescape(_content))
+
+
+def find_head_end(document: _DOCUMENT) -> typing.Optional[int]:
+    """
+    The offset of the `</head>` (or `<body>`) of `document`, outside of
+    comments, or `None` if the `<head>` is not closed within `document`.
+
+    :param document: the html
+    :type document: str, bytes or buffer
+    """
+    regex_scan: typing.Any
+    regex_scan = (_regexes_str if isinstance(document, str) else _regexes_bytes)[0]
+    for _match in regex_scan.finditer(document):
+        if _match.lastindex == 1:
+            return _match.start()
+    return None
+
+
+def parse_html(
+    document: _DOCUMENT,
+    encoding: str = "utf-8",
+) -> OpenGraphItem:
+    """
+    Build an `OpenGraphItem` from the `<meta>` tags in the `<head>` of
+    `document`.  A property which appears more than once becomes a list, just
+    as if it were `set(..., append=True)`.
+
+    :param document: the html
+    :type document: str, bytes or buffer
+    :param encoding: the encoding of a `bytes` document. Default: utf-8
+    :type encoding: str
+
+    :rtype: OpenGraphItem
+    """
+    item = OpenGraphItem()
+    data = item._data
+    for _property, _content in iter_meta_properties(document, encoding=encoding):
+        if _property in data:
+            item.set(_property, _content, append=True)
+        else:
+            data[_property] = _content
+    return item
@@ -1,21 +1,208 @@
 # stdlib
+import re
+import threading
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
 from typing import TYPE_CHECKING
 
 # local
 from . import OpenGraphItem
+from . import OpenGraphLayer
+from .caching import RenderCache
 
 if TYPE_CHECKING:
     from pyramid.config import Configurator
+    from pyramid.registry import Registry
     from pyramid.request import Request
+    from pyramid.response import Response
 
 # ==============================================================================
 
 
+REGISTRY_KEY_LAYER = "opengraph_writer.layer"
+REGISTRY_KEY_RENDER_CACHE = "opengraph_writer.render_cache"
+REGISTRY_KEY_POOL = "opengraph_writer.pool"
+
+_regex_head_end = re.compile(rb"</head\s*>", re.I)
+
+
+class OpenGraphItemPool(object):
+    """
+    A threadsafe, bounded pool of `OpenGraphItem`s which are `reset()` and
+    reused, instead of allocating a new item (and its errors) per request.
+
+    An item must not be used once it is released; do not keep references to a
+    pooled `request.opengraph_item`, or its `errors()`, beyond the request.
+
+    :param maxsize: the most idle items kept. Default: 256
+    :type maxsize: int
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        if maxsize < 1:
+            raise ValueError("`maxsize` must be at least 1")
+        self.maxsize = maxsize
+        self._items: List[OpenGraphItem] = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def acquire(self, layer: Optional[OpenGraphLayer] = None) -> OpenGraphItem:
+        """an empty item on top of `layer`; pooled if one is idle"""
+        with self._lock:
+            if self._items:
+                item = self._items.pop()
+                self.hits += 1
+            else:
+                self.misses += 1
+                return OpenGraphItem(layer=layer)
+        if item._layer is not layer:
+            item.reset(layer=layer)
+        return item
+
+    def release(self, item: OpenGraphItem) -> None:
+        """empty `item` and return it to the pool, unless the pool is full"""
+        item.reset(layer=item._layer)
+        with self._lock:
+            if len(self._items) < self.maxsize:
+                self._items.append(item)
+            else:
+                self.discarded += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            _acquired = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "discarded": self.discarded,
+                "hit_rate": (self.hits / _acquired) if _acquired else 0.0,
+            }
+
+
 def new_OpenGraphItem(request: "Request") -> OpenGraphItem:
-    """simply creates a new hub"""
+    """
+    simply creates a new hub, on top of the configured layer if any; or, if
+    pooling is on, acquires one which is released once the request finishes
+    """
+    layer = request.registry.get(REGISTRY_KEY_LAYER)
+    pool = request.registry.get(REGISTRY_KEY_POOL)
+    if pool is not None:
+        item = pool.acquire(layer=layer)
+        request.add_finished_callback(lambda request: pool.release(item))
+        return item
+    if layer is not None:
+        return OpenGraphItem(layer=layer)
     return OpenGraphItem()
 
 
+def set_opengraph_layer(
+    config: "Configurator",
+    layer: Optional[OpenGraphLayer],
+) -> None:
+    """
+    config directive: build every `request.opengraph_item` on top of `layer`
+
+        config.set_opengraph_layer(OpenGraphLayer(site_defaults))
+    """
+    config.registry[REGISTRY_KEY_LAYER] = layer
+
+
+def set_opengraph_item_pool(
+    config: "Configurator",
+    pool: Optional[OpenGraphItemPool],
+) -> None:
+    """
+    config directive: reuse `request.opengraph_item` objects from `pool`
+
+        config.set_opengraph_item_pool(OpenGraphItemPool(maxsize=256))
+    """
+    config.registry[REGISTRY_KEY_POOL] = pool
+
+
+def set_opengraph_render_cache(
+    config: "Configurator",
+    cache: Optional[RenderCache],
+) -> None:
+    """
+    config directive: the `RenderCache` used by `opengraph_tween_factory`
+
+        config.set_opengraph_render_cache(RenderCache(backend=SharedBackend()))
+    """
+    config.registry[REGISTRY_KEY_RENDER_CACHE] = cache
+
+
+def opengraph_tween_factory(
+    handler: Callable[["Request"], "Response"],
+    registry: "Registry",
+) -> Callable[["Request"], "Response"]:
+    """
+    A tween which renders `request.opengraph_item` and injects it before the
+    `</head>` of `text/html` responses, so templates need not render it.
+
+        config.add_tween("opengraph_writer.pyramid_helpers.opengraph_tween_factory")
+
+    Responses are only read if `request.opengraph_item` was used and has data.
+    An item which was not validated is validated with the defaults.  The html
+    is cached by route name and the item's content, in the `RenderCache` set
+    with `config.set_opengraph_render_cache()`, or a new process-local one.
+
+    Settings:
+
+        opengraph_writer.tween.debug = false  ; render with `debug=True`
+        opengraph_writer.tween.cache_size = 1024  ; for the default cache
+    """
+    from pyramid.settings import asbool
+
+    settings = registry.settings or {}
+    debug = asbool(settings.get("opengraph_writer.tween.debug", False))
+    cache = registry.get(REGISTRY_KEY_RENDER_CACHE)
+    if cache is None:
+        cache = RenderCache(
+            maxsize=int(settings.get("opengraph_writer.tween.cache_size", 1024))
+        )
+        registry[REGISTRY_KEY_RENDER_CACHE] = cache
+
+    def opengraph_tween(request: "Request") -> "Response":
+        response = handler(request)
+        # `reify` stores the item on the request when it is first accessed
+        item = request.__dict__.get("opengraph_item")
+        if item is None or not item._data:
+            return response
+        if response.content_type != "text/html":
+            return response
+        body = response.body
+        _head_end = _regex_head_end.search(body)
+        if _head_end is None:
+            return response
+        if item._errors is None:
+            item.validate()
+        matched_route = getattr(request, "matched_route", None)
+        html = cache.render(
+            item,
+            debug=debug,
+            namespace=matched_route.name if matched_route is not None else "",
+        )
+        _position = _head_end.start()
+        response.body = b"".join(
+            (
+                body[:_position],
+                html.encode(response.charset or "utf-8"),
+                b"\n",
+                body[_position:],
+            )
+        )
+        return response
+
+    return opengraph_tween
+
+
 def includeme(config: "Configurator") -> None:
     """
     the pyramid includeme command
@@ -23,3 +210,6 @@ def includeme(config: "Configurator") -> None:
     for every request
     """
     config.add_request_method(new_OpenGraphItem, "opengraph_item", reify=True)
+    config.add_directive("set_opengraph_layer", set_opengraph_layer)
+    config.add_directive("set_opengraph_item_pool", set_opengraph_item_pool)
+    config.add_directive("set_opengraph_render_cache", set_opengraph_render_cache)
@@ -0,0 +1,473 @@
+"""
+An optional asyncio step of validation, which resolves the urls an item
+references -- "profile" properties such as `article:author`, and properties
+typed as another og:type such as `music:album` -- and checks that each one
+responds with the expected `og:type`.
+
+    resolver = ReferenceResolver(max_concurrency=16, rate_limit=5.0)
+    status = await item.validate_async(resolver=resolver)
+
+    # many items; each url is resolved once, and cached for `ttl` seconds
+    await resolver.check_many(items)
+    await resolver.aclose()
+
+Only values which are urls are resolved.  Problems are reported, at the
+"recommended" level, as the `ErrorCode`s `REFERENCE_UNREACHABLE` and
+`REFERENCE_TYPE_MISMATCH`.  A field which already has an error is not checked.
+
+Pages are read through an `AsyncFetcher`; the default `AsyncHTTPFetcher` is a
+small HTTP/1.1 client which keeps connections alive for reuse, and reads at
+most `max_bytes` of each page.  A resolver must only be used within one event
+loop.
+"""
+# stdlib
+import asyncio
+from collections import OrderedDict
+import sys
+import time
+import typing
+from urllib.parse import urljoin
+from urllib.parse import urlsplit
+
+# local
+from . import ErrorCode
+from . import get_property_index
+from . import OpenGraphItem
+from . import PropertyIndex
+from . import regex_url
+from .parser import iter_meta_properties
+
+# typing
+_HOST = typing.Tuple[str, str, typing.Optional[int]]
+_RESPONSE = typing.Tuple[int, typing.Dict[str, str], bytes]
+_STREAMS = typing.Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+# ==============================================================================
+
+# the property types which are references to a profile; properties typed as
+# an og:type (e.g. "music.album") are references as well
+PROFILE_TYPES = ("profile",)
+
+_REDIRECTS = (301, 302, 303, 307, 308)
+
+
+class Resolution(typing.NamedTuple):
+    """the result of resolving a url"""
+
+    url: str
+    # the final HTTP status, or `None` if there was no response
+    status: typing.Optional[int]
+    og_type: typing.Optional[str]
+    error: typing.Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status is not None and 200 <= self.status < 300
+
+
+async def _read_response(
+    reader: asyncio.StreamReader,
+    max_bytes: int,
+) -> typing.Tuple[int, typing.Dict[str, str], bytes, bool]:
+    """(status, headers, body, reusable); at most `max_bytes` of the body"""
+    line = await reader.readline()
+    if not line:
+        raise OSError("connection closed")
+    (version, status_code) = line.split(None, 2)[:2]
+    status = int(status_code)
+    headers: typing.Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        (k, _sep, v) = line.decode("latin-1").partition(":")
+        headers[k.strip().lower()] = v.strip()
+    reusable = (
+        version == b"HTTP/1.1" and headers.get("connection", "").lower() != "close"
+    )
+    if status in (204, 304) or status < 200:
+        return (status, headers, b"", reusable)
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        body = bytearray()
+        while True:
+            size = int(
+                (await reader.readline()).split(b";")[0].strip() or b"0",
+                16,
+            )
+            if size == 0:
+                # trailers
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return (status, headers, bytes(body), reusable)
+            if len(body) + size > max_bytes:
+                body += await reader.readexactly(max_bytes - len(body))
+                return (status, headers, bytes(body), False)
+            body += await reader.readexactly(size)
+            await reader.readexactly(2)
+    content_length = headers.get("content-length")
+    if content_length is not None:
+        length = int(content_length)
+        if length > max_bytes:
+            return (status, headers, await reader.readexactly(max_bytes), False)
+        return (status, headers, await reader.readexactly(length), reusable)
+    # the body ends when the connection is closed
+    body = bytearray()
+    while len(body) < max_bytes:
+        chunk = await reader.read(max_bytes - len(body))
+        if not chunk:
+            break
+        body += chunk
+    return (status, headers, bytes(body), False)
+
+
+class AsyncFetcher(object):
+    """
+    The interface a `ReferenceResolver` reads pages through.  Subclass this to
+    use another http client, or to add authentication.
+    """
+
+    async def fetch(self, url: str, max_bytes: int) -> _RESPONSE:
+        """
+        return the `(status, headers, body)` of a GET of `url`, with lowercase
+        header names and at most `max_bytes` of the body; redirects are not
+        followed.  Raise an `OSError` if there is no response.
+        """
+        raise NotImplementedError()
+
+    async def aclose(self) -> None:
+        pass
+
+
+class AsyncHTTPFetcher(AsyncFetcher):
+    """
+    An `AsyncFetcher` for `http(s)://` urls which keeps idle connections alive
+    for reuse.
+
+    :param timeout: for connecting, and for reading each response, in
+        seconds. Default: 10.0
+    :type timeout: float
+    :param max_idle_per_host: the most idle connections kept for each host.
+        Default: 4
+    :type max_idle_per_host: int
+    :param headers: sent with every request
+    :type headers: dict
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        max_idle_per_host: int = 4,
+        headers: typing.Optional[typing.Dict[str, str]] = None,
+    ) -> None:
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self.headers = {"User-Agent": "opengraph_writer", "Accept": "text/html"}
+        if headers:
+            self.headers.update(headers)
+        self._idle: typing.Dict[_HOST, typing.List[_STREAMS]] = {}
+        self.connections_opened = 0
+
+    async def _open(self, host: _HOST) -> _STREAMS:
+        (scheme, hostname, port) = host
+        self.connections_opened += 1
+        if scheme == "https":
+            _open = asyncio.open_connection(hostname, port or 443, ssl=True)
+        else:
+            _open = asyncio.open_connection(hostname, port or 80)
+        return await asyncio.wait_for(_open, self.timeout)
+
+    async def fetch(self, url: str, max_bytes: int) -> _RESPONSE:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise OSError("unsupported url: %r" % url)
+        host = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        # the netloc may include a `user:password@`
+        hostname = parts.hostname
+        if ":" in hostname:
+            hostname = "[%s]" % hostname
+        if parts.port is not None:
+            hostname = "%s:%s" % (hostname, parts.port)
+        lines = ["GET %s HTTP/1.1" % path, "Host: %s" % hostname]
+        lines.extend("%s: %s" % kv for kv in self.headers.items())
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+        while True:
+            idle = self._idle.setdefault(host, [])
+            reused = bool(idle)
+            (reader, writer) = idle.pop() if reused else await self._open(host)
+            try:
+                writer.write(request)
+                (status, headers, body, reusable) = await asyncio.wait_for(
+                    _read_response(reader, max_bytes), self.timeout
+                )
+            except (
+                OSError,
+                ValueError,
+                asyncio.IncompleteReadError,
+                asyncio.TimeoutError,
+            ) as exc:
+                await self._close(writer)
+                if reused:
+                    # the server may have closed an idle connection
+                    continue
+                if isinstance(exc, OSError):
+                    raise
+                raise OSError(str(exc) or type(exc).__name__)
+            if reusable and len(idle) < self.max_idle_per_host:
+                idle.append((reader, writer))
+            else:
+                await self._close(writer)
+            return (status, headers, body)
+
+    async def _close(self, writer: asyncio.StreamWriter) -> None:
+        writer.close()
+        # `StreamWriter.wait_closed()` is new in Python 3.7
+        if sys.version_info >= (3, 7):
+            try:
+                await asyncio.wait_for(writer.wait_closed(), self.timeout)
+            except (OSError, asyncio.TimeoutError):
+                pass
+
+    async def aclose(self) -> None:
+        """close the idle connections"""
+        idle = self._idle
+        self._idle = {}
+        for connections in idle.values():
+            for _reader, writer in connections:
+                await self._close(writer)
+
+
+class ReferenceResolver(object):
+    """
+    Resolves and checks the urls items reference; see the module docstring.
+
+    :param fetcher: reads the pages. Default: a new `AsyncHTTPFetcher`
+    :type fetcher: AsyncFetcher
+    :param max_concurrency: the most urls resolved at once. Default: 16
+    :type max_concurrency: int
+    :param rate_limit: the most requests per second to each host, or `None`
+        for no limit. Default: None
+    :type rate_limit: float
+    :param ttl: the seconds a resolved url is cached for. Default: 3600
+    :type ttl: float
+    :param error_ttl: the seconds a url which did not resolve is cached for.
+        Default: 60
+    :type error_ttl: float
+    :param cache_size: the most urls cached. Default: 4096
+    :type cache_size: int
+    :param max_bytes: the most bytes of each page read. Default: 65536
+    :type max_bytes: int
+    :param max_redirects: Default: 3
+    :type max_redirects: int
+    :param clock: returns the time in seconds, for the cache.
+        Default: `time.monotonic`
+    """
+
+    def __init__(
+        self,
+        fetcher: typing.Optional[AsyncFetcher] = None,
+        max_concurrency: int = 16,
+        rate_limit: typing.Optional[float] = None,
+        ttl: float = 3600.0,
+        error_ttl: float = 60.0,
+        cache_size: int = 4096,
+        max_bytes: int = 65536,
+        max_redirects: int = 3,
+        clock: typing.Callable[[], float] = time.monotonic,
+    ) -> None:
+        if cache_size < 1:
+            raise ValueError("`cache_size` must be at least 1")
+        self.fetcher = fetcher if fetcher is not None else AsyncHTTPFetcher()
+        self.max_concurrency = max_concurrency
+        self.rate_limit = rate_limit
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.cache_size = cache_size
+        self.max_bytes = max_bytes
+        self.max_redirects = max_redirects
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        # url: (expires, Resolution)
+        self._cache: "OrderedDict[str, typing.Tuple[float, Resolution]]" = OrderedDict()
+        self._pending: typing.Dict[str, "asyncio.Future[Resolution]"] = {}
+        self._semaphore: typing.Optional[asyncio.Semaphore] = None
+        # host: the loop time its next request may start at
+        self._next_request: typing.Dict[str, float] = {}
+        # og_type: {field: expected og:type}, for `_references_index`
+        self._references: typing.Dict[typing.Optional[str], typing.Dict[str, str]] = {}
+        self._references_index: typing.Optional[PropertyIndex] = None
+
+    def _cache_get(self, url: str) -> typing.Optional[Resolution]:
+        cached = self._cache.get(url)
+        if cached is None:
+            return None
+        if cached[0] <= self.clock():
+            del self._cache[url]
+            return None
+        self._cache.move_to_end(url)
+        return cached[1]
+
+    def _cache_set(self, url: str, resolution: Resolution) -> None:
+        ttl = self.ttl if resolution.ok else self.error_ttl
+        self._cache[url] = (self.clock() + ttl, resolution)
+        self._cache.move_to_end(url)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _wait_for_host(self, url: str) -> None:
+        if not self.rate_limit:
+            return
+        host = urlsplit(url).netloc
+        now = asyncio.get_event_loop().time()
+        start = max(now, self._next_request.get(host, now))
+        self._next_request[host] = start + 1.0 / self.rate_limit
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def _resolve(self, url: str) -> Resolution:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        _url = url
+        for _i in range(self.max_redirects + 1):
+            # before taking a slot, so a rate limited host does not hold up
+            # the requests to other hosts
+            await self._wait_for_host(_url)
+            try:
+                async with self._semaphore:
+                    (status, headers, body) = await self.fetcher.fetch(
+                        _url, self.max_bytes
+                    )
+            except OSError as exc:
+                resolution = Resolution(url, None, None, str(exc))
+                break
+            location = headers.get("location")
+            if status in _REDIRECTS and location:
+                _url = urljoin(_url, location)
+                continue
+            og_type = None
+            if 200 <= status < 300:
+                for _property, _content in iter_meta_properties(body):
+                    if _property == "og:type":
+                        og_type = _content
+                        break
+            resolution = Resolution(url, status, og_type)
+            break
+        else:
+            resolution = Resolution(url, None, None, "too many redirects")
+        self._cache_set(url, resolution)
+        return resolution
+
+    async def resolve(self, url: str) -> Resolution:
+        """
+        Resolve `url`, from the cache if possible.  Concurrent calls for the
+        same url share a single request.
+        """
+        cached = self._cache_get(url)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        future = self._pending.get(url)
+        if future is None:
+            self.misses += 1
+            future = self._pending[url] = asyncio.ensure_future(self._resolve(url))
+            future.add_done_callback(lambda _f: self._pending.pop(url, None))
+        return await asyncio.shield(future)
+
+    def reference_fields(self, og_type: typing.Any) -> typing.Dict[str, str]:
+        """the reference properties of an og:type, and the og:type they expect"""
+        index = get_property_index()
+        if index is not self._references_index:
+            self._references = {}
+            self._references_index = index
+        if not isinstance(og_type, str):
+            og_type = None
+        fields = self._references.get(og_type)
+        if fields is None:
+            specs = list(index.properties.values())
+            subtypes = index.types.get(og_type) if og_type is not None else None
+            if subtypes is not None:
+                specs.extend(subtypes.values())
+            fields = {}
+            for spec in specs:
+                _type = spec.info.get("type")
+                if _type in PROFILE_TYPES:
+                    fields[spec.name] = "profile"
+                elif _type in index.types:
+                    fields[spec.name] = _type
+            self._references[og_type] = fields
+        return fields
+
+    def check_resolution(
+        self,
+        resolution: Resolution,
+        expected: str,
+    ) -> typing.Optional[ErrorCode]:
+        """the `ErrorCode` for a `Resolution`, or `None` if valid"""
+        if not resolution.ok:
+            return ErrorCode.REFERENCE_UNREACHABLE
+        if resolution.og_type != expected:
+            return ErrorCode.REFERENCE_TYPE_MISMATCH
+        return None
+
+    async def check_item(self, item: OpenGraphItem) -> bool:
+        """
+        Check the references of a validated item, adding any errors to it.
+
+        :returns: `True` if no reference errors were found
+        """
+        return (await self.check_many([item]))[0]
+
+    async def check_many(
+        self,
+        items: typing.Iterable[OpenGraphItem],
+    ) -> typing.List[bool]:
+        """
+        Check the references of many validated items, adding any errors to
+        them.  Every url is resolved at most once.
+
+        :returns: for each item, `True` if no reference errors were found
+        """
+        items = list(items)
+        todo: typing.List[typing.Tuple[OpenGraphItem, str, str, typing.List[str]]]
+        todo = []
+        for item in items:
+            errors = item.error_codes()  # raises if not validated
+            data = item._data
+            for field, expected in self.reference_fields(data.get("og:type")).items():
+                if field in errors or field not in data:
+                    continue
+                value = data[field]
+                values = value if isinstance(value, (list, tuple)) else [value]
+                urls = [v for v in values if isinstance(v, str) and regex_url.match(v)]
+                if urls:
+                    todo.append((item, field, expected, urls))
+        _urls = list(dict.fromkeys(url for (_i, _f, _e, urls) in todo for url in urls))
+        resolutions = dict(
+            zip(_urls, await asyncio.gather(*(self.resolve(url) for url in _urls)))
+        )
+        failed: typing.Set[int] = set()
+        for item, field, expected, urls in todo:
+            for url in urls:
+                code = self.check_resolution(resolutions[url], expected)
+                if code is not None:
+                    item.error_codes()[field] = code
+                    item._errors_view = None
+                    failed.add(id(item))
+                    break
+        return [id(item) not in failed for item in items]
+
+    def stats(self) -> typing.Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "cached": len(self._cache)}
+
+    def clear(self) -> None:
+        """clear the cache and reset the counters"""
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    async def aclose(self) -> None:
+        """close the fetcher's connections"""
+        await self.fetcher.aclose()
@@ -0,0 +1,475 @@
+"""
+Compact serialization of `OpenGraphItem`s, for passing items between
+processes and storing them in caches.
+
+    payload = to_bytes(item)
+    item = from_bytes(payload)
+
+    text = to_json(item)
+    item = from_json(text)
+
+`pickle` and `copy` use the binary format as well, through
+`OpenGraphItem.__reduce_ex__`, when it reads back exactly what was written;
+subclasses, items on a layer, and other values are pickled as usual.
+
+The binary format is versioned.  Property names which are in the schema are
+written as small integer ids, and datetimes and dates are written natively.
+The ids depend on the schema, so a payload also carries a fingerprint of the
+schema it was written with; reading it with a different schema raises a
+`ValueError`.  Items on a layer are written flattened, without the layer.
+
+Values may be `str`, `bool`, `int`, `float`, `None`, `datetime.datetime`,
+`datetime.date`, and lists or tuples of those.  A `datetime` keeps its UTC
+offset, but not its timezone name.  Other values raise a `TypeError`.
+"""
+# stdlib
+import datetime
+import hashlib
+import json
+import re
+import struct
+import threading
+import typing
+
+# local
+from . import ErrorCode
+from . import ErrorCodes
+from . import get_property_index
+from . import OpenGraphItem
+from . import PropertyIndex
+
+# typing
+_ITEM = typing.TypeVar("_ITEM", bound=OpenGraphItem)
+
+# ==============================================================================
+
+MAGIC = b"OGW"
+VERSION = 1
+
+# header flags
+_FLAG_ERRORS = 0x01
+
+# value tags
+_TAG_STR = 0x01
+_TAG_INT = 0x02
+_TAG_TRUE = 0x03
+_TAG_FALSE = 0x04
+_TAG_NONE = 0x05
+_TAG_FLOAT = 0x06
+_TAG_DATETIME = 0x07
+_TAG_DATETIME_TZ = 0x08
+_TAG_DATE = 0x09
+_TAG_LIST = 0x0A
+_TAG_TUPLE = 0x0B
+
+# year, month, day, hour, minute, second, microsecond
+_struct_datetime = struct.Struct(">HBBBBBI")
+# ... and the UTC offset in seconds
+_struct_datetime_tz = struct.Struct(">HBBBBBIi")
+_struct_date = struct.Struct(">HBB")
+_struct_float = struct.Struct(">d")
+
+_error_codes = {int(code): code for code in ErrorCode}
+
+# the `isoformat()` of a date or datetime; `fromisoformat()` is python 3.7+
+_regex_isoformat = re.compile(
+    r"(\d{4})-(\d\d)-(\d\d)"
+    r"(?:T(\d\d):(\d\d):(\d\d)(?:\.(\d{6}))?"
+    r"(?:([+-])(\d\d):(\d\d)(?::(\d\d))?)?)?\Z"
+)
+
+
+class _Names(object):
+    """the property ids of a `PropertyIndex`"""
+
+    __slots__ = ("index", "names", "ids", "fingerprint")
+
+    def __init__(self, index: PropertyIndex) -> None:
+        names = set(index.properties)
+        for subtypes in index.types.values():
+            names.update(subtypes)
+        self.index = index
+        # id 0 is reserved for names which are written out
+        self.names: typing.Tuple[str, ...] = ("",) + tuple(sorted(names))
+        self.ids = {name: i for (i, name) in enumerate(self.names) if i}
+        self.fingerprint = hashlib.blake2b(
+            "\n".join(self.names).encode("utf-8"), digest_size=4
+        ).digest()
+
+
+_names: typing.Optional[_Names] = None
+_names_lock = threading.Lock()
+
+
+def _get_names() -> _Names:
+    global _names
+    index = get_property_index()
+    names = _names
+    if names is None or names.index is not index:
+        with _names_lock:
+            names = _names = _Names(index)
+    return names
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> typing.Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return (value, pos)
+        shift += 7
+
+
+def _write_str(out: bytearray, value: str) -> None:
+    encoded = value.encode("utf-8", "surrogatepass")
+    _write_varint(out, len(encoded))
+    out += encoded
+
+
+def _read_str(data: bytes, pos: int) -> typing.Tuple[str, int]:
+    (length, pos) = _read_varint(data, pos)
+    end = pos + length
+    if end > len(data):
+        raise ValueError("truncated payload")
+    return (data[pos:end].decode("utf-8", "surrogatepass"), end)
+
+
+def _write_name(out: bytearray, name: str, ids: typing.Dict[str, int]) -> None:
+    _id = ids.get(name)
+    if _id is None:
+        out.append(0)
+        _write_str(out, name)
+    else:
+        _write_varint(out, _id)
+
+
+def _read_name(
+    data: bytes,
+    pos: int,
+    names: typing.Tuple[str, ...],
+) -> typing.Tuple[str, int]:
+    (_id, pos) = _read_varint(data, pos)
+    if _id == 0:
+        return _read_str(data, pos)
+    return (names[_id], pos)
+
+
+def _write_value(out: bytearray, value: typing.Any) -> None:
+    if isinstance(value, str):
+        out.append(_TAG_STR)
+        _write_str(out, value)
+    elif value is True:
+        out.append(_TAG_TRUE)
+    elif value is False:
+        out.append(_TAG_FALSE)
+    elif isinstance(value, int):
+        out.append(_TAG_INT)
+        # zigzag
+        _write_varint(out, (value << 1) if value >= 0 else ((-value << 1) - 1))
+    elif value is None:
+        out.append(_TAG_NONE)
+    elif isinstance(value, float):
+        out.append(_TAG_FLOAT)
+        out += _struct_float.pack(value)
+    elif isinstance(value, datetime.datetime):
+        _fields = (
+            value.year,
+            value.month,
+            value.day,
+            value.hour,
+            value.minute,
+            value.second,
+            value.microsecond,
+        )
+        offset = value.utcoffset()
+        if offset is None:
+            out.append(_TAG_DATETIME)
+            out += _struct_datetime.pack(*_fields)
+        else:
+            if offset % datetime.timedelta(seconds=1):
+                raise TypeError("UTC offsets must be whole seconds")
+            out.append(_TAG_DATETIME_TZ)
+            out += _struct_datetime_tz.pack(*_fields, int(offset.total_seconds()))
+    elif isinstance(value, datetime.date):
+        out.append(_TAG_DATE)
+        out += _struct_date.pack(value.year, value.month, value.day)
+    elif isinstance(value, (list, tuple)):
+        out.append(_TAG_LIST if isinstance(value, list) else _TAG_TUPLE)
+        _write_varint(out, len(value))
+        for v in value:
+            _write_value(out, v)
+    else:
+        raise TypeError("can not serialize a %s" % type(value).__name__)
+
+
+def _read_value(data: bytes, pos: int) -> typing.Tuple[typing.Any, int]:
+    tag = data[pos]
+    pos += 1
+    if tag == _TAG_STR:
+        return _read_str(data, pos)
+    elif tag == _TAG_TRUE:
+        return (True, pos)
+    elif tag == _TAG_FALSE:
+        return (False, pos)
+    elif tag == _TAG_INT:
+        (zigzag, pos) = _read_varint(data, pos)
+        return ((zigzag >> 1) if not (zigzag & 1) else -((zigzag + 1) >> 1), pos)
+    elif tag == _TAG_NONE:
+        return (None, pos)
+    elif tag == _TAG_FLOAT:
+        return (_struct_float.unpack_from(data, pos)[0], pos + _struct_float.size)
+    elif tag == _TAG_DATETIME:
+        _fields = _struct_datetime.unpack_from(data, pos)
+        return (datetime.datetime(*_fields), pos + _struct_datetime.size)
+    elif tag == _TAG_DATETIME_TZ:
+        _fields = _struct_datetime_tz.unpack_from(data, pos)
+        tz = datetime.timezone(datetime.timedelta(seconds=_fields[7]))
+        return (
+            datetime.datetime(*_fields[:7]).replace(tzinfo=tz),
+            pos + _struct_datetime_tz.size,
+        )
+    elif tag == _TAG_DATE:
+        _fields = _struct_date.unpack_from(data, pos)
+        return (datetime.date(*_fields), pos + _struct_date.size)
+    elif tag in (_TAG_LIST, _TAG_TUPLE):
+        (count, pos) = _read_varint(data, pos)
+        values = []
+        for _i in range(count):
+            (v, pos) = _read_value(data, pos)
+            values.append(v)
+        return (values if tag == _TAG_LIST else tuple(values), pos)
+    raise ValueError("unknown value tag %#x" % tag)
+
+
+# the attributes of an `OpenGraphItem` `to_bytes()` writes, or can leave out
+_ITEM_ATTRIBUTES = frozenset(
+    (
+        "_local",
+        "_data",
+        "_errors",
+        "_errors_view",
+        "_errors_spare",
+        "_content_hash",
+        "_dirty",
+        "_validated_with",
+    )
+)
+
+# the types `_read_value()` returns, so reads back as written
+_EXACT_TYPES = frozenset((str, bool, int, float, type(None), datetime.date))
+
+_SECOND = datetime.timedelta(seconds=1)
+
+
+def _lossless_value(value: typing.Any) -> bool:
+    _type = type(value)
+    if _type in _EXACT_TYPES:
+        return True
+    if _type is datetime.datetime:
+        tz = value.tzinfo
+        if tz is None:
+            return True
+        # only a `timezone` without a name is read back as it was
+        if type(tz) is not datetime.timezone:
+            return False
+        offset = tz.utcoffset(None)
+        if offset % _SECOND:
+            return False
+        return tz.tzname(None) == datetime.timezone(offset).tzname(None)
+    if _type is list or _type is tuple:
+        return all(_lossless_value(v) for v in value)
+    return False
+
+
+def _lossless(item: OpenGraphItem) -> bool:
+    """can `from_bytes(to_bytes(item))` recreate `item` exactly?"""
+    if not _ITEM_ATTRIBUTES.issuperset(item.__dict__):
+        return False
+    if item._errors is not None and type(item._errors) is not ErrorCodes:
+        return False
+    for field, value in item._data.items():
+        if type(field) is not str or not _lossless_value(value):
+            return False
+    return True
+
+
+def to_bytes(item: OpenGraphItem) -> bytes:
+    """
+    Serialize `item`'s data, and its errors if it was validated.
+
+    :rtype: bytes
+    """
+    names = _get_names()
+    ids = names.ids
+    data = item._data
+    errors = item._errors
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    out += names.fingerprint
+    out.append(_FLAG_ERRORS if errors is not None else 0)
+    _write_varint(out, len(data))
+    for field, value in data.items():
+        _write_name(out, field, ids)
+        _write_value(out, value)
+    if errors is not None:
+        _write_varint(out, len(errors))
+        for field, code in errors.items():
+            _write_name(out, field, ids)
+            out.append(code)
+    return bytes(out)
+
+
+def from_bytes(
+    payload: bytes,
+    cls: typing.Type[_ITEM] = OpenGraphItem,  # type: ignore[assignment]
+) -> _ITEM:
+    """
+    Deserialize an item written by `to_bytes()`.
+
+    :param payload: the output of `to_bytes()`
+    :type payload: bytes
+    :param cls: the `OpenGraphItem` class to create. Default: `OpenGraphItem`
+
+    :rtype: OpenGraphItem
+    """
+    payload = bytes(payload)
+    if payload[:3] != MAGIC:
+        raise ValueError("not an OpenGraphItem payload")
+    if len(payload) < 9:
+        raise ValueError("truncated payload")
+    if payload[3] != VERSION:
+        raise ValueError("unsupported payload version %s" % payload[3])
+    names = _get_names()
+    if payload[4:8] != names.fingerprint:
+        raise ValueError("the payload was written with a different schema")
+    flags = payload[8]
+    pos = 9
+    _names = names.names
+    _size = len(payload)
+    try:
+        (count, pos) = _read_varint(payload, pos)
+        data: typing.Dict[str, typing.Any] = {}
+        for _i in range(count):
+            # inlined: names with a one-byte id, and short strings
+            _id = payload[pos]
+            if 0 < _id < 0x80:
+                field = _names[_id]
+                pos += 1
+            else:
+                (field, pos) = _read_name(payload, pos, _names)
+            if payload[pos] == _TAG_STR and payload[pos + 1] < 0x80:
+                end = pos + 2 + payload[pos + 1]
+                if end > _size:
+                    raise ValueError("truncated payload")
+                data[field] = payload[pos + 2 : end].decode(  # noqa: E203
+                    "utf-8", "surrogatepass"
+                )
+                pos = end
+            else:
+                (data[field], pos) = _read_value(payload, pos)
+        errors = None
+        if flags & _FLAG_ERRORS:
+            errors = ErrorCodes()
+            (count, pos) = _read_varint(payload, pos)
+            for _i in range(count):
+                (field, pos) = _read_name(payload, pos, _names)
+                errors[field] = _error_codes[payload[pos]]
+                pos += 1
+    except (IndexError, KeyError, struct.error):
+        raise ValueError("truncated or invalid payload")
+    item = cls()
+    item._local.update(data)
+    if errors is not None:
+        item._errors = errors
+    return item
+
+
+def _json_default(value: typing.Any) -> typing.Any:
+    if isinstance(value, datetime.datetime):
+        offset = value.utcoffset()
+        if offset is not None and offset % datetime.timedelta(seconds=1):
+            raise TypeError("UTC offsets must be whole seconds")
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"$date": value.isoformat()}
+    raise TypeError("can not serialize a %s" % type(value).__name__)
+
+
+def _parse_isoformat(value: str) -> typing.Any:
+    m = _regex_isoformat.match(value)
+    if m is None:
+        raise ValueError("invalid isoformat: %r" % value)
+    _fields = m.groups()
+    _ints = [int(i or 0) for i in _fields[:7]]
+    if _fields[3] is None:
+        return datetime.date(_ints[0], _ints[1], _ints[2])
+    tz = None
+    if _fields[7] is not None:
+        offset = datetime.timedelta(
+            hours=int(_fields[8]),
+            minutes=int(_fields[9]),
+            seconds=int(_fields[10] or 0),
+        )
+        tz = datetime.timezone(-offset if _fields[7] == "-" else offset)
+    (year, month, day, hour, minute, second, microsecond) = _ints
+    return datetime.datetime(
+        year, month, day, hour, minute, second, microsecond, tzinfo=tz
+    )
+
+
+def _json_object_hook(value: typing.Dict[str, typing.Any]) -> typing.Any:
+    if len(value) == 1:
+        if "$datetime" in value:
+            return _parse_isoformat(value["$datetime"])
+        if "$date" in value:
+            return _parse_isoformat(value["$date"])
+    return value
+
+
+def to_json(item: OpenGraphItem) -> str:
+    """
+    Serialize `item` as JSON:
+
+        {"v": 1, "data": {...}, "errors": {"og:title": 1, ...}}
+
+    `errors` maps fields to `ErrorCode` values, and is only present if the
+    item was validated.  Datetimes and dates are written as
+    `{"$datetime": isoformat}` and `{"$date": isoformat}`; tuples as lists.
+
+    :rtype: str
+    """
+    doc: typing.Dict[str, typing.Any] = {"v": VERSION, "data": dict(item._data)}
+    if item._errors is not None:
+        doc["errors"] = {field: int(code) for (field, code) in item._errors.items()}
+    return json.dumps(doc, default=_json_default, separators=(",", ":"))
+
+
+def from_json(
+    text: typing.Union[str, bytes],
+    cls: typing.Type[_ITEM] = OpenGraphItem,  # type: ignore[assignment]
+) -> _ITEM:
+    """
+    Deserialize an item written by `to_json()`.
+
+    :rtype: OpenGraphItem
+    """
+    doc = json.loads(text, object_hook=_json_object_hook)
+    if not isinstance(doc, dict) or doc.get("v") != VERSION:
+        raise ValueError("not a version %s OpenGraphItem document" % VERSION)
+    item = cls()
+    item._local.update(doc["data"])
+    if "errors" in doc:
+        item._errors = ErrorCodes(
+            (field, ErrorCode(code)) for (field, code) in doc["errors"].items()
+        )
+    return item
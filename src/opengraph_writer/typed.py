@@ -0,0 +1,286 @@
+"""
+Typed item classes, generated from `OG_PROPERTIES` for each og:type.
+
+Each property is an attribute, named after the property with `:` and `.`
+replaced by `_`, which checks its value when it is set:
+
+    from opengraph_writer.typed import MusicSongItem
+
+    song = MusicSongItem(og_title="Sucker", music_duration=181)
+    song.og_image = "http://example.com/sucker.jpg"
+    song.music_album_track = "three"  # raises a `ValueError`
+
+Since the values were checked when they were set, `validate()` only looks for
+missing properties, and the fields are rendered in an order sorted once, when
+the class is generated.  Fields outside of the schema can be `set()`; they are
+reported as "not_validated", as by `OpenGraphItem`.
+
+Classes are generated on first use, by `get_item_class()` or by importing
+them by name; on python 3.6, which has no module `__getattr__`, every class is
+generated on import.
+
+`from_item()` and `to_item()` convert to and from an `OpenGraphItem` without
+loss.  A value changed in place, such as a list which is appended to, is not
+checked; `to_item().validate()` checks every value.
+"""
+# stdlib
+import sys
+import typing
+
+# local
+import opengraph_writer
+from . import _OG_DATA
+from . import _meta_prefix
+from . import ERROR_INFO
+from . import ErrorCode
+from . import ErrorCodes
+from . import get_property_index
+from . import OGErrors
+from . import OpenGraphItem
+from . import stringify
+from .codegen import class_name
+from .codegen import compile_item_class
+
+# ==============================================================================
+
+
+class TypedOpenGraphItem(object):
+    """
+    The base of the generated classes; use `get_item_class()` to get the class
+    of an og:type.
+    """
+
+    __slots__ = ("_extra", "_errors")
+
+    # the og:type of the class
+    og_type: str = ""
+    # field: attribute, of every property of the og:type
+    _attributes: typing.Dict[str, str] = {}
+    # every field, including og:type, in render order
+    _render_fields: typing.Tuple[str, ...] = ()
+    # the escaped `<meta property="..." content="` of each of `_render_fields`
+    _render_prefixes: typing.Tuple[str, ...] = ()
+    # returns the value of each of `_render_fields`
+    _values: typing.Callable[[typing.Any], typing.Tuple[typing.Any, ...]]
+
+    # fields outside of the schema
+    _extra: _OG_DATA
+    _errors: typing.Optional[ErrorCodes]
+
+    def _check(self, errors: ErrorCodes, quiet: bool) -> None:
+        """
+        note the missing properties; each generated class has its own, and
+        the base class has no properties to miss
+        """
+
+    def __repr__(self) -> str:
+        return "<%s %r>" % (self.__class__.__name__, [f for (f, _v) in self.items()])
+
+    def __reduce__(self) -> typing.Any:
+        # by og:type, as the class is generated again if the schema changes
+        errors = tuple(self._errors.items()) if self._errors is not None else None
+        return (_restore, (self.og_type, self.items(), errors))
+
+    def get(self, field: str, default: typing.Any = None) -> typing.Any:
+        attribute = self._attributes.get(field)
+        if attribute is not None:
+            value = getattr(self, attribute)
+        elif field == "og:type":
+            value = self.og_type
+        else:
+            value = self._extra.get(field)
+        if value is None:
+            return default
+        return value
+
+    def set(
+        self,
+        field: str,
+        value: typing.Any,
+        append: bool = False,
+    ) -> None:
+        """
+        Like `OpenGraphItem.set()`.  A value which is not valid for `field`
+        raises a `ValueError`, and the item is not changed.
+        """
+        if append:
+            current = self.get(field)
+            if current is None:
+                value = [value]
+            elif isinstance(current, list):
+                value = current + [value]
+            else:
+                value = [current, value]
+        attribute = self._attributes.get(field)
+        if attribute is not None:
+            setattr(self, attribute, value)
+        elif field == "og:type":
+            if value != self.og_type:
+                raise ValueError(
+                    "The og:type of a %s is fixed" % self.__class__.__name__
+                )
+        else:
+            self._extra[field] = value
+
+    def items(self) -> typing.List[typing.Tuple[str, typing.Any]]:
+        """the (field, value) pairs which are set, sorted by field"""
+        pairs = [
+            (f, v)
+            for (f, v) in zip(self._render_fields, self._values(self))
+            if v is not None
+        ]
+        if self._extra:
+            pairs.extend(self._extra.items())
+            pairs.sort(key=lambda pair: pair[0])
+        return pairs
+
+    @classmethod
+    def from_item(cls, item: OpenGraphItem) -> "TypedOpenGraphItem":
+        """
+        create a copy of `item`, including its errors.  Raises a `ValueError`
+        if `item` has another og:type, or a value which is not valid or is
+        `None`.
+        """
+        data = item._data
+        if data.get("og:type") != cls.og_type:
+            raise ValueError("The item's og:type is not %r" % cls.og_type)
+        typed = cls()
+        for field, value in data.items():
+            if value is None:
+                raise ValueError("%s is `None`" % field)
+            typed.set(field, list(value) if isinstance(value, list) else value)
+        if item._errors is not None:
+            typed._errors = ErrorCodes(item._errors)
+        return typed
+
+    def to_item(self) -> OpenGraphItem:
+        """create an `OpenGraphItem` copy of this item, including its errors"""
+        item = OpenGraphItem()
+        item._data = item._local = {
+            f: (list(v) if isinstance(v, list) else v) for (f, v) in self.items()
+        }
+        if self._errors is not None:
+            item._errors = ErrorCodes(self._errors)
+        return item
+
+    def validate(
+        self,
+        strict: bool = False,
+        quiet: bool = False,
+    ) -> bool:
+        """
+        Like `OpenGraphItem.validate()` against schema2; only the missing
+        properties, and the fields outside of the schema, are looked for.
+
+        :rtype: bool
+        """
+        errors = ErrorCodes()
+        for field in self._extra:
+            if strict:
+                errors[field] = ErrorCode.UNSUPPORTED
+            elif not quiet:
+                errors[field] = ErrorCode.NOT_VALIDATED
+        self._check(errors, quiet)
+        self._errors = errors
+        return not errors.has_critical()
+
+    def errors(self) -> OGErrors:
+        return self.error_codes().as_errors()
+
+    def error_codes(self) -> ErrorCodes:
+        if self._errors is None:
+            raise ValueError("You must call `.validate()` first")
+        return self._errors
+
+    def _tags(self, debug: bool) -> typing.List[str]:
+        """the rendered `<meta>` tags"""
+        errors = self._errors if debug else None
+        # through the module, so that `instrumentation` can time it
+        _escape = opengraph_writer._escape
+        fields: typing.Iterable[typing.Tuple[str, str, typing.Any]]
+        if self._extra:
+            fields = ((_meta_prefix(f), f, v) for (f, v) in self.items())
+        else:
+            # already in render order
+            fields = zip(self._render_prefixes, self._render_fields, self._values(self))
+        tags: typing.List[str] = []
+        for prefix, field, value in fields:
+            if value is None:
+                continue
+            suffix = '"/>'
+            if errors:
+                code = errors.get(field)
+                if code is not None and code != ErrorCode.NOT_VALIDATED:
+                    (level, message) = ERROR_INFO[code]
+                    suffix = '" %s-error="%s"/>' % (level, _escape(message))
+            if isinstance(value, list):
+                tags.extend(prefix + _escape(stringify(i)) + suffix for i in value)
+            else:
+                tags.append(prefix + _escape(stringify(value)) + suffix)
+        return tags
+
+    def as_html_iter(
+        self,
+        debug: bool = False,
+    ) -> typing.Iterator[str]:
+        """like `OpenGraphItem.as_html_iter()`"""
+        if self._errors is None:
+            return
+        yield from self._tags(debug)
+
+    def as_html(
+        self,
+        debug: bool = False,
+    ) -> str:
+        """like `OpenGraphItem.as_html()`"""
+        if self._errors is None:
+            return ""
+        return "\n".join(self._tags(debug))
+
+
+def get_item_class(og_type: str) -> typing.Type[TypedOpenGraphItem]:
+    """the typed item class of `og_type`, generated on first use"""
+    index = get_property_index()
+    cls = index.item_classes.get(og_type)
+    if cls is None:
+        if og_type not in index.types:
+            raise ValueError("%r is not a valid og:type" % og_type)
+        cls = index.item_classes[og_type] = compile_item_class(
+            index, og_type, TypedOpenGraphItem
+        )
+    return cls
+
+
+def _restore(
+    og_type: str,
+    pairs: typing.List[typing.Tuple[str, typing.Any]],
+    errors: typing.Optional[typing.Tuple[typing.Tuple[str, ErrorCode], ...]],
+) -> TypedOpenGraphItem:
+    typed = get_item_class(og_type)()
+    for field, value in pairs:
+        typed.set(field, value)
+    if errors is not None:
+        typed._errors = ErrorCodes(errors)
+    return typed
+
+
+def from_item(item: OpenGraphItem) -> TypedOpenGraphItem:
+    """a copy of `item` as an instance of the class of its og:type"""
+    og_type = item._data.get("og:type")
+    if not isinstance(og_type, str):
+        raise ValueError("The item has no og:type")
+    return get_item_class(og_type).from_item(item)
+
+
+def __getattr__(name: str) -> typing.Any:
+    """the classes are importable by name, e.g. `ArticleItem`; see PEP 562"""
+    for og_type in get_property_index().types:
+        if class_name(og_type) == name:
+            return get_item_class(og_type)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+if sys.version_info < (3, 7):
+    # module `__getattr__` needs python 3.7; generate every class up front instead
+    for _og_type in get_property_index().types:
+        globals()[class_name(_og_type)] = get_item_class(_og_type)
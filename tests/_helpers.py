@@ -0,0 +1,20 @@
+# local package
+from opengraph_writer import OpenGraphItem
+
+
+class _TestsHelper(object):
+    def _make_core_compliant(
+        self,
+        og_title="MyWebsite",
+        og_type="website",
+    ):
+        a = OpenGraphItem()
+        a.set_many(
+            (
+                ("og:title", og_title),
+                ("og:type", og_type),
+                ("og:image", "http://f.me/a.png"),
+                ("og:url", "http://f.me"),
+            )
+        )
+        return a
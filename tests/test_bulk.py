@@ -0,0 +1,66 @@
+# stdlib
+from concurrent.futures import ThreadPoolExecutor
+import unittest
+
+# local package
+from opengraph_writer import ErrorCode
+from opengraph_writer.bulk import validate_many
+from opengraph_writer.bulk import validate_many_codes
+from ._helpers import _TestsHelper
+
+
+class TestValidateMany(unittest.TestCase, _TestsHelper):
+    def _make_items(self, count):
+        # every third item has an invalid og:type
+        return [
+            self._make_core_compliant(
+                og_title="Item %s" % i, og_type="article" if i % 3 else "invalid"
+            )
+            for i in range(count)
+        ]
+
+    def _check(self, items, results):
+        self.assertEqual(len(items), len(results))
+        for i, (item, (status, errors)) in enumerate(zip(items, results)):
+            self.assertEqual(status, bool(i % 3))
+            self.assertEqual(errors, item.errors())
+            self.assertEqual(item.validate(), status)
+            self.assertEqual(errors, item.errors())
+
+    def test_in_process(self):
+        items = self._make_items(10)
+        results = validate_many(items, workers=4)
+        self._check(items, results)
+
+    def test_process_pool(self):
+        items = self._make_items(50)
+        results = validate_many(items, workers=2, chunksize=7, min_items_parallel=0)
+        self._check(items, results)
+
+    def test_schema1(self):
+        items = self._make_items(6)
+        results = validate_many(items, workers=1, schema1=True, schema2=False)
+        self.assertEqual([r[0] for r in results], [bool(i % 3) for i in range(6)])
+        # schema1 does not check subtypes
+        self.assertFalse(results[1][1]["recommended"])
+
+    def test_codes(self):
+        items = self._make_items(6)
+        results = validate_many_codes(items, workers=1)
+        for item, (status, codes) in zip(items, results):
+            self.assertEqual(status, not codes.has_critical())
+            self.assertEqual(codes.as_errors(), item.errors())
+            # a copy, which the next validation does not change
+            self.assertIsNot(codes, item.error_codes())
+
+    def test_revalidate(self):
+        # a strict or quiet pass is not built on by the next `validate()`
+        for kwargs in ({"strict": True}, {"quiet": True}):
+            a = self._make_items(2)[1]
+            a.set("x:unknown", "1")
+            a.validate()
+            with ThreadPoolExecutor(2) as executor:
+                (status, errors) = validate_many([a], executor=executor, **kwargs)[0]
+            self.assertEqual(status, "strict" not in kwargs)
+            self.assertTrue(a.validate())
+            self.assertEqual(a.error_codes()["x:unknown"], ErrorCode.NOT_VALIDATED)
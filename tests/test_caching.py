@@ -0,0 +1,69 @@
+# stdlib
+import unittest
+
+# local package
+from opengraph_writer import OpenGraphItem
+from opengraph_writer.caching import LRUCacheBackend
+from opengraph_writer.caching import RenderCache
+from ._helpers import _TestsHelper
+
+
+class TestRenderCache(unittest.TestCase, _TestsHelper):
+    def test_hit_miss(self):
+        cache = RenderCache()
+        a = self._make_core_compliant()
+        a.validate()
+        b = self._make_core_compliant()
+        b.validate()
+        self.assertEqual(a.content_hash(), b.content_hash())
+        html_a = a.as_html(cache=cache)
+        html_b = b.as_html(cache=cache)
+        self.assertEqual(html_a, a.as_html())
+        self.assertEqual(html_a, html_b)
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1})
+
+    def test_debug_keyed(self):
+        cache = RenderCache()
+        a = self._make_core_compliant()
+        a.set("og:image:width", "wide")
+        a.validate()
+        self.assertEqual(a.as_html(cache=cache), a.as_html())
+        html_debug = a.as_html(debug=True, cache=cache)
+        self.assertEqual(html_debug, a.as_html(debug=True))
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 2})
+
+    def test_set_invalidates(self):
+        cache = RenderCache()
+        a = self._make_core_compliant()
+        a.validate()
+        a.as_html(cache=cache)
+        a.set("og:title", "Other")
+        self.assertIn('content="Other"', a.as_html(cache=cache))
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 2})
+
+    def test_not_validated(self):
+        cache = RenderCache()
+        a = OpenGraphItem()
+        a.set("og:title", "MyWebsite")
+        self.assertEqual(a.as_html(cache=cache), "")
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0})
+
+    def test_lru_eviction(self):
+        backend = LRUCacheBackend(maxsize=2)
+        cache = RenderCache(backend=backend)
+        (one, two, three) = [
+            self._make_core_compliant(og_title=title)
+            for title in ("one", "two", "three")
+        ]
+        for a in (one, two, three):
+            a.validate()
+        one.as_html(cache=cache)
+        two.as_html(cache=cache)
+        one.as_html(cache=cache)  # `one` is now the most recent
+        three.as_html(cache=cache)  # evicts `two`
+        self.assertEqual(len(backend), 2)
+        two.as_html(cache=cache)
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 4})
+        cache.clear()
+        self.assertEqual(len(backend), 0)
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0})
@@ -0,0 +1,85 @@
+# stdlib
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+# local package
+from opengraph_writer import _batching
+from opengraph_writer import cli
+
+
+_LINES = [
+    {
+        "og:title": "MyWebsite",
+        "og:type": "website",
+        "og:image": ["http://f.me/a.png", "http://f.me/b.png"],
+        "og:url": "http://f.me",
+    },
+    {"og:title": "MyWebsite", "og:image": "http://f.me/a.png", "og:url": "http://f.me"},
+]
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".jsonl")
+        with os.fdopen(fd, "w") as fp:
+            for i in range(10):
+                for line in _LINES:
+                    fp.write(json.dumps(line) + "\n")
+            fp.write("\n")  # blank lines are skipped
+            fp.write("not json\n")
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def _run(self, *args):
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            status = cli.main(list(args) + [self.path])
+        outputs = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        return (status, outputs, stderr.getvalue())
+
+    def test_errors(self):
+        (status, outputs, summary) = self._run("--batch-size", "3")
+        self.assertEqual(status, 1)
+        self.assertEqual(len(outputs), 21)
+        self.assertEqual([o["line"] for o in outputs[:3]], [1, 2, 3])
+        self.assertTrue(outputs[0]["valid"])
+        self.assertFalse(outputs[1]["valid"])
+        self.assertIn("og:type", outputs[1]["errors"]["critical"])
+        self.assertEqual(outputs[-1]["line"], 22)
+        self.assertIn("malformed", outputs[-1])
+        self.assertIn("20 items", summary)
+        self.assertIn("valid: 10, invalid: 10, malformed: 1", summary)
+
+    def test_html(self):
+        (status, outputs, summary) = self._run("--format", "html")
+        self.assertEqual(
+            outputs[0]["html"],
+            """<meta property="og:image" content="http://f.me/a.png"/>
+<meta property="og:image" content="http://f.me/b.png"/>
+<meta property="og:title" content="MyWebsite"/>
+<meta property="og:type" content="website"/>
+<meta property="og:url" content="http://f.me"/>""",
+        )
+
+    def test_workers(self):
+        single = self._run("--schema", "1")
+        multi = self._run("--schema", "1", "--workers", "2", "--batch-size", "4")
+        self.assertEqual(single[0], multi[0])
+        self.assertEqual(single[1], multi[1])
+
+    def test_summarize(self):
+        # by key, whatever order the stats are in
+        stats = dict.fromkeys(reversed(cli.STATS_KEYS), 0)
+        stats.update(items=3, valid=2, malformed=1)
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            status = _batching.summarize(stats, 1.0, "items", "malformed")
+        self.assertEqual(status, 1)
+        self.assertIn("3 items in 1.00s", stderr.getvalue())
+        self.assertIn("valid: 2, invalid: 0, malformed: 1", stderr.getvalue())
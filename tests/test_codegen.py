@@ -0,0 +1,95 @@
+# stdlib
+import datetime
+import random
+import unittest
+
+# local package
+import opengraph_writer
+from opengraph_writer import get_property_index
+from opengraph_writer import OpenGraphItem
+from opengraph_writer import OpenGraphLayer
+from opengraph_writer.codegen import get_source
+
+
+# valid and invalid values of every property type
+_VALUES = (
+    "sample",
+    "",
+    "http://example.com/a.png",
+    "not a url",
+    "120",
+    "-1",
+    "1.5",
+    120,
+    True,
+    "true",
+    "male",
+    "2012-02-02T15:29:00Z",
+    "2012-02-02",
+    datetime.date(2012, 2, 2),
+    datetime.datetime(2012, 2, 2, 15, 29),
+    None,
+    1.5,
+    {"a": 1},
+    ["http://example.com/a.png", "http://example.com/b.png"],
+    ["http://example.com/a.png", "not a url"],
+    ["sample", 1],
+    [],
+)
+
+
+def _errors(item, **kwargs):
+    item.validate(full=True, **kwargs)
+    return list(item.error_codes().items())
+
+
+class TestGeneratedValidators(unittest.TestCase):
+    def tearDown(self):
+        opengraph_writer.GENERATED_VALIDATORS = True
+
+    def _compare(self, make_item, **kwargs):
+        opengraph_writer.GENERATED_VALIDATORS = True
+        generated = _errors(make_item(), **kwargs)
+        opengraph_writer.GENERATED_VALIDATORS = False
+        interpreted = _errors(make_item(), **kwargs)
+        self.assertEqual(generated, interpreted, kwargs)
+
+    def test_differential(self):
+        index = get_property_index()
+        _random = random.Random(1234)
+        for og_type, subtypes in index.types.items():
+            names = list(index.properties) + list(subtypes) + ["x:unknown"]
+            for _i in range(50):
+                fields = _random.sample(names, _random.randint(0, len(names)))
+                pairs = [(f, _random.choice(_VALUES)) for f in fields]
+                pairs.append(("og:type", og_type))
+                _random.shuffle(pairs)
+                layer = OpenGraphLayer(pairs[: len(pairs) // 2])
+                for kwargs in (
+                    {},
+                    {"quiet": True},
+                    {"strict": True},
+                    {"quiet": True, "strict": True},
+                ):
+                    self._compare(lambda: OpenGraphItem(pairs), **kwargs)
+                    local = pairs[len(pairs) // 2 :]  # noqa: E203
+                    self._compare(lambda: layer.new_item(local), **kwargs)
+
+    def test_used(self):
+        opengraph_writer.invalidate_property_index()
+        index = get_property_index()
+        a = OpenGraphItem([("og:type", "article"), ("og:title", 1)])
+        a.validate()
+        self.assertIn("article", index.validators)
+        self.assertNotIn("book", index.validators)
+
+        opengraph_writer.invalidate_property_index()
+        opengraph_writer.GENERATED_VALIDATORS = False
+        a.validate(full=True)
+        self.assertEqual(get_property_index().validators, {})
+
+    def test_source(self):
+        source = get_source("music.song")
+        self.assertTrue(source.startswith("def validate_music_song("))
+        self.assertIn("errors['music:musician'] = MISSING_RECOMMENDED_SUBTYPE", source)
+        self.assertRaises(ValueError, get_source, "unknown")
@@ -0,0 +1,95 @@
+# stdlib
+import datetime
+import unittest
+
+# local package
+from opengraph_writer import compact
+from opengraph_writer.compact import CompactOpenGraphItem
+from opengraph_writer.compact import FrozenOpenGraphItem
+from ._helpers import _TestsHelper
+
+
+# an article, with a recommended error, a date and a list
+_ARTICLE_FIELDS = (
+    ("og:image:width", "wide"),
+    ("article:published_time", datetime.date(2021, 1, 1)),
+    ("article:tag", ["One", "Two"]),
+)
+
+
+class TestCompact(unittest.TestCase, _TestsHelper):
+    def _make_article(self):
+        a = self._make_core_compliant(og_title="MyArticle", og_type="article")
+        a.set_many(_ARTICLE_FIELDS)
+        return a
+
+    def test_roundtrip(self):
+        a = self._make_article()
+        a.validate()
+        for cls in (CompactOpenGraphItem, FrozenOpenGraphItem):
+            compact = cls.from_item(a)
+            self.assertEqual(compact.errors(), a.errors())
+            b = compact.to_item()
+            self.assertEqual(b._data, a._data)
+            self.assertEqual(b.errors(), a.errors())
+            self.assertEqual(b.as_html(debug=True), a.as_html(debug=True))
+            self.assertEqual(compact.as_html(debug=True), a.as_html(debug=True))
+
+    def test_roundtrip_tuple(self):
+        # a tuple the item was given stays a tuple, and a list a list
+        a = self._make_article()
+        a.set("x:pair", ("a", "b"))
+        for cls in (CompactOpenGraphItem, FrozenOpenGraphItem):
+            b = cls.from_item(a).to_item()
+            self.assertEqual(b._data, a._data)
+            self.assertIs(type(b._data["x:pair"]), tuple)
+            self.assertIs(type(b._data["article:tag"]), list)
+
+    def test_shared_fields(self):
+        one = CompactOpenGraphItem.from_item(self._make_core_compliant())
+        two = CompactOpenGraphItem.from_item(self._make_core_compliant())
+        self.assertIs(one._fields, two._fields)
+        self.assertFalse(hasattr(one, "__dict__"))
+
+    def test_shared_fields_limit(self):
+        _max = compact.MAX_FIELDS_SHARED
+        try:
+            compact.MAX_FIELDS_SHARED = len(compact._fields_shared)
+            one = CompactOpenGraphItem({"x:unshared": 1})
+            two = CompactOpenGraphItem({"x:unshared": 2})
+            self.assertEqual(one._fields, two._fields)
+            self.assertIsNot(one._fields, two._fields)
+            self.assertNotIn(("x:unshared",), compact._fields_shared)
+        finally:
+            compact.MAX_FIELDS_SHARED = _max
+
+    def test_set_validate(self):
+        compact = CompactOpenGraphItem()
+        with self.assertRaises(ValueError):
+            compact.errors()
+        compact.set("og:title", "MyWebsite")
+        compact.set("og:type", "website")
+        compact.set("og:url", "http://f.me")
+        self.assertFalse(compact.validate())
+        self.assertIn("og:image", compact.errors()["critical"])
+        compact.set("og:image", "http://f.me/a.png", append=True)
+        compact.set("og:image", "http://f.me/b.png", append=True)
+        self.assertEqual(
+            compact["og:image"], ["http://f.me/a.png", "http://f.me/b.png"]
+        )
+        self.assertTrue(compact.validate())
+
+    def test_frozen(self):
+        one = FrozenOpenGraphItem.from_item(self._make_article())
+        two = FrozenOpenGraphItem.from_item(self._make_article())
+        self.assertEqual(one, two)
+        self.assertEqual(hash(one), hash(two))
+        self.assertEqual({one: 1}[two], 1)
+        self.assertEqual(one["article:tag"], ("One", "Two"))
+        with self.assertRaises(TypeError):
+            one.set("og:title", "Other")
+        with self.assertRaises(TypeError):
+            one.validate()
+        other = self._make_article()
+        other.set("og:title", "Other")
+        self.assertNotEqual(one, FrozenOpenGraphItem.from_item(other))
@@ -1,27 +1,30 @@
 # stdlib
 import datetime
+import io
+import pickle
+import random
+import subprocess
+import sys
 import unittest
 
+# pypi
+from metadata_utils import html_attribute_escape
+
 # local package
+import opengraph_writer
+from opengraph_writer import ERROR_INFO
+from opengraph_writer import ErrorCode
+from opengraph_writer import ErrorCodes
+from opengraph_writer import get_property_index
+from opengraph_writer import invalidate_property_index
+from opengraph_writer import OG_PROPERTIES
 from opengraph_writer import OpenGraphItem
-
-
-class _TestsHelper(object):
-    def _make_core_compliant(
-        self,
-        og_title="MyWebsite",
-        og_type="website",
-    ):
-        a = OpenGraphItem()
-        a.set_many(
-            (
-                ("og:title", og_title),
-                ("og:type", og_type),
-                ("og:image", "http://f.me/a.png"),
-                ("og:url", "http://f.me"),
-            )
-        )
-        return a
+from opengraph_writer import OpenGraphLayer
+from opengraph_writer import PropertySpec
+from opengraph_writer import register_validator
+from opengraph_writer import validate_item
+from opengraph_writer import VALIDATORS
+from ._helpers import _TestsHelper
 
 
 class TestsSimple(unittest.TestCase, _TestsHelper):
@@ -314,3 +317,445 @@ class Tests_DataTypes(unittest.TestCase, _TestsHelper):
 <meta property="og:type" content="article"/>
 <meta property="og:url" content="http://f.me"/>""",
         )
+
+
+class Tests_PropertyIndex(unittest.TestCase, _TestsHelper):
+    def test_index(self):
+        index = get_property_index()
+        self.assertIn("og:title", index.properties)
+        self.assertIn("og:image:width", index.properties)
+        self.assertIn("music:album:disc", index.types["music.song"])
+        self.assertEqual(index.required, ("og:title", "og:type", "og:image", "og:url"))
+
+    def test_nested__valid(self):
+        a = self._make_core_compliant()
+        a.set("og:image:width", 400)
+        a.set("og:image:height", "300")
+        status = a.validate()
+        self.assertTrue(status)
+        _errors = a.errors()
+        self.assertFalse(_errors["recommended"])
+        self.assertFalse(_errors["not_validated"])
+
+    def test_nested__invalid(self):
+        a = self._make_core_compliant()
+        a.set("og:image:width", "wide")
+        status = a.validate()
+        self.assertTrue(status)
+        _errors = a.errors()
+        self.assertEqual(
+            _errors["recommended"]["og:image:width"],
+            "non-required Element does not validate",
+        )
+
+    def test_array_allowed(self):
+        a = self._make_core_compliant(og_type="article")
+        a.set("article:tag", "One", append=True)
+        a.set("article:tag", "Two", append=True)
+        a.set("og:image", "http://f.me/b.png", append=True)
+        status = a.validate()
+        self.assertTrue(status)
+        _errors = a.errors()
+        self.assertNotIn("article:tag", _errors["recommended"])
+        self.assertNotIn("og:image", _errors["critical"])
+
+
+class Tests_Validators(unittest.TestCase, _TestsHelper):
+    def test_validate_item(self):
+        _integer = {"type": "integer"}
+        self.assertTrue(validate_item(_integer, 5))
+        self.assertTrue(validate_item(_integer, "-5"))
+        self.assertFalse(validate_item(_integer, "05"))
+        self.assertFalse(validate_item(_integer, 5.5))
+        self.assertFalse(validate_item(_integer, None))
+        _datetime = {"type": "datetime"}
+        self.assertTrue(validate_item(_datetime, "2012-033"))
+        self.assertTrue(validate_item(_datetime, "2012-W05-4"))
+        self.assertTrue(validate_item(_datetime, "2012-02-02T15:29:00Z"))
+        self.assertFalse(validate_item(_datetime, "2012-13-02"))
+        _enum = {"type": "enum", "enums": ("a", "b")}
+        self.assertTrue(validate_item(_enum, "a"))
+        self.assertFalse(validate_item(_enum, "c"))
+        self.assertFalse(validate_item(_enum, ["a"]))
+        self.assertFalse(validate_item({"type": "url"}, None))
+        self.assertFalse(validate_item({"type": "unknown"}, "a"))
+
+    def test_register_validator(self):
+        _info = {"required": False, "type": "upc-a"}
+        OG_PROPERTIES["og:upc-a"] = _info
+        try:
+            register_validator("upc-a", lambda v: isinstance(v, str) and len(v) == 12)
+            a = self._make_core_compliant()
+            a.set("og:upc-a", "036000291452")
+            a.validate()
+            self.assertFalse(a.errors()["recommended"])
+            a.set("og:upc-a", "0360")
+            a.validate()
+            self.assertIn("og:upc-a", a.errors()["recommended"])
+        finally:
+            del OG_PROPERTIES["og:upc-a"]
+            del VALIDATORS["upc-a"]
+            invalidate_property_index()
+
+
+class Tests_Streaming(unittest.TestCase, _TestsHelper):
+    def _make_item(self):
+        a = self._make_core_compliant(og_type="article")
+        a.set("og:description", "one two three four ? <open >close")
+        for i in range(20):
+            a.set("article:tag", "tag-%s" % i, append=True)
+        a.set("article:published_time", datetime.date(2021, 1, 1))
+        a.set("article:section", ["not", "an", "array"])
+        a.validate()
+        return a
+
+    def test_as_html_iter(self):
+        a = self._make_item()
+        for debug in (False, True):
+            self.assertEqual("\n".join(a.as_html_iter(debug=debug)), a.as_html(debug))
+
+    def test_write_html(self):
+        a = self._make_item()
+        fp = io.StringIO()
+        a.write_html(fp, debug=True)
+        self.assertEqual(fp.getvalue(), a.as_html(debug=True))
+
+    def test_write_html_callable(self):
+        a = self._make_item()
+        chunks = []
+        a.write_html(chunks.append, encoding="utf-8")
+        self.assertTrue(all(isinstance(i, bytes) for i in chunks))
+        self.assertEqual(b"".join(chunks), a.as_html().encode("utf-8"))
+
+    def test_not_validated(self):
+        a = OpenGraphItem()
+        a.set("og:title", "MyWebsite")
+        self.assertEqual(list(a.as_html_iter()), [])
+        fp = io.StringIO()
+        a.write_html(fp)
+        self.assertEqual(fp.getvalue(), "")
+
+
+class Tests_Layers(unittest.TestCase):
+    _site = (
+        ("og:site_name", "MySite"),
+        ("og:locale", "en_US"),
+        ("og:locale:alternate", ["fr_FR", "de_DE"]),
+        ("og:image", "http://f.me/default.png"),
+        ("og:image:width", "wide"),  # invalid
+    )
+    _section = (
+        ("og:type", "article"),
+        ("article:section", "News"),  # depends on the og:type
+    )
+    _page = (
+        ("og:title", "MyArticle"),
+        ("og:url", "http://f.me/article"),
+    )
+
+    def _make_layered(self):
+        site = OpenGraphLayer(self._site)
+        section = OpenGraphLayer(self._section, parent=site)
+        return section.new_item(self._page)
+
+    def _make_flat(self):
+        return OpenGraphItem(list(self._site + self._section + self._page))
+
+    def test_equivalent(self):
+        a = self._make_layered()
+        b = self._make_flat()
+        for kwargs in ({}, {"schema1": True, "schema2": False}):
+            self.assertEqual(a.validate(**kwargs), b.validate(**kwargs))
+            self.assertEqual(a.errors()["critical"], b.errors()["critical"])
+            self.assertEqual(a.errors()["recommended"], b.errors()["recommended"])
+            self.assertCountEqual(
+                a.errors()["not_validated"], b.errors()["not_validated"]
+            )
+            self.assertEqual(a.as_html(), b.as_html())
+            self.assertEqual(a.as_html(debug=True), b.as_html(debug=True))
+        self.assertEqual(a.content_hash(), b.content_hash())
+
+    def test_override(self):
+        site = OpenGraphLayer(self._site)
+        a = site.new_item(self._page)
+        a.set("og:type", "website")
+        a.set("og:image:width", 300)
+        a.set("og:locale:alternate", "es_ES", append=True)
+        self.assertTrue(a.validate())
+        self.assertNotIn("og:image:width", a.errors()["recommended"])
+        self.assertIn('content="es_ES"', a.as_html())
+        self.assertIn('property="og:site_name" content="MySite"', a.as_html())
+        # the layer is unchanged
+        self.assertNotIn("og:type", site)
+        self.assertEqual(site["og:image:width"], "wide")
+        self.assertEqual(site["og:locale:alternate"], ["fr_FR", "de_DE"])
+        b = site.new_item(self._page)
+        b.validate()
+        self.assertIn("og:image:width", b.errors()["recommended"])
+
+    def test_reset(self):
+        site = OpenGraphLayer(self._site)
+        a = site.new_item(self._page)
+        a.set("og:locale:alternate", "es_ES", append=True)
+        a.validate()
+        a.reset(layer=site)
+        self.assertEqual(dict(a._data), dict(site._data))
+        self.assertRaises(ValueError, a.errors)
+        a.set_many(self._page)
+        a.validate()
+        b = site.new_item(self._page)
+        b.validate()
+        self.assertEqual(a.errors(), b.errors())
+        self.assertEqual(site["og:locale:alternate"], ["fr_FR", "de_DE"])
+        a.reset()
+        self.assertIsNone(a._layer)
+        self.assertEqual(a._data, {})
+        self.assertFalse(a.validate())
+        self.assertIn("og:title", a.errors()["critical"])
+
+
+class Tests_Incremental(unittest.TestCase, _TestsHelper):
+    _values = (
+        ("og:title", "MyTitle"),
+        ("og:title", 1),
+        ("og:type", "article"),
+        ("og:type", "music.song"),
+        ("og:type", "unknown"),
+        ("og:image", "http://f.me/a.png"),
+        ("og:image", "not-a-url"),
+        ("og:image:width", "wide"),
+        ("og:image:width", 100),
+        ("og:url", "http://f.me"),
+        ("og:determiner", "the"),
+        ("og:determiner", "these"),
+        ("article:author", "abc"),
+        ("article:published_time", "2012-01-10"),
+        ("article:published_time", "yesterday"),
+        ("music:duration", "100"),
+        ("music:duration", "long"),
+        ("og:tag", "One"),
+    )
+
+    def _assertSameErrors(self, a, b):
+        self.assertEqual(a["critical"], b["critical"])
+        self.assertEqual(a["recommended"], b["recommended"])
+        self.assertCountEqual(a["not_validated"], b["not_validated"])
+
+    def test_differential(self):
+        _random = random.Random(42)
+        for _run in range(50):
+            a = OpenGraphItem()
+            a.validate()
+            for _step in range(10):
+                (field, value) = _random.choice(self._values)
+                a.set(field, value, append=_random.random() < 0.2)
+                status = a.validate()
+                b = OpenGraphItem()
+                b._data = b._local = dict(a._data)
+                self.assertEqual(status, b.validate())
+                self._assertSameErrors(a.errors(), b.errors())
+
+    def test_schema_change(self):
+        a = self._make_core_compliant(og_type="article")
+        a.validate()
+        self.assertTrue(a.errors()["recommended"])
+        a.validate(schema1=True, schema2=False)
+        self.assertFalse(a.errors()["recommended"])
+
+    def test_only_dirty(self):
+        a = self._make_core_compliant(og_type="article")
+        a.set("og:description", "one")
+        a.validate()
+        calls = []
+        _validate = PropertySpec.validate
+
+        def _counting(spec, value):
+            calls.append(spec.name)
+            return _validate(spec, value)
+
+        PropertySpec.validate = _counting
+        try:
+            a.set("og:description", "two")
+            a.set("article:section", "News")
+            a.validate()
+        finally:
+            PropertySpec.validate = _validate
+        self.assertCountEqual(calls, ["og:description", "article:section"])
+        self.assertNotIn("article:section", a.errors()["recommended"])
+
+
+class Tests_ValidationModes(unittest.TestCase, _TestsHelper):
+    def _random_items(self, count=200):
+        _random = random.Random(7)
+        for _run in range(count):
+            a = OpenGraphItem()
+            for _step in range(_random.randint(0, 10)):
+                (field, value) = _random.choice(Tests_Incremental._values)
+                a.set(field, value, append=_random.random() < 0.2)
+            yield a
+
+    def _full(self, a, **kwargs):
+        b = OpenGraphItem()
+        b._data = b._local = dict(a._data)
+        return (b.validate(**kwargs), b.errors())
+
+    def test_quiet(self):
+        for a in self._random_items():
+            (status, errors) = self._full(a)
+            self.assertEqual(a.validate(quiet=True), status)
+            self.assertEqual(a.errors()["critical"], errors["critical"])
+            self.assertEqual(a.errors()["recommended"], {})
+            self.assertEqual(a.errors()["not_validated"], [])
+
+    def test_fail_fast(self):
+        for a in self._random_items():
+            (status, errors) = self._full(a)
+            self.assertEqual(a.validate(fail_fast=True), status)
+            critical = a.errors()["critical"]
+            self.assertLessEqual(len(critical), 1)
+            for field, message in critical.items():
+                self.assertEqual(errors["critical"][field], message)
+
+    def test_fail_fast_order(self):
+        a = OpenGraphItem()
+        a.set("og:image", "not-a-url")
+        self.assertFalse(a.validate(fail_fast=True, quiet=True))
+        self.assertEqual(a.errors()["critical"], {"og:type": "Missing og:type"})
+
+    def test_strict(self):
+        a = self._make_core_compliant()
+        a.set("og:tag", "One")
+        self.assertTrue(a.validate())
+        self.assertEqual(a.errors()["not_validated"], ["og:tag"])
+        self.assertFalse(a.validate(strict=True))
+        self.assertEqual(a.errors()["critical"], {"og:tag": "Unsupported Element"})
+        self.assertEqual(a.errors()["not_validated"], [])
+        # incrementally
+        a.set("og:other", "Two")
+        self.assertFalse(a.validate(strict=True))
+        self.assertIn("og:other", a.errors()["critical"])
+        for kwargs in ({"quiet": True}, {"fail_fast": True}):
+            self.assertFalse(a.validate(strict=True, **kwargs))
+
+    def test_strict_differential(self):
+        for a in self._random_items():
+            (status, errors) = self._full(a, strict=True)
+            self.assertEqual(a.validate(strict=True), status)
+            self.assertEqual(a.errors(), errors)
+            self.assertEqual(a.validate(strict=True, quiet=True), status)
+            self.assertEqual(a.validate(strict=True, fail_fast=True), status)
+
+    def test_partial_not_reused(self):
+        a = self._make_core_compliant(og_type="article")
+        a.set("og:tag", "One")
+        a.validate(quiet=True)
+        a.validate()
+        self.assertTrue(a.errors()["recommended"])
+        self.assertEqual(a.errors()["not_validated"], ["og:tag"])
+
+
+class Tests_ErrorCodes(unittest.TestCase, _TestsHelper):
+    def test_codes(self):
+        a = self._make_core_compliant(og_type="article")
+        a.set("og:title", 1)
+        a.set("og:tag", "One")
+        self.assertFalse(a.validate())
+        codes = a.error_codes()
+        self.assertIsInstance(codes, ErrorCodes)
+        self.assertEqual(codes["og:title"], ErrorCode.REQUIRED_INVALID)
+        self.assertEqual(codes["og:tag"], ErrorCode.NOT_VALIDATED)
+        self.assertEqual(codes["article:author"], ErrorCode.MISSING_RECOMMENDED_SUBTYPE)
+        self.assertTrue(codes.has_critical())
+        self.assertEqual(
+            codes.level_counts(),
+            {"critical": 1, "recommended": 6, "not_validated": 1},
+        )
+        errors = a.errors()
+        self.assertEqual(
+            errors["critical"], {"og:title": "Required Element does not validate"}
+        )
+        self.assertEqual(errors["not_validated"], ["og:tag"])
+        self.assertEqual(codes.as_errors(), errors)
+
+    def test_errors_per_validation(self):
+        a = self._make_core_compliant()
+        a.set("og:title", 1)
+        a.validate()
+        errors = a.errors()
+        self.assertIs(a.errors(), errors)
+        self.assertIn("og:title", errors["critical"])
+        a.set("og:title", "MyTitle")
+        self.assertTrue(a.validate())
+        self.assertEqual(a.errors()["critical"], {})
+        # the errors returned earlier are not changed
+        self.assertIn("og:title", errors["critical"])
+        a.reset()
+        self.assertIn("og:title", errors["critical"])
+
+    def test_pickle(self):
+        a = self._make_core_compliant(og_type="article")
+        a.validate()
+        layer = OpenGraphLayer([("og:site_name", "Site")])
+        b = layer.new_item([("og:title", "a")])
+        b.validate()
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            codes = pickle.loads(pickle.dumps(a.error_codes(), protocol))
+            self.assertIs(type(codes), ErrorCodes)
+            self.assertEqual(codes, a.error_codes())
+            # the validators, which are closures, are not part of the state
+            pickle.dumps(a.__getstate__(), protocol)
+            pickle.dumps(layer.__getstate__(), protocol)
+
+    def test_info(self):
+        for code in ErrorCode:
+            (level, message) = ERROR_INFO[code]
+            self.assertEqual(
+                level == "critical", ErrorCodes({"f": code}).has_critical()
+            )
+
+
+class Tests_Escaping(unittest.TestCase, _TestsHelper):
+    def test_escape(self):
+        for text in ("plain", "", "a&b", "<open >close", "\"quoted\" 'single'", "café"):
+            self.assertEqual(
+                opengraph_writer._escape(text), html_attribute_escape(text)
+            )
+
+    def test_unknown_property(self):
+        a = self._make_core_compliant()
+        a.set('og:"odd"', "a&b")
+        a.validate()
+        self.assertIn(
+            '<meta property="og:&quot;odd&quot;" content="a&amp;b"/>', a.as_html()
+        )
+
+
+class Tests_LazyImport(unittest.TestCase):
+    def _run(self, statement):
+        return subprocess.check_output(
+            [sys.executable, "-c", "import sys, opengraph_writer; " + statement]
+        ).decode()
+
+    def test_lazy(self):
+        output = self._run(
+            "print('opengraph_writer._schema' in sys.modules, "
+            "'metadata_utils' in sys.modules)"
+        )
+        self.assertEqual(output.strip(), "False False")
+
+    def test_validate_item(self):
+        # a validator which needs the schema's regexes, without the index
+        output = self._run(
+            "print(opengraph_writer.validate_item({'type': 'url'}, 'http://f.me'), "
+            "opengraph_writer.validate_item({'type': 'datetime'}, '2012-01-10'))"
+        )
+        self.assertEqual(output.strip(), "True True")
+
+    def test_public_names(self):
+        self.assertIs(opengraph_writer.og_properties, OG_PROPERTIES)
+        self.assertIn("fb:app_id", opengraph_writer.facebook_extensions)
+        self.assertIn("date", opengraph_writer.regex_dates)
+        self.assertTrue(opengraph_writer.regex_url.match("http://f.me"))
+        self.assertIs(opengraph_writer.html_attribute_escape, html_attribute_escape)
+        with self.assertRaises(AttributeError):
+            opengraph_writer.not_an_attribute
@@ -0,0 +1,220 @@
+# stdlib
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+import os
+import socketserver
+import struct
+import tempfile
+import threading
+import unittest
+
+# local package
+from opengraph_writer import ErrorCode
+from opengraph_writer import OpenGraphItem
+from opengraph_writer.images import HTTPFetcher
+from opengraph_writer.images import ImageChecker
+from opengraph_writer.images import ImageInfo
+from opengraph_writer.images import parse_image_header
+
+
+# the image data which follows the headers
+_PADDING = b"\x00" * 100000
+
+
+def _png(width, height):
+    return (
+        b"\x89PNG\r\n\x1a\n\x00\x00\x00\x0dIHDR"
+        + struct.pack(">II", width, height)
+        + b"\x08\x06\x00\x00\x00"
+    )
+
+
+def _gif(width, height):
+    return b"GIF89a" + struct.pack("<HH", width, height) + b"\xf7\x00\x00"
+
+
+def _jpeg(width, height, metadata=16):
+    app1 = b"\xff\xe1" + struct.pack(">H", metadata + 2) + b"\x00" * metadata
+    sof0 = b"\xff\xc0\x00\x11\x08" + struct.pack(">HH", height, width) + b"\x03"
+    return b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00" + (
+        app1 + sof0
+    )
+
+
+def _webp(width, height, chunk=b"VP8X"):
+    if chunk == b"VP8X":
+        body = b"\x00" * 4 + (width - 1).to_bytes(3, "little")
+        body += (height - 1).to_bytes(3, "little")
+    elif chunk == b"VP8L":
+        bits = (width - 1) | ((height - 1) << 14)
+        body = b"\x2f" + struct.pack("<I", bits)
+    else:
+        body = b"\x00\x00\x00\x9d\x01\x2a" + struct.pack("<HH", width, height)
+    return b"RIFF\x00\x00\x00\x00WEBP" + chunk + b"\x00\x00\x00\x00" + body
+
+
+_IMAGES = {
+    "/ok.png": _png(1200, 630),
+    "/ok.gif": _gif(100, 100),
+    "/ok.jpg": _jpeg(640, 480),
+    "/metadata.jpg": _jpeg(640, 480, metadata=5000),
+    "/small.png": _png(49, 100),
+    "/wide.png": _png(301, 100),
+    "/ok.webp": _webp(640, 480),
+    "/text.png": b"<html>not found</html>",
+}
+
+
+class _Server(socketserver.ThreadingMixIn, HTTPServer):
+    # `http.server.ThreadingHTTPServer` is new in Python 3.7
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        if self.path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/ok.png")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = _IMAGES.get(self.path.split("?")[0])
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body += _PADDING
+        _range = self.headers.get("Range")
+        if _range and not self.path.endswith("?norange"):
+            end = int(_range.split("-")[1])
+            body = body[: end + 1]
+            self.send_response(206)
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.bytes_sent += len(body)
+
+
+class TestParse(unittest.TestCase):
+    def test_formats(self):
+        for data, expected in (
+            (_png(1, 2), ImageInfo("png", 1, 2)),
+            (_gif(3, 4), ImageInfo("gif", 3, 4)),
+            (_jpeg(5, 6), ImageInfo("jpeg", 5, 6)),
+            (_webp(7, 8), ImageInfo("webp", 7, 8)),
+            (_webp(9, 10, b"VP8L"), ImageInfo("webp", 9, 10)),
+            (_webp(11, 12, b"VP8 "), ImageInfo("webp", 11, 12)),
+        ):
+            self.assertEqual(parse_image_header(data + _PADDING[:10]), expected)
+            # truncated before the dimensions
+            self.assertIsNone(parse_image_header(data[:9]))
+
+    def test_unknown(self):
+        for data in (b"", b"<html>", b"BM" + _PADDING[:100]):
+            self.assertIsNone(parse_image_header(data))
+
+
+class TestImageChecker(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = _Server(("127.0.0.1", 0), _Handler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base = "http://127.0.0.1:%s" % cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.requests = []
+        self.server.bytes_sent = 0
+        self.fetcher = HTTPFetcher()
+        self.checker = ImageChecker(
+            fetcher=self.fetcher,
+            max_workers=4,
+            resolve=lambda url: url.replace("http://f.me", self.base),
+        )
+
+    def tearDown(self):
+        self.fetcher.close()
+
+    def test_probe(self):
+        for path, expected in (
+            ("/ok.png", ImageInfo("png", 1200, 630)),
+            ("/ok.jpg", ImageInfo("jpeg", 640, 480)),
+            ("/metadata.jpg", ImageInfo("jpeg", 640, 480)),
+            ("/ok.webp", ImageInfo("webp", 640, 480)),
+            ("/redirect", ImageInfo("png", 1200, 630)),
+            ("/ok.png?norange", ImageInfo("png", 1200, 630)),
+            ("/text.png", None),
+        ):
+            self.assertEqual(self.checker.probe(self.base + path), expected)
+        self.assertRaises(OSError, self.checker.probe, self.base + "/missing.png")
+        # only the headers were sent, except to the request which ignored Range
+        self.assertLess(self.server.bytes_sent, 2 * len(_PADDING))
+
+    def test_pooling_and_cache(self):
+        urls = [self.base + "/ok.png?%s" % i for i in range(20)]
+        self.checker.max_workers = 1
+        self.checker.probe_many(urls + urls)
+        self.assertEqual(len(self.server.requests), 20)
+        self.assertEqual(self.fetcher.connections_opened, 1)
+
+        checker = ImageChecker(fetcher=self.fetcher, cache_size=5)
+        checker.probe_many(urls)
+        self.assertEqual(len(checker._cache), 5)
+
+    def test_check_many(self):
+        items = []
+        for image, expected in (
+            ("/ok.png", None),
+            ("/ok.gif", None),
+            ("/small.png", ErrorCode.IMAGE_TOO_SMALL),
+            ("/wide.png", ErrorCode.IMAGE_ASPECT_RATIO),
+            ("/ok.webp", ErrorCode.IMAGE_UNSUPPORTED_FORMAT),
+            ("/text.png", ErrorCode.IMAGE_UNREADABLE),
+            ("/missing.png", ErrorCode.IMAGE_UNREADABLE),
+        ):
+            a = OpenGraphItem(
+                [
+                    ("og:title", "T"),
+                    ("og:type", "website"),
+                    ("og:url", "http://f.me"),
+                    ("og:image", ["http://f.me/ok.png", "http://f.me" + image]),
+                ]
+            )
+            a.validate()
+            items.append((a, expected))
+        results = self.checker.check_many(a for (a, _expected) in items)
+        for (a, expected), result in zip(items, results):
+            self.assertEqual(a.error_codes().get("og:image"), expected)
+            self.assertEqual(result, expected is None)
+            if expected is not None:
+                self.assertIn("og:image", a.errors()["recommended"])
+        # each url was requested once
+        self.assertEqual(len(self.server.requests), 7)
+
+    def test_local(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "a.gif")
+            with open(path, "wb") as fp:
+                fp.write(_gif(40, 40) + _PADDING)
+            checker = ImageChecker()
+            self.assertEqual(checker.probe(path), ImageInfo("gif", 40, 40))
+            self.assertEqual(checker.probe("file://" + path), ImageInfo("gif", 40, 40))
+            checker.resolve = lambda url: url.replace("http://f.me", tmpdir)
+            a = OpenGraphItem([("og:image", "http://f.me/a.gif")])
+            a.validate()
+            self.assertFalse(checker.check_item(a))
+            self.assertEqual(a.error_codes()["og:image"], ErrorCode.IMAGE_TOO_SMALL)
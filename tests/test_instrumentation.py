@@ -0,0 +1,78 @@
+# stdlib
+import io
+import unittest
+
+# local package
+import opengraph_writer
+from opengraph_writer import instrumentation
+from opengraph_writer import OpenGraphItem
+from opengraph_writer.typed import get_item_class
+from ._helpers import _TestsHelper
+
+
+class TestInstrumentation(unittest.TestCase, _TestsHelper):
+    def tearDown(self):
+        instrumentation.disable()
+
+    def test_disabled(self):
+        _validate = OpenGraphItem.validate
+        _check_fields = opengraph_writer._check_fields
+        instrumentation.enable()
+        self.assertIsNot(OpenGraphItem.validate, _validate)
+        self.assertIsNot(opengraph_writer._check_fields, _check_fields)
+        instrumentation.disable()
+        self.assertIsNone(instrumentation.get_collector())
+        self.assertIs(OpenGraphItem.validate, _validate)
+        self.assertIs(opengraph_writer._check_fields, _check_fields)
+
+    def test_collect(self):
+        collector = instrumentation.enable()
+        a = self._make_core_compliant(og_title="MyArticle", og_type="article")
+        a.set_many((("og:image:width", "wide"), ("og:tag", "One")))
+        a.validate()
+        a.set("og:title", "Other")
+        a.validate()
+        a.as_html()
+        a.write_html(io.StringIO())
+        stats = collector.as_dict()
+        self.assertEqual(stats["calls"]["validate"], 2)
+        # the generated validator, then the changed field
+        self.assertEqual(stats["calls"]["generated"], 1)
+        self.assertEqual(stats["calls"]["incremental"], 1)
+        self.assertNotIn("fields", stats["calls"])
+        self.assertEqual(stats["calls"]["render"], 2)
+        self.assertTrue(stats["calls"]["escape"])
+        self.assertTrue(all(v >= 0 for v in stats["seconds"].values()))
+        self.assertEqual(stats["errors"]["recommended"]["og:image:width"], 2)
+        self.assertEqual(stats["errors"]["recommended"]["article:author"], 2)
+        self.assertEqual(stats["errors"]["not_validated"]["og:tag"], 2)
+
+    def test_interpreted(self):
+        collector = instrumentation.enable()
+        a = self._make_core_compliant(og_type="article")
+        a.validate(schema1=True, schema2=False)
+        stats = collector.as_dict()
+        for phase in ("fields", "required", "og_type"):
+            self.assertEqual(stats["calls"][phase], 1)
+        self.assertNotIn("generated", stats["calls"])
+
+    def test_typed_escape(self):
+        collector = instrumentation.enable()
+        a = get_item_class("website")(og_title="a&b")
+        a.validate()
+        a.as_html()
+        self.assertTrue(collector.as_dict()["calls"]["escape"])
+
+    def test_prometheus(self):
+        collector = instrumentation.enable()
+        a = self._make_core_compliant()
+        a.set("og:image:width", "wide")
+        a.validate()
+        text = collector.as_prometheus()
+        self.assertIn("# TYPE opengraph_writer_calls_total counter", text)
+        self.assertIn('opengraph_writer_calls_total{phase="validate"} 1', text)
+        self.assertIn(
+            'opengraph_writer_errors_total{level="recommended",property="og:image:width"} 1',
+            text,
+        )
+        self.assertTrue(text.endswith("\n"))
@@ -0,0 +1,121 @@
+# stdlib
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+# local package
+from opengraph_writer import lint
+
+
+_HEAD = """<html><head>
+<meta property="og:title" content="MyWebsite"/>
+<meta property="og:type" content="website"/>
+<meta property="og:image" content="http://f.me/a.png"/>
+%s
+</head><body>%s</body></html>"""
+
+_FILES = {
+    "index.html": _HEAD % ('<meta property="og:url" content="http://f.me"/>', ""),
+    # missing og:url
+    "a/invalid.htm": _HEAD % ("", ""),
+    # the `<head>` is longer than `HEAD_BYTES`, so the file is mapped
+    "a/b/long.html": _HEAD
+    % (
+        "<!-- %s -->" % ("x" * 20000)
+        + '<meta property="og:url" content="http://f.me"/>',
+        "",
+    ),
+    "a/b/long_body.html": _HEAD
+    % ('<meta property="og:url" content="http://f.me"/>', "x" * 20000),
+    "a/b/empty.html": "",
+    "a/notes.txt": "not html",
+}
+
+
+class TestLint(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = self._tmpdir.name
+        for name, text in _FILES.items():
+            path = os.path.join(self.root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as fp:
+                fp.write(text)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _run(self, *args):
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            status = lint.main(list(args))
+        outputs = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        for output in outputs:
+            output["path"] = os.path.relpath(output["path"], self.root)
+        return (status, outputs, stderr.getvalue())
+
+    def test_iter_files(self):
+        files = [os.path.relpath(p, self.root) for p in lint.iter_files([self.root])]
+        self.assertEqual(
+            files,
+            [
+                "index.html",
+                "a/invalid.htm",
+                "a/b/empty.html",
+                "a/b/long.html",
+                "a/b/long_body.html",
+            ],
+        )
+        self.assertEqual(
+            list(lint.iter_files([self.root], suffixes=(".txt",))),
+            [os.path.join(self.root, "a", "notes.txt")],
+        )
+
+    def test_read_item(self):
+        for name in ("index.html", "a/b/long.html", "a/b/long_body.html"):
+            item = lint.read_item(os.path.join(self.root, name))
+            self.assertEqual(item._data["og:url"], "http://f.me", name)
+            self.assertTrue(item.validate())
+        self.assertEqual(
+            lint.read_item(os.path.join(self.root, "a/b/empty.html"))._data, {}
+        )
+
+    def test_lint(self):
+        missing = os.path.join(self.root, "missing.html")
+        (status, outputs, summary) = self._run(self.root, missing, "--workers", "1")
+        self.assertEqual(status, 1)
+        self.assertEqual(
+            [(o["path"], o.get("valid")) for o in outputs],
+            [
+                ("index.html", True),
+                ("a/invalid.htm", False),
+                ("a/b/empty.html", False),
+                ("a/b/long.html", True),
+                ("a/b/long_body.html", True),
+                ("missing.html", None),
+            ],
+        )
+        self.assertIn("og:url", outputs[1]["errors"]["critical"])
+        self.assertIn("unreadable", outputs[-1])
+        self.assertIn("5 files", summary)
+        self.assertIn("valid: 3, invalid: 2, unreadable: 1", summary)
+
+        (status, outputs, summary) = self._run(
+            os.path.join(self.root, "index.html"), "--workers", "1"
+        )
+        self.assertEqual(status, 0)
+
+    def test_workers(self):
+        single = self._run(self.root, "--workers", "1", "--skip-valid")
+        multi = self._run(
+            self.root, "--workers", "2", "--batch-size", "2", "--skip-valid"
+        )
+        self.assertEqual(single[0], multi[0])
+        self.assertEqual(single[1], multi[1])
+        self.assertEqual(
+            [o["path"] for o in multi[1]], ["a/invalid.htm", "a/b/empty.html"]
+        )
@@ -0,0 +1,154 @@
+# stdlib
+import asyncio
+import unittest
+
+# local package
+from opengraph_writer import OpenGraphItem
+from opengraph_writer.caching import RenderCache
+from opengraph_writer.middleware import ENVIRON_KEY
+from opengraph_writer.middleware import HeadInjector
+from opengraph_writer.middleware import OpenGraphASGIMiddleware
+from opengraph_writer.middleware import OpenGraphWSGIMiddleware
+
+
+_BODY = b"<html><head><title>a</title></HEAD ><body>b</body></html>"
+_INJECTED = b"""<html><head><title>a</title><meta property="og:title" content="MyTitle"/>
+<meta property="og:url" content="http://f.me"/>
+</HEAD ><body>b</body></html>"""
+
+
+def _split(body, size):
+    return [body[i : i + size] for i in range(0, len(body), size)]  # noqa: E203
+
+
+def _populate(item):
+    item.set_many((("og:title", "MyTitle"), ("og:url", "http://f.me")))
+
+
+class TestHeadInjector(unittest.TestCase):
+    def test_chunk_boundaries(self):
+        for size in range(1, len(_BODY) + 1):
+            injector = HeadInjector(b"<x/>")
+            output = b"".join(injector.feed(chunk) for chunk in _split(_BODY, size))
+            output += injector.flush()
+            self.assertEqual(output, _BODY.replace(b"</HEAD >", b"<x/></HEAD >"), size)
+
+    def test_holds_only_partial_matches(self):
+        injector = HeadInjector(b"<x/>")
+        self.assertEqual(injector.feed(b"<html><head><"), b"<html><head>")
+        self.assertEqual(injector.feed(b"p>"), b"<p>")
+        self.assertEqual(injector.feed(b"</he"), b"")
+        self.assertEqual(injector.feed(b"ad>"), b"<x/></head>")
+        self.assertEqual(injector.feed(b"</head>"), b"</head>")
+
+    def test_no_head(self):
+        injector = HeadInjector(b"<x/>")
+        output = injector.feed(b"<p>a</") + injector.feed(b"p></h") + injector.flush()
+        self.assertEqual(output, b"<p>a</p></h")
+        self.assertFalse(injector.injected)
+
+
+class TestWSGIMiddleware(unittest.TestCase):
+    def _app(self, content_type="text/html; charset=utf-8", use_item=True):
+        def app(environ, start_response):
+            if use_item:
+                _populate(environ[ENVIRON_KEY])
+            start_response(
+                "200 OK",
+                [("Content-Type", content_type), ("Content-Length", str(len(_BODY)))],
+            )
+            return iter(_split(_BODY, 5))
+
+        return app
+
+    def _call(self, app, environ=None):
+        captured = {}
+
+        def start_response(status, headers, exc_info=None):
+            captured["headers"] = headers
+            return lambda data: None
+
+        body = b"".join(app(environ or {}, start_response))
+        return (body, dict(captured["headers"]))
+
+    def test_inject(self):
+        cache = RenderCache()
+        app = OpenGraphWSGIMiddleware(self._app(), cache=cache)
+        (body, headers) = self._call(app)
+        self.assertEqual(body, _INJECTED)
+        self.assertNotIn("Content-Length", headers)
+        self._call(app)
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1})
+
+    def test_untouched(self):
+        for app in (
+            OpenGraphWSGIMiddleware(self._app(use_item=False)),
+            OpenGraphWSGIMiddleware(self._app(content_type="text/plain")),
+            OpenGraphWSGIMiddleware(self._app(content_type="text/html; charset=x-no")),
+        ):
+            (body, headers) = self._call(app)
+            self.assertEqual(body, _BODY)
+            self.assertEqual(headers["Content-Length"], str(len(_BODY)))
+
+    def test_revalidate(self):
+        # an item changed since it was validated is validated again
+        item = OpenGraphItem([("og:title", 1)])
+        item.validate()
+        app = OpenGraphWSGIMiddleware(self._app(), debug=True)
+        (body, headers) = self._call(app, {ENVIRON_KEY: item})
+        self.assertIn(b'content="MyTitle"/>', body)
+        self.assertNotIn(b"does not validate", body)
+
+
+class TestASGIMiddleware(unittest.TestCase):
+    def _call(self, use_item=True):
+        async def app(scope, receive, send):
+            if use_item:
+                _populate(scope[ENVIRON_KEY])
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", b"text/html"),
+                        (b"content-length", str(len(_BODY)).encode()),
+                    ],
+                }
+            )
+            chunks = _split(_BODY, 7)
+            for i, chunk in enumerate(chunks, 1):
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": i < len(chunks),
+                    }
+                )
+
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        async def receive():
+            return {"type": "http.request"}
+
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(
+                OpenGraphASGIMiddleware(app)({"type": "http"}, receive, send)
+            )
+        finally:
+            loop.close()
+        body = b"".join(m["body"] for m in messages[1:])
+        return (body, dict(messages[0]["headers"]))
+
+    def test_inject(self):
+        (body, headers) = self._call()
+        self.assertEqual(body, _INJECTED)
+        self.assertNotIn(b"content-length", headers)
+
+    def test_untouched(self):
+        (body, headers) = self._call(use_item=False)
+        self.assertEqual(body, _BODY)
+        self.assertIn(b"content-length", headers)
@@ -0,0 +1,109 @@
+# stdlib
+import mmap
+import tempfile
+import unittest
+
+# local package
+from opengraph_writer import OpenGraphItem
+from opengraph_writer.parser import find_head_end
+from opengraph_writer.parser import iter_meta_properties
+from opengraph_writer.parser import parse_html
+
+
+_DOCUMENT = """<!DOCTYPE html>
+<html>
+<HEAD>
+<title>The Rock</title>
+<meta charset="utf-8">
+<meta name="description" content="not opengraph">
+<META PROPERTY="og:title" CONTENT="The Rock &amp; &quot;Friends&quot;"/>
+<meta content='video.movie' property='og:type'>
+<meta property="og:url" content=http://www.imdb.com/title/tt0117500/>
+<meta property="og:image" content="http://ia.media-imdb.com/rock.jpg" />
+<meta property="og:image" content="http://ia.media-imdb.com/rock2.jpg" />
+<meta property="og:description" content="café">
+</head>
+<body>
+<meta property="og:title" content="In The Body">
+</body>
+</html>
+"""
+
+
+class TestParser(unittest.TestCase):
+    def _check(self, item):
+        self.assertEqual(
+            item._data,
+            {
+                "og:title": 'The Rock & "Friends"',
+                "og:type": "video.movie",
+                "og:url": "http://www.imdb.com/title/tt0117500/",
+                "og:image": [
+                    "http://ia.media-imdb.com/rock.jpg",
+                    "http://ia.media-imdb.com/rock2.jpg",
+                ],
+                "og:description": "café",
+            },
+        )
+        self.assertTrue(item.validate())
+
+    def test_str(self):
+        self._check(parse_html(_DOCUMENT))
+
+    def test_bytes(self):
+        self._check(parse_html(_DOCUMENT.encode("utf-8")))
+
+    def test_mmap(self):
+        with tempfile.TemporaryFile() as fp:
+            fp.write(_DOCUMENT.encode("utf-8"))
+            fp.flush()
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                self._check(parse_html(buffer))
+
+    def test_no_head_end(self):
+        document = '<meta property="og:title" content="a"><body><meta property="og:url" content="b">'
+        self.assertEqual(list(iter_meta_properties(document)), [("og:title", "a")])
+
+    def test_quoted_gt(self):
+        document = """<head><meta property="og:title" content="Tom > Jerry">
+<meta content='a > b' property="og:description"></head>"""
+        for _document in (document, document.encode("utf-8")):
+            self.assertEqual(
+                list(iter_meta_properties(_document)),
+                [("og:title", "Tom > Jerry"), ("og:description", "a > b")],
+            )
+
+    def test_comments(self):
+        document = """<head><!-- <meta property="og:title" content="a"> -->
+<!--
+<meta property="og:url" content="b"></head>
+-->
+<meta property="og:type" content="website">
+</head><!-- unclosed <meta property="og:image" content="c">"""
+        for _document in (document, document.encode("utf-8")):
+            self.assertEqual(
+                list(iter_meta_properties(_document)), [("og:type", "website")]
+            )
+            self.assertEqual(find_head_end(_document), document.rindex("</head>"))
+        # the end of the `<head>` is in an unclosed comment
+        self.assertIsNone(find_head_end(document[:60]))
+        self.assertIsNone(find_head_end("<head><title>a</title>"))
+
+    def test_roundtrip(self):
+        a = OpenGraphItem()
+        a.set_many(
+            (
+                ("og:title", "one two three four ? <open >close 'quoted'"),
+                ("og:type", "article"),
+                ("og:image", "http://f.me/a.png"),
+                ("og:url", "http://f.me"),
+            )
+        )
+        a.set("article:tag", "One", append=True)
+        a.set("article:tag", "Two", append=True)
+        a.validate()
+        document = "<head>%s</head>" % a.as_html()
+        b = parse_html(document)
+        self.assertEqual(b._data, a._data)
+        b.validate()
+        self.assertEqual(b.as_html(), a.as_html())
@@ -4,11 +4,15 @@ import unittest
 # pyramid testing requirements; pypi
 from pyramid import testing
 from pyramid.interfaces import IRequestExtensions
+from pyramid.response import Response
 
 # from webob.multidict import MultiDict
 
 # local package
 import opengraph_writer
+from opengraph_writer.caching import RenderCache
+from opengraph_writer.pyramid_helpers import OpenGraphItemPool
+from opengraph_writer.pyramid_helpers import opengraph_tween_factory
 
 # ==============================================================================
 
@@ -42,3 +46,126 @@ class TestSetupSimple(unittest.TestCase):
         self.assertIsInstance(
             self.request.opengraph_item, opengraph_writer.OpenGraphItem
         )
+
+
+class TestSetupLayer(unittest.TestCase):
+    def setUp(self):
+        self.config = testing.setUp()
+        self.config.include("opengraph_writer.pyramid_helpers")
+        self.layer = opengraph_writer.OpenGraphLayer((("og:site_name", "MySite"),))
+        self.config.set_opengraph_layer(self.layer)
+        self.request = testing.DummyRequest()
+        exts = self.config.registry.getUtility(IRequestExtensions)
+        self.request.opengraph_item = exts.descriptors["opengraph_item"].wrapped(
+            self.request
+        )
+
+    def tearDown(self):
+        testing.tearDown()
+
+    def test_layered(self):
+        opengraph_item = self.request.opengraph_item
+        self.assertIs(opengraph_item._layer, self.layer)
+        opengraph_item.set("og:title", "MyPage")
+        opengraph_item.validate()
+        self.assertIn('content="MySite"', opengraph_item.as_html())
+        self.assertNotIn("og:title", self.layer)
+
+
+class TestSetupPool(unittest.TestCase):
+    def setUp(self):
+        self.config = testing.setUp()
+        self.config.include("opengraph_writer.pyramid_helpers")
+        self.pool = OpenGraphItemPool(maxsize=1)
+        self.config.set_opengraph_item_pool(self.pool)
+        self.exts = self.config.registry.getUtility(IRequestExtensions)
+
+    def tearDown(self):
+        testing.tearDown()
+
+    def _request(self):
+        request = testing.DummyRequest()
+        request.opengraph_item = self.exts.descriptors["opengraph_item"].wrapped(
+            request
+        )
+        return request
+
+    def test_reused(self):
+        request_1 = self._request()
+        request_1.opengraph_item.set("og:title", "MyPage")
+        request_1.opengraph_item.validate()
+        request_2 = self._request()
+        self.assertIsNot(request_1.opengraph_item, request_2.opengraph_item)
+        request_1._process_finished_callbacks()
+        request_2._process_finished_callbacks()
+        self.assertEqual(len(self.pool), 1)
+        request_3 = self._request()
+        self.assertIs(request_3.opengraph_item, request_1.opengraph_item)
+        self.assertEqual(request_3.opengraph_item._data, {})
+        self.assertIsNone(request_3.opengraph_item._errors)
+        self.assertEqual(
+            self.pool.stats(),
+            {"hits": 1, "misses": 2, "discarded": 1, "hit_rate": 1 / 3},
+        )
+
+    def test_layer(self):
+        layer = opengraph_writer.OpenGraphLayer((("og:site_name", "MySite"),))
+        self._request()._process_finished_callbacks()
+        self.config.set_opengraph_layer(layer)
+        opengraph_item = self._request().opengraph_item
+        self.assertIs(opengraph_item._layer, layer)
+        self.assertEqual(opengraph_item._data["og:site_name"], "MySite")
+
+
+class _DummyRoute(object):
+    name = "article"
+
+
+class TestTween(unittest.TestCase):
+    _body = "<html><head><title>a</title></HEAD><body>b</body></html>"
+
+    def setUp(self):
+        self.config = testing.setUp()
+        self.config.include("opengraph_writer.pyramid_helpers")
+        self.cache = RenderCache()
+        self.config.set_opengraph_render_cache(self.cache)
+        self.response = Response(self._body)
+        self.tween = opengraph_tween_factory(
+            lambda request: self.response, self.config.registry
+        )
+
+    def tearDown(self):
+        testing.tearDown()
+
+    def _new_request(self, used=True):
+        request = testing.DummyRequest()
+        request.matched_route = _DummyRoute()
+        if used:
+            exts = self.config.registry.getUtility(IRequestExtensions)
+            request.opengraph_item = exts.descriptors["opengraph_item"].wrapped(request)
+            request.opengraph_item.set_many(
+                (("og:title", "MyTitle"), ("og:url", "http://f.me"))
+            )
+        return request
+
+    def test_inject(self):
+        response = self.tween(self._new_request())
+        self.assertEqual(
+            response.text,
+            """<html><head><title>a</title><meta property="og:title" content="MyTitle"/>
+<meta property="og:url" content="http://f.me"/>
+</HEAD><body>b</body></html>""",
+        )
+        self.response = Response(self._body)
+        self.tween(self._new_request())
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 1})
+
+    def test_unused(self):
+        response = self.tween(self._new_request(used=False))
+        self.assertEqual(response.text, self._body)
+        self.assertEqual(self.cache.stats(), {"hits": 0, "misses": 0})
+
+    def test_not_html(self):
+        self.response = Response(self._body, content_type="text/plain")
+        response = self.tween(self._new_request())
+        self.assertEqual(response.text, self._body)
@@ -0,0 +1,272 @@
+# stdlib
+import asyncio
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+import socketserver
+import threading
+import time
+import unittest
+
+# local package
+from opengraph_writer import ErrorCode
+from opengraph_writer import OpenGraphItem
+from opengraph_writer.resolver import AsyncHTTPFetcher
+from opengraph_writer.resolver import ReferenceResolver
+
+
+_PAGE = """<html><head><meta property="og:type" content="%s"/>
+<meta property="og:title" content="a"/></head><body>%s</body></html>"""
+
+_PAGES = {
+    "/author": "profile",
+    "/album": "music.album",
+    "/website": "website",
+}
+
+
+class _Server(socketserver.ThreadingMixIn, HTTPServer):
+    # `http.server.ThreadingHTTPServer` is new in Python 3.7
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        self.server.hosts.append(self.headers.get("Host"))
+        path = self.path.split("?")[0]
+        if path == "/redirect":
+            self.send_response(301)
+            self.send_header("Location", "/author")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        og_type = _PAGES.get(path.replace("/chunked", ""))
+        if og_type is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = (_PAGE % (og_type, "x" * 1000)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        if path.startswith("/chunked"):
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i in range(0, len(body), 100):
+                chunk = body[i : i + 100]  # noqa: E203
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class TestReferenceResolver(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = _Server(("127.0.0.1", 0), _Handler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base = "http://127.0.0.1:%s" % cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.requests = []
+        self.server.hosts = []
+        self.server.connections = 0
+
+    def _resolver(self, **kwargs):
+        # the url regex does not accept 127.0.0.1, so items use f.me
+        base = self.base
+
+        class _Fetcher(AsyncHTTPFetcher):
+            async def fetch(self, url, max_bytes):
+                url = url.replace("http://f.me", base)
+                return await super().fetch(url, max_bytes)
+
+        return ReferenceResolver(fetcher=_Fetcher(), **kwargs)
+
+    def test_resolve(self):
+        resolver = self._resolver()
+
+        async def _test():
+            for path, status, og_type in (
+                ("/author", 200, "profile"),
+                ("/chunked/album", 200, "music.album"),
+                ("/redirect", 200, "profile"),
+                ("/missing", 404, None),
+            ):
+                resolution = await resolver.resolve(self.base + path)
+                self.assertEqual(resolution.status, status)
+                self.assertEqual(resolution.og_type, og_type)
+            resolution = await resolver.resolve("http://127.0.0.1:1/closed")
+            self.assertIsNone(resolution.status)
+            self.assertFalse(resolution.ok)
+            await resolver.aclose()
+
+        _run(_test())
+        # every request shared one kept-alive connection
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(resolver.fetcher.connections_opened, 2)
+
+    def test_host_header(self):
+        resolver = self._resolver()
+        netloc = "127.0.0.1:%s" % self.server.server_address[1]
+
+        async def _test():
+            await resolver.resolve("http://user:secret@%s/author" % netloc)
+            await resolver.aclose()
+
+        _run(_test())
+        self.assertEqual(self.server.hosts, [netloc])
+
+    def test_check_many(self):
+        resolver = self._resolver(max_concurrency=4)
+        items = []
+        for author, album, expected in (
+            ("/author", "/album", {}),
+            ("/author?2", "/chunked/album", {}),
+            (
+                "/website",
+                "/author",
+                {
+                    "music:musician": ErrorCode.REFERENCE_TYPE_MISMATCH,
+                    "music:album": ErrorCode.REFERENCE_TYPE_MISMATCH,
+                },
+            ),
+            ("/missing", "/album", {"music:musician": ErrorCode.REFERENCE_UNREACHABLE}),
+        ):
+            a = OpenGraphItem(
+                [
+                    ("og:title", "T"),
+                    ("og:type", "music.song"),
+                    ("og:url", "http://f.me"),
+                    ("og:image", "http://f.me/a.png"),
+                    ("music:musician", "http://f.me" + author),
+                    ("music:album", "http://f.me" + album),
+                ]
+            )
+            items.append((a, expected))
+
+        async def _test():
+            results = []
+            for a, _expected in items:
+                results.append(await a.validate_async(resolver=resolver))
+            self.assertEqual(results, [True] * 4)
+            await resolver.aclose()
+
+        _run(_test())
+        for a, expected in items:
+            codes = a.error_codes()
+            for field in ("music:musician", "music:album"):
+                self.assertEqual(codes.get(field), expected.get(field))
+        # /author and /album were each requested once
+        self.assertEqual(len(self.server.requests), 6)
+        self.assertEqual(resolver.stats()["hits"], 2)
+
+    def test_concurrent_dedupe(self):
+        resolver = self._resolver()
+        items = [
+            OpenGraphItem(
+                [("og:type", "article"), ("article:author", "http://f.me/author")]
+            )
+            for _i in range(20)
+        ]
+        for a in items:
+            a.validate()
+
+        async def _test():
+            self.assertEqual(await resolver.check_many(items), [True] * 20)
+            await asyncio.gather(
+                *(resolver.resolve("http://f.me/album") for _i in range(10))
+            )
+            await resolver.aclose()
+
+        _run(_test())
+        self.assertEqual(self.server.requests, ["/author", "/album"])
+
+    def test_ttl(self):
+        now = [0.0]
+        resolver = self._resolver(ttl=10, error_ttl=1, clock=lambda: now[0])
+
+        async def _test():
+            await resolver.resolve("http://f.me/author")
+            await resolver.resolve("http://f.me/missing")
+            now[0] = 5.0
+            await resolver.resolve("http://f.me/author")
+            await resolver.resolve("http://f.me/missing")
+            now[0] = 11.0
+            await resolver.resolve("http://f.me/author")
+            await resolver.aclose()
+
+        _run(_test())
+        self.assertEqual(
+            self.server.requests, ["/author", "/missing", "/missing", "/author"]
+        )
+
+    def test_rate_limit(self):
+        resolver = self._resolver(rate_limit=20.0)
+        urls = ["http://f.me/author?%s" % i for i in range(5)]
+
+        async def _test():
+            await asyncio.gather(*(resolver.resolve(url) for url in urls))
+            await resolver.aclose()
+
+        start = time.monotonic()
+        _run(_test())
+        # 5 requests, at most 20 a second
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+    def test_rate_limit_hosts(self):
+        # a burst to one host does not hold up the others while it waits
+        resolver = self._resolver(rate_limit=5.0, max_concurrency=1)
+        urls = ["http://f.me/author?%s" % i for i in range(4)]
+
+        async def _other():
+            start = time.monotonic()
+            await resolver.resolve(self.base + "/album")
+            return time.monotonic() - start
+
+        async def _test():
+            results = await asyncio.gather(
+                *(resolver.resolve(url) for url in urls), _other()
+            )
+            await resolver.aclose()
+            return results[-1]
+
+        start = time.monotonic()
+        elapsed_other = _run(_test())
+        self.assertGreaterEqual(time.monotonic() - start, 0.59)
+        self.assertLess(elapsed_other, 0.3)
+
+    def test_skipped(self):
+        resolver = ReferenceResolver()
+        # not urls, and fields which already have an error, are not resolved
+        a = OpenGraphItem(
+            [("og:type", "article"), ("article:author", "abc"), ("og:image", 1)]
+        )
+        a.validate()
+        self.assertTrue(_run(resolver.check_item(a)))
+        self.assertEqual(resolver.stats()["misses"], 0)
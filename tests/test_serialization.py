@@ -0,0 +1,178 @@
+# stdlib
+import copy
+import datetime
+import pickle
+import unittest
+
+# local package
+from opengraph_writer import ErrorCode
+from opengraph_writer import OpenGraphItem
+from opengraph_writer import OpenGraphLayer
+from opengraph_writer import serialization
+from ._helpers import _TestsHelper
+
+
+_TZ = datetime.timezone(datetime.timedelta(hours=-5, minutes=-30))
+
+
+# every type of value the binary format encodes
+_ARTICLE_FIELDS = (
+    ("og:image:width", "wide"),
+    ("article:published_time", datetime.datetime(2021, 1, 2, 3, 4, 5, 6)),
+    ("article:modified_time", datetime.datetime(2021, 1, 2, tzinfo=_TZ)),
+    ("article:expiration_time", datetime.date(2021, 1, 1)),
+    ("x:custom", [1, -300, 2**70, 2.5, None, True, False, ("a", "b")]),
+)
+
+
+class _Zone(datetime.tzinfo):
+    """a named timezone, which the binary format can not keep"""
+
+    def utcoffset(self, dt):
+        return datetime.timedelta(hours=-5)
+
+    def dst(self, dt):
+        return datetime.timedelta(0)
+
+    def tzname(self, dt):
+        return "EST"
+
+
+class _Str(str):
+    pass
+
+
+class _SourcedItem(OpenGraphItem):
+    def __init__(self, source, sets=None):
+        super().__init__(sets)
+        self.source = source
+
+
+def _copies(a):
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        yield pickle.loads(pickle.dumps(a, protocol))
+    yield copy.copy(a)
+    yield copy.deepcopy(a)
+
+
+class _Helper(_TestsHelper):
+    def _make_article(self):
+        a = self._make_core_compliant(og_title="MyArticle é", og_type="article")
+        a.set_many(_ARTICLE_FIELDS)
+        return a
+
+
+class TestBytes(unittest.TestCase, _Helper):
+    def test_roundtrip(self):
+        a = self._make_article()
+        b = OpenGraphItem.from_bytes(a.to_bytes())
+        self.assertEqual(b._data, a._data)
+        self.assertIsNone(b._errors)
+        self.assertIs(type(b._data["x:custom"][-1]), tuple)
+        self.assertEqual(
+            b._data["article:modified_time"].utcoffset(),
+            datetime.timedelta(hours=-5, minutes=-30),
+        )
+
+        a.validate()
+        b = OpenGraphItem.from_bytes(a.to_bytes())
+        self.assertEqual(b.error_codes(), a.error_codes())
+        self.assertEqual(b.errors(), a.errors())
+        self.assertEqual(b.as_html(debug=True), a.as_html(debug=True))
+        # revalidated in full
+        b.set("og:title", "Other")
+        b.validate()
+        self.assertNotIn("og:title", b.error_codes())
+
+    def test_interned_names(self):
+        a = OpenGraphItem([("og:title", "a"), ("x:unknown", "b")])
+        payload = a.to_bytes()
+        self.assertNotIn(b"og:title", payload)
+        self.assertIn(b"x:unknown", payload)
+
+    def test_layer_flattened(self):
+        layer = OpenGraphLayer([("og:site_name", "Site")])
+        a = layer.new_item([("og:title", "a")])
+        b = OpenGraphItem.from_bytes(a.to_bytes())
+        self.assertIsNone(b._layer)
+        self.assertEqual(b._data, {"og:site_name": "Site", "og:title": "a"})
+
+    def test_invalid(self):
+        payload = self._make_core_compliant().to_bytes()
+        for bad in (b"", b"XYZ\x01", payload[:3] + b"\x09" + payload[4:]):
+            self.assertRaises(ValueError, OpenGraphItem.from_bytes, bad)
+        for i in range(9, len(payload)):
+            self.assertRaises(ValueError, OpenGraphItem.from_bytes, payload[:i])
+        mismatched = payload[:4] + b"\x00\x00\x00\x00" + payload[8:]
+        self.assertRaises(ValueError, OpenGraphItem.from_bytes, mismatched)
+        a = OpenGraphItem([("x:custom", object())])
+        self.assertRaises(TypeError, a.to_bytes)
+
+    def test_pickle(self):
+        a = self._make_article()
+        a.validate()
+        self.assertIs(a.__reduce_ex__(2)[0], serialization.from_bytes)
+        for b in _copies(a):
+            self.assertEqual(b._data, a._data)
+            self.assertEqual(b.error_codes(), a.error_codes())
+        # not supported by the binary format, so pickled by `__dict__`
+        a = OpenGraphItem([("x:custom", {"a": 1})])
+        b = pickle.loads(pickle.dumps(a))
+        self.assertEqual(b._data, a._data)
+
+    def test_pickle_lossless(self):
+        # values the binary format would change are pickled as usual
+        named = datetime.timezone(datetime.timedelta(hours=1), "CET")
+        for field, value in (
+            ("article:published_time", datetime.datetime(2021, 1, 2, tzinfo=_Zone())),
+            ("article:modified_time", datetime.datetime(2021, 1, 2, tzinfo=named)),
+            ("og:title", _Str("MyArticle")),
+        ):
+            a = self._make_article()
+            a.set(field, value)
+            a.validate()
+            for b in _copies(a):
+                self.assertEqual(b._data, a._data)
+                self.assertIs(type(b._data[field]), type(value))
+                if isinstance(value, datetime.datetime):
+                    self.assertEqual(b._data[field].tzname(), value.tzname())
+                self.assertEqual(b.error_codes(), a.error_codes())
+
+    def test_pickle_subclass(self):
+        a = _SourcedItem("feed", [("og:title", "a")])
+        a.validate()
+        for b in _copies(a):
+            self.assertIs(type(b), _SourcedItem)
+            self.assertEqual(b.source, "feed")
+            self.assertEqual(b._data, a._data)
+            self.assertEqual(b.error_codes(), a.error_codes())
+
+    def test_pickle_layered(self):
+        layer = OpenGraphLayer([("og:site_name", "Site")])
+        a = layer.new_item([("og:title", "a")])
+        a.validate()
+        for b in _copies(a):
+            self.assertIsNotNone(b._layer)
+            self.assertEqual(b._local, {"og:title": "a"})
+            self.assertEqual(dict(b._data), dict(a._data))
+            self.assertEqual(b.error_codes(), a.error_codes())
+
+
+class TestJSON(unittest.TestCase, _Helper):
+    def test_roundtrip(self):
+        a = self._make_article()
+        a.validate()
+        b = OpenGraphItem.from_json(a.to_json())
+        expected = dict(a._data, **{"x:custom": [1, -300, 2**70, 2.5, None]})
+        expected["x:custom"] += [True, False, ["a", "b"]]
+        self.assertEqual(b._data, expected)
+        self.assertEqual(
+            b._data["article:modified_time"], a._data["article:modified_time"]
+        )
+        self.assertEqual(b.error_codes(), a.error_codes())
+        self.assertIs(type(b.error_codes()["og:image:width"]), ErrorCode)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, OpenGraphItem.from_json, "[]")
+        self.assertRaises(ValueError, OpenGraphItem.from_json, '{"v": 99}')
+        self.assertRaises(ValueError, serialization._parse_isoformat, "2021-1-1")
@@ -0,0 +1,110 @@
+# stdlib
+import pickle
+import random
+import unittest
+
+# local package
+from opengraph_writer import ErrorCode
+from opengraph_writer import get_property_index
+from opengraph_writer import OpenGraphItem
+from opengraph_writer import typed
+from opengraph_writer.typed import get_item_class
+from opengraph_writer.typed import MusicSongItem
+
+_VALUES = (
+    "sample",
+    "not a url",
+    "http://example.com/a.png",
+    "120",
+    120,
+    True,
+    "male",
+    "2012-02-02",
+    None,
+    1.5,
+    ["http://example.com/a.png", "http://example.com/b.png"],
+    ["sample", 1],
+)
+
+_INVALID = {
+    ErrorCode.REQUIRED_INVALID,
+    ErrorCode.RECOMMENDED_INVALID,
+    ErrorCode.REQUIRED_SUBTYPE_INVALID,
+    ErrorCode.RECOMMENDED_SUBTYPE_INVALID,
+}
+
+
+class TestTypedItems(unittest.TestCase):
+    def test_song(self):
+        song = MusicSongItem(og_title="Sucker", music_duration=181)
+        song.og_image = ["http://example.com/a.png", "http://example.com/b.png"]
+        song.set("og:url", "http://example.com")
+        song.set("x:unknown", "1")
+        self.assertRaises(ValueError, setattr, song, "music_album_track", "three")
+        self.assertRaises(ValueError, song.set, "og:image", "not a url", append=True)
+        self.assertRaises(ValueError, song.set, "og:type", "article")
+        self.assertRaises(AttributeError, setattr, song, "og_type", "article")
+        self.assertRaises(AttributeError, MusicSongItem, og_titel="Sucker")
+        self.assertEqual(song.get("og:image:width"), None)
+        self.assertEqual(song.get("og:type"), "music.song")
+        self.assertEqual(len(song.og_image), 2)
+
+        self.assertTrue(song.validate())
+        self.assertEqual(song.error_codes()["x:unknown"], ErrorCode.NOT_VALIDATED)
+        self.assertFalse(song.validate(strict=True))
+        self.assertEqual(song.error_codes()["x:unknown"], ErrorCode.UNSUPPORTED)
+        song.og_url = None
+        self.assertFalse(song.validate(quiet=True))
+        self.assertEqual(song.error_codes(), {"og:url": ErrorCode.MISSING_REQUIRED})
+
+        copy = pickle.loads(pickle.dumps(song))
+        self.assertEqual(copy.items(), song.items())
+        self.assertEqual(copy.error_codes(), song.error_codes())
+
+    def test_lookup(self):
+        self.assertIs(typed.ArticleItem, get_item_class("article"))
+        self.assertEqual(typed.VideoTvShowItem.og_type, "video.tv_show")
+        self.assertRaises(ValueError, get_item_class, "unknown")
+        self.assertRaises(AttributeError, getattr, typed, "UnknownItem")
+        a = typed.from_item(OpenGraphItem([("og:type", "book")]))
+        self.assertIsInstance(a, typed.BookItem)
+        self.assertRaises(ValueError, typed.from_item, OpenGraphItem())
+        self.assertRaises(
+            ValueError,
+            typed.ArticleItem.from_item,
+            OpenGraphItem([("og:type", "book")]),
+        )
+
+    def test_differential(self):
+        # a typed item validates and renders like the item it is converted from
+        index = get_property_index()
+        _random = random.Random(1234)
+        for og_type, subtypes in index.types.items():
+            names = list(index.properties) + list(subtypes) + ["x:unknown"]
+            converted = 0
+            for _i in range(200):
+                fields = _random.sample(names, _random.randint(0, 6))
+                pairs = [(f, _random.choice(_VALUES)) for f in fields]
+                pairs.append(("og:type", og_type))
+                item = OpenGraphItem(pairs)
+                for kwargs in ({}, {"quiet": True}, {"strict": True}):
+                    item.validate(full=True, **kwargs)
+                    try:
+                        a = typed.from_item(item)
+                    except ValueError:
+                        # only items which have an invalid value can not be
+                        # converted
+                        item.validate(full=True)
+                        codes = set(item.error_codes().values())
+                        self.assertTrue(
+                            (codes & _INVALID) or (None in dict(pairs).values())
+                        )
+                        break
+                    converted += 1
+                    self.assertEqual(a.error_codes(), item.error_codes())
+                    self.assertEqual(a.to_item()._data, item._data)
+                    self.assertEqual(a.validate(**kwargs), item.validate(**kwargs))
+                    self.assertEqual(a.error_codes(), item.error_codes())
+                    for debug in (False, True):
+                        self.assertEqual(a.as_html(debug), item.as_html(debug))
+            self.assertGreater(converted, 0)